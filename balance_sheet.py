@@ -1,8 +1,34 @@
 # balance_sheet.py
 
-from sqlalchemy import func
-from core_ledger.database import SessionLocal
-from core_ledger.models.financial_core import Entity, Account, AccountType, JournalLine
+from core_ledger.database import SessionLocal, get_engine
+from core_ledger.models.financial_core import Entity, AccountType
+from core_ledger.balance_service import get_entity_balances
+from core_ledger.account_tree import get_account_tree, rollup_balances
+from core_ledger.fx import DEFAULT_REPORTING_CURRENCY, convert_report, get_rate_store
+
+ACCOUNT_LABELS = {
+    AccountType.ASSET: "Kas/Bank",
+    AccountType.LIABILITY: "Kewajiban",
+    AccountType.EQUITY: "Modal Inti",
+    AccountType.REVENUE: "Pendapatan",
+    AccountType.EXPENSE: "Beban",
+}
+
+def print_account_rollup(report, rollup, *account_types):
+    """Mencetak chart of accounts berjenjang: node ber-anak menampilkan subtotal, daun menampilkan saldo."""
+    accounts = {acc.account_id: acc for acc in report.accounts(*account_types)}
+    for account_id, node in rollup.items():
+        acc = accounts.get(account_id)
+        if acc is None:
+            continue
+        indent = "  " * (node.depth + 1)
+        label = ACCOUNT_LABELS[acc.account_type]
+        if node.is_leaf:
+            print(f"{indent}- {label} (Risk: {acc.risk_category}) : {node.subtotal:,} {acc.currency_id}")
+        else:
+            print(f"{indent}+ {label} (Risk: {acc.risk_category}) [Subtotal] : {node.subtotal:,} {acc.currency_id}")
+            if node.excluded_children:
+                print(f"{indent}  (di luar subtotal: {len(node.excluded_children)} sub-akun beda tipe/mata uang)")
 
 def generate_balance_sheet():
     db = SessionLocal()
@@ -17,35 +43,30 @@ def generate_balance_sheet():
         if not entity:
             raise ValueError("Entitas tidak ditemukan.")
 
-        # Ambil semua akun milik entitas ini
-        accounts = db.query(Account).filter(Account.entity_id == entity.entity_id).all()
-        
-        total_assets = 0
-        total_liabilities_equity = 0
+        # Ambil saldo seluruh akun milik entitas ini (satu query agregat),
+        # lalu subtotal berjenjang mengikuti parent_account_id (pohon akun di-cache)
+        report = get_entity_balances(db, entity.entity_id)
+        tree = get_account_tree(db, entity.entity_id)
+        rollup = rollup_balances(tree, report)
+        for account_id in tree.cycles:
+            print(f"[!] WARNING: siklus parent_account_id pada akun {account_id}, ditampilkan sebagai akun induk.")
         
         print(f"\n[ ASSETS / KEKAYAAN ]")
-        for acc in accounts:
-            if acc.account_type == AccountType.ASSET:
-                # Untuk Aset: Saldo = Total Debit - Total Credit
-                debits = db.query(func.sum(JournalLine.debit_amount)).filter(JournalLine.account_id == acc.account_id).scalar() or 0
-                credits = db.query(func.sum(JournalLine.credit_amount)).filter(JournalLine.account_id == acc.account_id).scalar() or 0
-                balance = debits - credits
-                total_assets += balance
-                print(f"  - Kas/Bank (Risk: {acc.risk_category}) : {balance:,} {acc.currency_id}")
+        # Untuk Aset: Saldo = Total Debit - Total Credit
+        print_account_rollup(report, rollup, AccountType.ASSET)
 
         print(f"\n[ LIABILITIES & EQUITY / KEWAJIBAN & MODAL ]")
-        for acc in accounts:
-            if acc.account_type in [AccountType.EQUITY, AccountType.LIABILITY]:
-                # Untuk Modal/Kewajiban: Saldo = Total Credit - Total Debit
-                debits = db.query(func.sum(JournalLine.debit_amount)).filter(JournalLine.account_id == acc.account_id).scalar() or 0
-                credits = db.query(func.sum(JournalLine.credit_amount)).filter(JournalLine.account_id == acc.account_id).scalar() or 0
-                balance = credits - debits
-                total_liabilities_equity += balance
-                print(f"  - Modal Inti (Risk: {acc.risk_category}) : {balance:,} {acc.currency_id}")
+        # Untuk Modal/Kewajiban: Saldo = Total Credit - Total Debit
+        print_account_rollup(report, rollup, AccountType.EQUITY, AccountType.LIABILITY)
+
+        # Total dalam mata uang pelaporan: akun valuta asing dikonversi lewat store kurs (fx_rates)
+        converted = convert_report(db, report, get_rate_store(get_engine()), DEFAULT_REPORTING_CURRENCY)
+        total_assets = converted.total(AccountType.ASSET)
+        total_liabilities_equity = converted.total(AccountType.EQUITY, AccountType.LIABILITY)
         
         print("-" * 50)
-        print(f"TOTAL ASSETS                 : {total_assets:,} IDR")
-        print(f"TOTAL LIABILITIES & EQUITY   : {total_liabilities_equity:,} IDR")
+        print(f"TOTAL ASSETS                 : {total_assets:,} {converted.reporting_currency}")
+        print(f"TOTAL LIABILITIES & EQUITY   : {total_liabilities_equity:,} {converted.reporting_currency}")
         print("=" * 50)
         
         if total_assets != total_liabilities_equity:
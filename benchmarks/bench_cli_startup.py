@@ -0,0 +1,63 @@
+# benchmarks/bench_cli_startup.py
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from safar import COMMANDS
+
+# Biaya import (cold start) tiap subcommand `safar`, diukur dengan `python -X importtime`:
+# modul subcommand diimpor tanpa menjalankan fungsinya. Target: < 150 ms untuk command tanpa NumPy.
+# Wall time termasuk start interpreter (baris "python") dan overhead pengukuran -X importtime.
+
+TARGET_MS = 150
+RUNS = 5
+
+
+def measure(statement):
+    """(total import ms, wall ms, modul yang diimpor, [(cumulative ms, modul top-level)]): run terbaik dari RUNS."""
+    code = f"import sys; sys.path.insert(0, {ROOT!r}); {statement}"
+    best = None
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, cwd=ROOT, check=True)
+        wall = (time.perf_counter() - started) * 1000
+        modules, top_level = set(), []
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            modules.add(name.strip())
+            # Modul tanpa indentasi = import top-level; cumulative-nya sudah mencakup seluruh turunannya
+            if not name.startswith("  "):
+                top_level.append((int(cumulative) / 1000, name.strip()))
+        total = sum(ms for ms, _ in top_level)
+        if best is None or total < best[0]:
+            best = (total, wall, modules, sorted(top_level, reverse=True))
+    return best
+
+
+if __name__ == "__main__":
+    rows = [("python", "pass"), ("--help", "import safar; safar.build_parser()")]
+    rows += [(name, f"import safar; safar.load_command({name!r})") for name in COMMANDS]
+
+    print("=" * 96)
+    print("    BENCHMARK: COLD START CLI `safar` (python -X importtime)")
+    print("=" * 96)
+    print(f"{'Command':<10}{'Import ms':>11}{'Wall ms':>10}{'NumPy':>7}{'SQLA':>6}{'Target':>9}   Import terberat")
+    for label, statement in rows:
+        total, wall, modules, top_level = measure(statement)
+        uses_numpy = "numpy" in modules
+        if uses_numpy or label == "python":
+            verdict = "-"
+        else:
+            verdict = "OK" if total < TARGET_MS else "MISS"
+        heaviest = ", ".join(f"{name} {ms:,.0f}" for ms, name in top_level[:2])
+        print(f"{label:<10}{total:>11,.1f}{wall:>10,.0f}{'ya' if uses_numpy else '-':>7}"
+              f"{'ya' if 'sqlalchemy' in modules else '-':>6}{verdict:>9}   {heaviest}")
+    print("=" * 96)
@@ -0,0 +1,101 @@
+# benchmarks/bench_concurrent_rw.py
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from core_ledger.models.financial_core import Base, Account
+from core_ledger.balance_projection import register_posting_hooks
+from core_ledger.balance_service import BalanceSource, get_entity_balances
+from core_ledger.bulk_posting import post_journal_batch
+from core_ledger.storage_profile import PROFILES, create_profiled_engine
+
+from bench_bulk_posting import setup_ledger, build_bulk_entries
+
+
+def run_profile(profile, duration=5.0, readers=4, seed_entries=20000, write_batch=20):
+    """Satu writer memposting batch kecil terus-menerus sementara beberapa reader membaca neraca."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_profiled_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = Session()
+        ledger_id, cash_id, equity_id = setup_ledger(db)
+        entity_id = db.get(Account, cash_id).entity_id
+        post_journal_batch(db, build_bulk_entries(ledger_id, cash_id, equity_id, seed_entries))
+        db.close()
+
+        stats = {"writes": 0, "reads": 0, "locked": 0, "read_latency": []}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def writer():
+            session = Session()
+            i = 0
+            while not stop.is_set():
+                entries = build_bulk_entries(ledger_id, cash_id, equity_id, write_batch)
+                for entry in entries:
+                    entry.event_hash = f"RW_{i}_{entry.event_hash}"
+                try:
+                    post_journal_batch(session, entries)
+                    with lock:
+                        stats["writes"] += write_batch
+                except OperationalError:
+                    with lock:
+                        stats["locked"] += 1
+                i += 1
+            session.close()
+
+        def reader():
+            session = Session()
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    get_entity_balances(session, entity_id, source=BalanceSource.JOURNAL)
+                    session.rollback()
+                    with lock:
+                        stats["reads"] += 1
+                        stats["read_latency"].append(time.perf_counter() - started)
+                except OperationalError:
+                    session.rollback()
+                    with lock:
+                        stats["locked"] += 1
+            session.close()
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    latencies = sorted(stats["read_latency"]) or [float('nan')]
+    return {
+        "writes_per_sec": stats["writes"] / duration,
+        "reads_per_sec": stats["reads"] / duration,
+        "p95_read_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "locked": stats["locked"],
+    }
+
+
+if __name__ == "__main__":
+    register_posting_hooks()
+    print("=" * 72)
+    print("    BENCHMARK: READER/WRITER BERSAMAAN (SQLite, 1 writer + 4 reader)")
+    print("=" * 72)
+    print(f"{'Profil':<14}{'Write/s':>12}{'Read/s':>12}{'p95 Read (ms)':>16}{'Locked':>10}")
+    for name in ("legacy", "production"):
+        result = run_profile(PROFILES[name])
+        print(f"{name:<14}{result['writes_per_sec']:>12,.0f}{result['reads_per_sec']:>12,.1f}"
+              f"{result['p95_read_ms']:>16,.1f}{result['locked']:>10}")
+    print("=" * 72)
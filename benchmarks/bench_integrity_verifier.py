@@ -0,0 +1,35 @@
+# benchmarks/bench_integrity_verifier.py
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core_ledger.integrity_verifier import verify_ledger_integrity
+
+from synthetic_ledger import build_synthetic_ledger
+
+
+if __name__ == "__main__":
+    n_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workers = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'synthetic.db')}"
+        started = time.perf_counter()
+        build_synthetic_ledger(url, n_lines=n_lines)
+        print(f"[*] Ledger sintetis {n_lines:,} lines dibangun dalam {time.perf_counter() - started:,.1f} detik")
+
+        print("=" * 72)
+        print("    BENCHMARK: STREAMING INTEGRITY VERIFIER")
+        print("=" * 72)
+        print(f"{'Mode':<28}{'Detik':>10}{'Lines/sec':>16}{'Estimasi 10M':>16}")
+        for label, kwargs in (("1 worker", {"workers": 1}),
+                              (f"{workers} worker (by time)", {"workers": workers, "by": "time", "slices": workers})):
+            result = verify_ledger_integrity(url, **kwargs)
+            assert result.ok, result.to_json()
+            estimate = 10_000_000 / result.lines_per_second
+            print(f"{label:<28}{result.elapsed_seconds:>10,.1f}{result.lines_per_second:>16,.0f}{estimate:>14,.0f} s")
+        print("=" * 72)
@@ -0,0 +1,52 @@
+# benchmarks/bench_loss_cache.py
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from risk_engine.loss_cache import LossDistributionCache
+from risk_engine.monte_carlo_engine import MonteCarloSimulator
+
+# Rekalkulasi CBSS saat modal berubah: simulasi penuh vs cache distribusi ter-normalisasi
+# (miss pertama, hit memori LRU, hit file .npy dari proses/instance baru), plus selisih terhadap simulasi langsung.
+
+CAPITALS = [10_000_000_000, 2_500_000_000, 75_000_000_000, 1_000_000_000_000]
+
+
+def timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, (time.perf_counter() - started) * 1000
+
+
+if __name__ == "__main__":
+    paths = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    directory = tempfile.mkdtemp(prefix="safar_mc_cache_")
+    cache = LossDistributionCache(directory=directory)
+
+    print("=" * 86)
+    print(f"    BENCHMARK: CACHE DISTRIBUSI KERUGIAN ({paths:,} jalur, 365 hari)")
+    print("=" * 86)
+    print(f"{'Modal (IDR)':>20}{'Simulasi ms':>13}{'Cache ms':>11}{'Sumber':>10}{'CBSS':>10}{'Selisih p95':>14}")
+    try:
+        for index, capital in enumerate(CAPITALS):
+            direct, direct_ms = timed(lambda: MonteCarloSimulator(capital).run_chunked_stress_test(paths, 365))
+            cached, cached_ms = timed(lambda: MonteCarloSimulator(capital, cache=cache).run_chunked_stress_test(
+                paths, 365))
+            source = "miss" if index == 0 else "memori"
+            drift = abs(cached.p95_loss / direct.p95_loss - 1)
+            print(f"{capital:>20,}{direct_ms:>13,.1f}{cached_ms:>11,.3f}{source:>10}{cached.cbss:>10.4f}{drift:>14.1e}")
+
+        fresh = LossDistributionCache(directory=directory)
+        capital = CAPITALS[-1]
+        cached, cached_ms = timed(lambda: MonteCarloSimulator(capital, cache=fresh).run_chunked_stress_test(paths, 365))
+        print(f"{capital:>20,}{'-':>13}{cached_ms:>11,.3f}{'.npy':>10}{cached.cbss:>10.4f}{'-':>14}")
+        print("-" * 86)
+        print(f"Simulasi dijalankan: {cache.simulations + fresh.simulations} kali untuk {len(CAPITALS) + 1} lookup")
+    finally:
+        shutil.rmtree(directory)
+    print("=" * 86)
@@ -0,0 +1,62 @@
+# benchmarks/bench_monte_carlo.py
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from risk_engine.monte_carlo_engine import MonteCarloSimulator
+
+# Puncak memori (tracemalloc, termasuk buffer NumPy) dan waktu simulasi chunked, lalu skala worker:
+# waktu per jumlah proses dan pemeriksaan bahwa hasil identik bit-per-bit dengan workers=1.
+
+CAPITAL = 10_000_000_000
+
+
+def measure(label, run):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<44}{elapsed:>9,.1f}{peak / 2**20:>12,.1f}{result.p95_loss:>20,.0f}")
+
+
+def scaling(simulator, iterations):
+    """Waktu per jumlah worker (1, 2, 4, ... s.d. os.cpu_count()) dan kecocokan bit-per-bit dengan workers=1."""
+    cores = os.cpu_count() or 1
+    counts = sorted({1, cores} | {2 ** k for k in range(1, cores.bit_length()) if 2 ** k <= cores})
+    print(f"{'Workers':<10}{'Detik':>9}{'Speedup':>10}{'Identik':>10}   ({iterations:,} jalur, {cores} core)")
+    baseline = None
+    for workers in counts:
+        started = time.perf_counter()
+        result = simulator.run_chunked_stress_test(iterations, 365, workers=workers)
+        elapsed = time.perf_counter() - started
+        key = (result.p95_loss, result.mean_loss, result.std_loss, result.max_loss)
+        if baseline is None:
+            baseline = (elapsed, key)
+        identical = "ya" if key == baseline[1] else "TIDAK"
+        print(f"{workers:<10}{elapsed:>9,.1f}{baseline[0] / elapsed:>9,.2f}x{identical:>10}")
+
+
+if __name__ == "__main__":
+    big = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    simulator = MonteCarloSimulator(current_capital=CAPITAL)
+
+    print("=" * 85)
+    print("    BENCHMARK: MONTE CARLO CAPITAL STRESS TEST (365 hari)")
+    print("=" * 85)
+    print(f"{'Mode':<44}{'Detik':>9}{'Peak MiB':>12}{'p95 loss (IDR)':>20}")
+    measure("chunked exact, 10.000 jalur", lambda: simulator.run_chunked_stress_test(10_000, 365))
+    measure("chunked exact, 100.000 jalur", lambda: simulator.run_chunked_stress_test(100_000, 365))
+    measure(f"chunked exact, {big:,} jalur", lambda: simulator.run_chunked_stress_test(big, 365))
+    measure(f"chunked sketch, {big:,} jalur", lambda: simulator.run_chunked_stress_test(
+        big, 365, quantile_method="sketch"))
+    measure(f"chunked sketch, {big:,} jalur, blok 1.024", lambda: simulator.run_chunked_stress_test(
+        big, 365, chunk_size=1024, quantile_method="sketch"))
+    print("-" * 85)
+    scaling(simulator, big)
+    print("=" * 85)
@@ -0,0 +1,50 @@
+# benchmarks/bench_portfolio.py
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from risk_engine.portfolio_engine import PortfolioSimulator, RISK_PROFILES
+
+# Stress test portofolio per risk_category: waktu & puncak memori terhadap jumlah kategori,
+# lalu rincian kontribusi tail (Euler, expected shortfall) dan manfaat diversifikasi.
+
+CAPITAL = 10_000_000_000
+EXPOSURE = 2_500_000_000
+
+
+def run(categories, iterations):
+    simulator = PortfolioSimulator({category: EXPOSURE for category in categories}, capital=CAPITAL)
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = simulator.run_stress_test(iterations=iterations)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    names = sorted(RISK_PROFILES)
+
+    print("=" * 80)
+    print(f"    BENCHMARK: MONTE CARLO PORTOFOLIO PER RISK_CATEGORY ({iterations:,} jalur, 365 hari)")
+    print("=" * 80)
+    print(f"{'Kategori':<10}{'Detik':>9}{'Jalur/detik':>14}{'Peak MiB':>11}{'p95 (juta)':>14}{'ES (juta)':>14}")
+    result = None
+    for count in range(1, len(names) + 1):
+        result, elapsed, peak = run(names[:count], iterations)
+        print(f"{count:<10}{elapsed:>9.2f}{iterations / elapsed:>14,.0f}{peak:>11.1f}"
+              f"{result.p95_loss / 1e6:>14,.1f}{result.expected_shortfall / 1e6:>14,.1f}")
+
+    print("-" * 80)
+    print(f"{'Kontribusi tail':<24}{'Eksposur (juta)':>18}{'ES (juta)':>14}{'Porsi':>9}{'p95 standalone':>15}")
+    for category in result.tail_contributions:
+        print(f"{category:<24}{result.exposures[category] / 1e6:>18,.0f}{result.tail_contributions[category] / 1e6:>14,.1f}"
+              f"{result.tail_shares[category]:>9.1%}{result.standalone_p95[category] / 1e6:>15,.1f}")
+    print(f"{'Manfaat diversifikasi p95':<24}{result.diversification_benefit / 1e6:>32,.1f}")
+    print("=" * 80)
@@ -0,0 +1,97 @@
+# benchmarks/bench_posting_queue.py
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from core_ledger.models.financial_core import Base
+from core_ledger.balance_projection import register_posting_hooks, verify_account_balances
+from core_ledger.bulk_posting import post_journal_batch
+from core_ledger.event_chain import register_chain_hooks
+from core_ledger.posting_queue import PostingService
+from core_ledger.storage_profile import PROFILES, create_profiled_engine
+
+from bench_bulk_posting import setup_ledger, build_bulk_entries
+
+
+def run_mode(mode, profile, producers=8, per_producer=250):
+    """Beberapa producer memposting jurnal 1-entry: commit sendiri-sendiri vs lewat PostingService."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_profiled_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = Session()
+        ledger_id, cash_id, equity_id = setup_ledger(db)
+        entries = build_bulk_entries(ledger_id, cash_id, equity_id, producers * per_producer)
+        stats = {"failed": 0, "latency": []}
+        lock = threading.Lock()
+        service = PostingService(Session).start() if mode == "queue" else None
+
+        def producer(k):
+            session = Session() if service is None else None
+            for entry in entries[k * per_producer:(k + 1) * per_producer]:
+                started = time.perf_counter()
+                try:
+                    if service is None:
+                        post_journal_batch(session, [entry])
+                    else:
+                        service.post([entry])
+                except (OperationalError, IntegrityError):
+                    # "database is locked" atau dua writer mengklaim slot hash chain yang sama
+                    if session is not None:
+                        session.rollback()
+                    with lock:
+                        stats["failed"] += 1
+                    continue
+                with lock:
+                    stats["latency"].append(time.perf_counter() - started)
+            if session is not None:
+                session.close()
+
+        threads = [threading.Thread(target=producer, args=(k,)) for k in range(producers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        if service is not None:
+            service.close()
+            batches = service.stats["batches"]
+        else:
+            batches = len(stats["latency"])
+        drifts = verify_account_balances(db)
+        db.close()
+        engine.dispose()
+
+    latencies = sorted(stats["latency"]) or [float('nan')]
+    return {
+        "entries_per_sec": len(stats["latency"]) / elapsed,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "failed": stats["failed"],
+        "commits": batches,
+        "consistent": not drifts,
+    }
+
+
+if __name__ == "__main__":
+    register_posting_hooks()
+    register_chain_hooks()
+    print("=" * 80)
+    print("    BENCHMARK: 8 PRODUCER BERSAMAAN, JURNAL 1-ENTRY (SQLite)")
+    print("=" * 80)
+    print(f"{'Profil / mode':<28}{'Entries/s':>12}{'p95 (ms)':>12}{'Gagal':>10}{'Commit':>10}{'Proyeksi':>10}")
+    for profile_name in ("legacy", "production"):
+        for mode in ("direct", "queue"):
+            result = run_mode(mode, PROFILES[profile_name])
+            print(f"{f'{profile_name} / {mode}':<28}{result['entries_per_sec']:>12,.0f}{result['p95_ms']:>12,.1f}"
+                  f"{result['failed']:>10}{result['commits']:>10}{'OK' if result['consistent'] else 'DRIFT!':>10}")
+    print("=" * 80)
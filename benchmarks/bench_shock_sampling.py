@@ -0,0 +1,90 @@
+# benchmarks/bench_shock_sampling.py
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from risk_engine.monte_carlo_engine import DEFAULT_CHUNK_SIZE, MonteCarloSimulator, SAMPLERS, StressParameters
+
+# Sampler shock "dense" (matriks jalur x hari) vs "sparse" (jumlah shock per jalur, ruang log-return):
+# waktu & puncak memori per blok dan simulasi penuh, lalu kecocokan distribusi kerugian
+# (momen, kuantil, statistik Kolmogorov-Smirnov dua sampel beserta nilai kritis alpha = 1%),
+# termasuk skenario shock berat yang return hariannya bisa <= -100% (ruin).
+
+CAPITAL = 10_000_000_000
+DAYS = 365
+SCENARIOS = [
+    ("default", StressParameters()),
+    ("shock berat (-60% +/- 30%)", StressParameters(shock_impact_mean=-0.6, shock_impact_std=0.3)),
+]
+
+
+def measure(run):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def ks_statistic(a, b):
+    a, b = np.sort(a), np.sort(b)
+    grid = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, grid, side="right") / len(a)
+    cdf_b = np.searchsorted(b, grid, side="right") / len(b)
+    return float(np.abs(cdf_a - cdf_b).max())
+
+
+def sample(name, n_paths, parameters=None):
+    seeds = np.random.SeedSequence(7).spawn(-(-n_paths // DEFAULT_CHUNK_SIZE))
+    sizes = [min(DEFAULT_CHUNK_SIZE, n_paths - offset) for offset in range(0, n_paths, DEFAULT_CHUNK_SIZE)]
+    return np.concatenate([SAMPLERS[name](CAPITAL, seed, size, DAYS, parameters=parameters)[0]
+                           for seed, size in zip(seeds, sizes)])
+
+
+if __name__ == "__main__":
+    big = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    compare = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    simulator = MonteCarloSimulator(current_capital=CAPITAL)
+
+    print("=" * 78)
+    print(f"    BENCHMARK: SAMPLING SHOCK DENSE vs SPARSE ({DAYS} hari)")
+    print("=" * 78)
+    print(f"{'Skenario':<40}{'Dense':>12}{'Sparse':>12}{'Rasio':>12}")
+    block_seed = np.random.SeedSequence(1)
+    rows = [
+        (f"1 blok {DEFAULT_CHUNK_SIZE:,} jalur",
+         lambda name: SAMPLERS[name](CAPITAL, block_seed, DEFAULT_CHUNK_SIZE, DAYS)),
+        (f"simulasi {big:,} jalur",
+         lambda name: simulator.run_chunked_stress_test(big, DAYS, sampling=name)),
+    ]
+    for label, run in rows:
+        _, dense_s, dense_mib = measure(lambda: run("dense"))
+        _, sparse_s, sparse_mib = measure(lambda: run("sparse"))
+        print(f"{label + ' (detik)':<40}{dense_s:>12,.3f}{sparse_s:>12,.3f}{dense_s / sparse_s:>11,.1f}x")
+        print(f"{label + ' (peak MiB)':<40}{dense_mib:>12,.1f}{sparse_mib:>12,.1f}{dense_mib / sparse_mib:>11,.1f}x")
+
+    critical = 1.628 * np.sqrt(2 / compare)
+    for scenario, parameters in SCENARIOS:
+        print("-" * 78)
+        dense, sparse = sample("dense", compare, parameters), sample("sparse", compare, parameters)
+        print(f"{'Kerugian ' + scenario + ' (' + format(compare, ',') + ')':<40}"
+              f"{'Dense':>12}{'Sparse':>12}{'Selisih':>12}")
+        for label, func in [("mean (juta IDR)", np.mean), ("std (juta IDR)", np.std),
+                            ("p50 (juta IDR)", lambda x: np.percentile(x, 50)),
+                            ("p95 (juta IDR)", lambda x: np.percentile(x, 95)),
+                            ("p99 (juta IDR)", lambda x: np.percentile(x, 99))]:
+            d, s = func(dense) / 1e6, func(sparse) / 1e6
+            print(f"{label:<40}{d:>12,.1f}{s:>12,.1f}{(s - d) / d:>11.2%}")
+        finite = bool(np.isfinite(dense).all() and np.isfinite(sparse).all())
+        print(f"{'kerugian berhingga (tanpa NaN/inf)':<40}{'':>24}{'ya' if finite else 'TIDAK':>12}")
+        ks = ks_statistic(dense, sparse)
+        print(f"{'KS dua sampel (kritis 1%)':<40}{ks:>12.5f}{critical:>12.5f}{'lolos' if ks < critical else 'GAGAL':>12}")
+    print("=" * 78)
@@ -0,0 +1,111 @@
+# benchmarks/bench_tail_metrics.py
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from risk_engine.loss_statistics import TailQuantile
+from risk_engine.monte_carlo_engine import (DEFAULT_CHUNK_SIZE, VAR_LEVELS, MonteCarloSimulator, default_parameters,
+                                            simulate_block_paths)
+
+# Metrik ekor dalam satu pass: (1) tangga VaR/CVaR dengan satu np.partition vs np.percentile + sort per kuantil,
+# (2) puncak memori sampler "path" (streaming per potongan hari) vs matriks jalur x hari penuh,
+# (3) probabilitas first-passage vs breach akhir horizon pada beberapa lantai modal.
+
+CAPITAL = 10_000_000_000
+DAYS = 365
+FLOORS = (0.9, 0.8, 0.7, 0.6)
+
+
+def timed(run, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def peak_mib(run):
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def ladder_by_sort(losses):
+    """Cara lama: np.percentile per kuantil + sort penuh untuk setiap CVaR."""
+    var = {q: float(np.percentile(losses, q * 100)) for q in VAR_LEVELS}
+    cvar = {}
+    for q in VAR_LEVELS:
+        ordered = np.sort(losses)
+        cvar[q] = float(ordered[len(ordered) - max(1, int(np.ceil(round((1 - q) * len(ordered), 9)))):].mean())
+    return var, cvar
+
+
+def ladder_by_partition(losses):
+    tail = TailQuantile(min(VAR_LEVELS), len(losses))
+    tail.update(losses)
+    return tail.ladder(VAR_LEVELS)
+
+
+def full_matrix_paths(n_paths, seed):
+    """Referensi: matriks jalur x hari utuh, lalu drawdown & minimum dari cumprod."""
+    params = default_parameters()
+    rng = np.random.default_rng(seed)
+    growth = rng.normal(0, params.daily_volatility, (n_paths, DAYS))
+    shocks = rng.random((n_paths, DAYS)) < params.shock_probability
+    growth[shocks] += rng.normal(params.shock_impact_mean, params.shock_impact_std, int(np.count_nonzero(shocks)))
+    growth += 1
+    capital = np.cumprod(growth, axis=1)
+    drawdown = 1 - (capital / np.maximum(np.maximum.accumulate(capital, axis=1), 1)).min(axis=1)
+    return 1 - capital[:, -1], drawdown, np.minimum(capital.min(axis=1), 1)
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    paths = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    simulator = MonteCarloSimulator(current_capital=CAPITAL)
+    losses = np.random.default_rng(1).standard_normal(iterations)
+
+    print("=" * 84)
+    print(f"    BENCHMARK: METRIK EKOR SATU PASS ({', '.join(f'{q:.1%}' for q in VAR_LEVELS)})")
+    print("=" * 84)
+    (sort_var, sort_cvar), sort_s = timed(lambda: ladder_by_sort(losses))
+    (part_var, part_cvar), part_s = timed(lambda: ladder_by_partition(losses))
+    # VaR harus identik bit-per-bit dengan np.percentile; CVaR hanya berbeda urutan penjumlahan
+    identical = "ya" if sort_var == part_var else "TIDAK"
+    cvar_error = max(abs(part_cvar[q] - sort_cvar[q]) / abs(sort_cvar[q]) for q in VAR_LEVELS)
+    print(f"{'Tangga VaR + CVaR':<32}{'Sort (ms)':>11}{'Partition':>11}{'Speedup':>9}{'VaR identik':>12}"
+          f"{'Galat CVaR':>11}")
+    print(f"{f'{iterations:,} sampel':<32}{sort_s * 1000:>11,.1f}{part_s * 1000:>11,.1f}"
+          f"{sort_s / part_s:>8,.1f}x{identical:>12}{cvar_error:>11.1e}")
+
+    print("-" * 84)
+    seed = np.random.SeedSequence(3)
+    print(f"{'Path-dependent, 1 blok ' + format(DEFAULT_CHUNK_SIZE, ',') + ' jalur':<44}{'Detik':>12}{'Peak MiB':>12}")
+    for label, run in [("matriks jalur x hari penuh", lambda: full_matrix_paths(DEFAULT_CHUNK_SIZE, seed)),
+                       ("streaming per potongan hari", lambda: simulate_block_paths(1.0, seed, DEFAULT_CHUNK_SIZE,
+                                                                                    DAYS))]:
+        _, elapsed = timed(run)
+        print(f"{label:<44}{elapsed:>12,.3f}{peak_mib(run):>12,.1f}")
+
+    print("-" * 84)
+    print(f"{'Lantai modal (' + format(paths, ',') + ' jalur)':<44}{'Breach akhir':>14}{'First passage':>15}"
+          f"{'Rasio':>11}")
+    result = None
+    for floor in FLOORS:
+        result = simulator.run_chunked_stress_test(paths, DAYS, sampling="path", floor=floor)
+        terminal, passage = result.terminal_breach_probability, result.first_passage_probability
+        ratio = f"{passage / terminal:,.2f}x" if terminal > 0 else "-"
+        print(f"{f'{floor:.0%} modal awal':<44}{terminal:>14.2%}{passage:>15.2%}{ratio:>11}")
+    print(f"{'Max drawdown rata-rata / p95 / terburuk':<44}{result.max_drawdown_mean:>14.1%}"
+          f"{result.max_drawdown_p95:>15.1%}{result.max_drawdown_worst:>11.1%}")
+    print("=" * 84)
@@ -0,0 +1,122 @@
+# benchmarks/bench_uuid_storage.py
+
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core_ledger.models.financial_core import Base
+from core_ledger.models.types import BinaryUUID
+
+from synthetic_ledger import build_synthetic_ledger
+
+# Ukuran file & latensi baca: key UUID sebagai BLOB 16 byte (BinaryUUID) vs teks hex 32 karakter
+# (representasi postgresql.UUID di SQLite sebelum migrasi binary_uuid_keys).
+# Salinan "teks" dibuat dari database biner yang sama sehingga isi kedua file identik.
+
+
+def _to_text_layout(path):
+    conn = sqlite3.connect(path)
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        for column in table.columns:
+            if isinstance(column.type, BinaryUUID):
+                conn.execute(f"UPDATE {table.name} SET {column.name} = lower(hex({column.name})) "
+                             f"WHERE typeof({column.name}) = 'blob'")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def _table_bytes(conn):
+    try:
+        rows = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC").fetchall()
+    except sqlite3.OperationalError:
+        return []  # SQLite tanpa SQLITE_ENABLE_DBSTAT_VTAB
+    return rows
+
+
+def _time_queries(path, account_keys, journal_keys, repeat):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA cache_size = -262144")
+    timings = {}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for key in account_keys:
+            conn.execute("SELECT SUM(debit_amount), SUM(credit_amount) FROM journal_lines WHERE account_id = ?",
+                         (key,)).fetchone()
+    timings["saldo per akun (sum lines)"] = (time.perf_counter() - started) / (repeat * len(account_keys))
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for key in journal_keys:
+            conn.execute("SELECT l.account_id, l.debit_amount, l.credit_amount FROM journal_entries e "
+                         "JOIN journal_lines l ON l.journal_id = e.journal_id WHERE e.journal_id = ?",
+                         (key,)).fetchall()
+    timings["lookup jurnal + join lines"] = (time.perf_counter() - started) / (repeat * len(journal_keys))
+
+    started = time.perf_counter()
+    conn.execute("SELECT account_id, SUM(debit_amount) - SUM(credit_amount) FROM journal_lines "
+                 "GROUP BY account_id").fetchall()
+    timings["agregat seluruh akun"] = time.perf_counter() - started
+    conn.close()
+    return timings
+
+
+if __name__ == "__main__":
+    n_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        binary_path = os.path.join(tmp, "binary.db")
+        text_path = os.path.join(tmp, "text.db")
+        started = time.perf_counter()
+        build_synthetic_ledger(f"sqlite:///{binary_path}", n_lines=n_lines)
+        print(f"[*] Ledger sintetis {n_lines:,} lines dibangun dalam {time.perf_counter() - started:,.1f} detik")
+
+        conn = sqlite3.connect(binary_path)
+        conn.execute("VACUUM")
+        accounts = [row[0] for row in conn.execute("SELECT account_id FROM accounts")]
+        journals = [row[0] for row in conn.execute("SELECT journal_id FROM journal_entries ORDER BY random() LIMIT 2000")]
+        binary_tables = _table_bytes(conn)
+        conn.close()
+        shutil.copyfile(binary_path, text_path)
+        _to_text_layout(text_path)
+        conn = sqlite3.connect(text_path)
+        text_tables = dict(_table_bytes(conn))
+        conn.close()
+
+        account_sample = rng.sample(accounts, min(50, len(accounts)))
+        layouts = (
+            ("TEXT hex (lama)", text_path, [key.hex() for key in account_sample], [key.hex() for key in journals]),
+            ("BLOB 16 byte", binary_path, account_sample, journals),
+        )
+
+        print("=" * 72)
+        print("    BENCHMARK: UUID KEY STORAGE (SQLITE)")
+        print("=" * 72)
+        sizes = {label: os.path.getsize(path) for label, path, _, _ in layouts}
+        for label, size in sizes.items():
+            print(f"{label:<28}{size / 2**20:>12,.1f} MiB")
+        print(f"{'Penghematan':<28}{1 - sizes['BLOB 16 byte'] / sizes['TEXT hex (lama)']:>12.1%}")
+        if binary_tables:
+            print("-" * 72)
+            print(f"{'Tabel/index':<40}{'TEXT MiB':>14}{'BLOB MiB':>14}")
+            for name, size in binary_tables[:8]:
+                print(f"{name:<40}{text_tables.get(name, 0) / 2**20:>14,.1f}{size / 2**20:>14,.1f}")
+
+        print("-" * 72)
+        results = {label: _time_queries(path, accounts_, journals_, repeat=3)
+                   for label, path, accounts_, journals_ in layouts}
+        print(f"{'Query':<32}{'TEXT ms':>12}{'BLOB ms':>12}{'Rasio':>10}")
+        for query in results["BLOB 16 byte"]:
+            before, after = results["TEXT hex (lama)"][query], results["BLOB 16 byte"][query]
+            print(f"{query:<32}{before * 1000:>12,.3f}{after * 1000:>12,.3f}{before / after:>9,.2f}x")
+        print("=" * 72)
@@ -0,0 +1,71 @@
+# benchmarks/synthetic_ledger.py
+
+import hashlib
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.orm import sessionmaker
+
+from core_ledger.models.financial_core import Base, Entity, Account, AccountType, Ledger
+from core_ledger.balance_projection import register_posting_hooks
+from core_ledger.bulk_posting import BulkEntry, BulkLine, post_journal_batch
+from core_ledger.event_chain import register_chain_hooks
+from core_ledger.storage_profile import PROFILES, create_profiled_engine
+
+# Ledger sintetis untuk benchmark: satu entitas, beberapa akun aset/kewajiban/modal,
+# jurnal 2-baris seimbang yang tersebar merata di sepanjang `days` hari.
+
+
+def build_synthetic_ledger(url, n_lines=1_000_000, n_accounts=200, days=365, batch_entries=50_000, seed=7):
+    register_posting_hooks()
+    register_chain_hooks()
+    engine = create_profiled_engine(url, PROFILES["bulk_import"])
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(seed)
+
+    db = Session()
+    try:
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        entity = Entity(name="Synthetic Foundation", jurisdiction_id="ID-NEUTRAL-ZONE",
+                        risk_appetite_profile_id="CONSERVATIVE_01", capital_buffer_id="BUFFER_CORE_01")
+        db.add(entity)
+        db.flush()
+        types = [AccountType.ASSET] * 3 + [AccountType.LIABILITY, AccountType.EQUITY]
+        accounts = [
+            Account(entity_id=entity.entity_id, account_type=types[i % len(types)], currency_id="IDR",
+                    risk_category="LIQUID_CASH" if types[i % len(types)] == AccountType.ASSET else "TIER_1_CAPITAL",
+                    liquidity_class="HIGH")
+            for i in range(n_accounts)
+        ]
+        ledger = Ledger(entity_id=entity.entity_id, opening_balance_hash="SYNTHETIC_GENESIS",
+                        period_start=start, period_end=start + timedelta(days=days), locked_flag=False)
+        db.add_all(accounts + [ledger])
+        db.commit()
+
+        assets = [a.account_id for a in accounts if a.account_type == AccountType.ASSET]
+        funding = [a.account_id for a in accounts if a.account_type != AccountType.ASSET]
+        n_entries = n_lines // 2
+        seconds = days * 86400
+        for offset in range(0, n_entries, batch_entries):
+            batch = []
+            for i in range(offset, min(offset + batch_entries, n_entries)):
+                amount = rng.randint(1, 1_000_000)
+                batch.append(BulkEntry(
+                    ledger_id=ledger.ledger_id, event_type="SYNTHETIC", source_system="BENCH",
+                    authority_signature_hash="AUTH_BENCH",
+                    event_hash=hashlib.sha256(f"SYN_{i}".encode()).hexdigest(),
+                    transaction_type="TRANSFER", approval_status="APPROVED", created_by="BENCH",
+                    timestamp=start + timedelta(seconds=seconds * i / n_entries),
+                    lines=[BulkLine(account_id=rng.choice(assets), debit_amount=amount),
+                           BulkLine(account_id=rng.choice(funding), credit_amount=amount)],
+                ))
+            post_journal_batch(db, batch)
+        return entity.entity_id, ledger.ledger_id
+    finally:
+        db.close()
+        engine.dispose()
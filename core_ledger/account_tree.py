@@ -0,0 +1,183 @@
+# core_ledger/account_tree.py
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, event, func, select
+from sqlalchemy.orm import Session, attributes
+
+from core_ledger.models.financial_core import Account, AccountType
+from core_ledger.balance_service import BalanceReport
+
+# Index pohon chart of accounts per entitas, di-cache di memori proses.
+# Rollup subtotal hanya butuh satu pass atas saldo per akun mengikuti urutan post-order yang sudah dihitung.
+# Cache tidak valid lagi jika akun ditambah/dinonaktifkan/dipindah parent: lewat hook ORM di proses ini,
+# dan lewat fingerprint (jumlah akun, jumlah akun aktif) untuk perubahan dari proses lain.
+# Subtotal hanya menjumlahkan anak dengan tipe akun & mata uang yang sama dengan parent-nya:
+# saldo aset IDR + kewajiban USD bukan angka yang bermakna dalam satuan mana pun.
+
+
+@dataclass
+class AccountTree:
+    """Struktur chart of accounts satu entitas."""
+    entity_id: uuid.UUID
+    fingerprint: Tuple[int, int]
+    parent: Dict[uuid.UUID, Optional[uuid.UUID]]
+    children: Dict[uuid.UUID, List[uuid.UUID]]
+    roots: List[uuid.UUID]
+    depth: Dict[uuid.UUID, int]
+    # Anak selalu muncul sebelum parent-nya
+    postorder: List[uuid.UUID]
+    # Urutan tampilan: parent lalu anak-anaknya (pre-order)
+    preorder: List[uuid.UUID]
+    active: Dict[uuid.UUID, bool] = field(default_factory=dict)
+    # (tipe akun, mata uang) per akun: hanya anak sejenis yang dijumlahkan ke subtotal parent
+    kind: Dict[uuid.UUID, Tuple[AccountType, str]] = field(default_factory=dict)
+    # Akun tempat siklus parent_account_id diputus (diperlakukan sebagai root agar tetap tampil)
+    cycles: List[uuid.UUID] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class RollupNode:
+    account_id: uuid.UUID
+    depth: int
+    own_balance: int
+    subtotal: int
+    is_leaf: bool
+    # Anak beda tipe akun / mata uang: tampil dengan subtotal sendiri, tidak dijumlahkan ke node ini
+    excluded_children: Tuple[uuid.UUID, ...] = ()
+
+
+def _fingerprint_statement(entity_id: uuid.UUID):
+    # (jumlah akun, jumlah akun aktif): berubah tepat saat akun ditambah atau dinonaktifkan
+    return select(func.count(), func.coalesce(func.sum(case((Account.active_flag == True, 1), else_=0)), 0)).where(
+        Account.entity_id == entity_id)
+
+
+def build_account_tree(db, entity_id: uuid.UUID) -> AccountTree:
+    """
+    Satu query chart of accounts, lalu urutan pre/post-order dihitung sekali (iteratif, tanpa rekursi).
+    Akun yang terjebak siklus parent_account_id tidak terjangkau dari root mana pun: siklusnya diputus di satu
+    akun (dicatat di AccountTree.cycles) yang lalu diperlakukan sebagai root, sehingga tidak ada akun yang hilang.
+    """
+    rows = db.execute(
+        select(Account.account_id, Account.parent_account_id, Account.active_flag,
+               Account.account_type, Account.currency_id)
+        .where(Account.entity_id == entity_id)
+        .order_by(Account.account_type, Account.risk_category, Account.account_id)
+    ).all()
+    parent = {row.account_id: row.parent_account_id for row in rows}
+    active = {row.account_id: row.active_flag for row in rows}
+    kind = {row.account_id: (row.account_type, row.currency_id) for row in rows}
+    children: Dict[uuid.UUID, List[uuid.UUID]] = {account_id: [] for account_id in parent}
+    roots = []
+    for account_id, parent_id in parent.items():
+        # Parent milik entitas lain / tidak dikenal diperlakukan sebagai root
+        if parent_id in children:
+            children[parent_id].append(account_id)
+        else:
+            roots.append(account_id)
+
+    depth, preorder, postorder = {}, [], []
+
+    def walk(tops):
+        stack = [(top, 0, False) for top in reversed(tops)]
+        while stack:
+            account_id, level, expanded = stack.pop()
+            if expanded:
+                postorder.append(account_id)
+                continue
+            depth[account_id] = level
+            preorder.append(account_id)
+            stack.append((account_id, level, True))
+            stack.extend((child, level + 1, False) for child in reversed(children[account_id]))
+
+    walk(roots)
+    cycles = []
+    for account_id in parent:
+        if account_id in depth:
+            continue
+        # Akun tak terjangkau: ikuti parent sampai berulang, akun yang berulang pasti berada di siklus
+        seen, node = set(), account_id
+        while node not in seen:
+            seen.add(node)
+            node = parent[node]
+        children[parent[node]].remove(node)
+        cycles.append(node)
+        roots.append(node)
+        walk([node])
+
+    return AccountTree(
+        entity_id=entity_id,
+        fingerprint=(len(rows), sum(1 for flag in active.values() if flag)),
+        parent=parent, children=children, roots=roots, depth=depth,
+        postorder=postorder, preorder=preorder, active=active, kind=kind, cycles=cycles,
+    )
+
+
+_TREE_CACHE: Dict[uuid.UUID, AccountTree] = {}
+
+
+def invalidate_account_tree(entity_id: Optional[uuid.UUID] = None):
+    """Membuang cache pohon satu entitas (atau semuanya jika entity_id None)."""
+    if entity_id is None:
+        _TREE_CACHE.clear()
+    else:
+        _TREE_CACHE.pop(entity_id, None)
+
+
+def get_account_tree(db, entity_id: uuid.UUID) -> AccountTree:
+    """Pohon dari cache selama fingerprint entitas tidak berubah; dibangun ulang jika berubah."""
+    tree = _TREE_CACHE.get(entity_id)
+    if tree is not None:
+        count, active_count = db.execute(_fingerprint_statement(entity_id)).one()
+        if (count, active_count) == tree.fingerprint:
+            return tree
+    tree = _TREE_CACHE[entity_id] = build_account_tree(db, entity_id)
+    return tree
+
+
+def rollup_balances(tree: AccountTree, report: BalanceReport) -> Dict[uuid.UUID, RollupNode]:
+    """
+    Subtotal di setiap node chart of accounts dalam satu pass post-order:
+    subtotal(node) = saldo akun itu sendiri + subtotal anak yang bertipe akun & bermata uang sama.
+    Anak beda tipe/mata uang tetap punya subtotal sendiri dan dicatat di RollupNode.excluded_children.
+    """
+    own = {bal.account_id: bal.balance for bal in report.accounts()}
+    subtotal: Dict[uuid.UUID, int] = {}
+    excluded: Dict[uuid.UUID, Tuple[uuid.UUID, ...]] = {}
+    for account_id in tree.postorder:
+        children = tree.children[account_id]
+        excluded[account_id] = tuple(c for c in children if tree.kind[c] != tree.kind[account_id])
+        subtotal[account_id] = own.get(account_id, 0) + sum(
+            subtotal[c] for c in children if tree.kind[c] == tree.kind[account_id])
+    return {
+        account_id: RollupNode(
+            account_id=account_id,
+            depth=tree.depth[account_id],
+            own_balance=own.get(account_id, 0),
+            subtotal=subtotal[account_id],
+            is_leaf=not tree.children[account_id],
+            excluded_children=excluded[account_id],
+        )
+        for account_id in tree.preorder
+    }
+
+
+# --- INVALIDASI OTOMATIS (ORM) ---
+
+def _invalidate_changed_charts(session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Account):
+            continue
+        if obj in session.new or any(
+                attributes.get_history(obj, name).has_changes()
+                for name in ("active_flag", "parent_account_id", "account_type", "currency_id")):
+            invalidate_account_tree(obj.entity_id)
+
+
+def register_account_tree_hooks():
+    """Memasang invalidasi cache pohon akun pada seluruh Session ORM (idempotent)."""
+    if not event.contains(Session, "after_flush", _invalidate_changed_charts):
+        event.listen(Session, "after_flush", _invalidate_changed_charts)
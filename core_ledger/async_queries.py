@@ -0,0 +1,69 @@
+# core_ledger/async_queries.py
+
+import asyncio
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from core_ledger.database import AsyncSessionLocal, dispose_async_engine
+from core_ledger.models.financial_core import Entity, AccountType
+from core_ledger.balance_service import (
+    BalanceReport, BalanceSource, account_balance_statement, rows_to_reports,
+)
+
+# Padanan async dari lookup entitas & balance service. Statement SQL yang dipakai identik
+# dengan versi sinkron; yang berbeda hanya cara eksekusinya (AsyncSession).
+
+
+async def find_entity_by_name(db, name: str) -> Optional[Entity]:
+    result = await db.execute(select(Entity).where(Entity.name == name).limit(1))
+    return result.scalars().first()
+
+
+async def get_balances_for_entities_async(db, entity_ids: Iterable[uuid.UUID],
+                                          account_types: Optional[Iterable[AccountType]] = None,
+                                          source: BalanceSource = BalanceSource.PROJECTION) -> Dict[uuid.UUID, BalanceReport]:
+    entity_ids = list(entity_ids)
+    result = await db.execute(account_balance_statement(entity_ids, account_types, source))
+    return rows_to_reports(entity_ids, result.all())
+
+
+async def get_entity_balances_async(db, entity_id: uuid.UUID,
+                                    account_types: Optional[Iterable[AccountType]] = None,
+                                    source: BalanceSource = BalanceSource.PROJECTION) -> BalanceReport:
+    return (await get_balances_for_entities_async(db, [entity_id], account_types, source))[entity_id]
+
+
+async def load_entity_with_balances(name: str, account_types: Optional[Iterable[AccountType]] = None):
+    """
+    Satu panel: entitas + saldo akunnya, dengan AsyncSession sendiri
+    sehingga beberapa panel dapat berjalan bersamaan lewat asyncio.gather.
+    Mengembalikan (entity, BalanceReport) atau (None, None) jika entitas tidak ada.
+    """
+    async with AsyncSessionLocal() as db:
+        entity = await find_entity_by_name(db, name)
+        if entity is None:
+            return None, None
+        report = await get_entity_balances_async(db, entity.entity_id, account_types)
+        return entity, report
+
+
+async def load_entities_with_balances(names: Iterable[str],
+                                      account_types: Optional[Iterable[AccountType]] = None) -> List[tuple]:
+    """Membaca beberapa entitas secara konkuren (satu sesi per entitas)."""
+    return await asyncio.gather(*(load_entity_with_balances(name, account_types) for name in names))
+
+
+def run_async_reads(coro):
+    """
+    Menjalankan coroutine baca dari kode sinkron (script, Streamlit) lalu menutup pool async,
+    karena koneksi aiosqlite/asyncpg tidak boleh dipakai lintas event loop.
+    """
+    async def _runner():
+        try:
+            return await coro
+        finally:
+            await dispose_async_engine()
+
+    return asyncio.run(_runner())
@@ -0,0 +1,187 @@
+# core_ledger/balance_projection.py
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from core_ledger.models.financial_core import AccountBalanceProjection, JournalLine
+
+# Delta per akun: (total_debit, total_credit, line_count)
+LineDelta = Tuple[int, int, int]
+
+projection_table = AccountBalanceProjection.__table__
+
+
+def aggregate_line_deltas(lines: Iterable[Tuple[uuid.UUID, int, int]]) -> Dict[uuid.UUID, LineDelta]:
+    """
+    Mengagregasi (account_id, debit, credit) menjadi satu delta per akun,
+    sehingga satu posting dengan ribuan baris tetap menjadi satu upsert per akun.
+    """
+    deltas: Dict[uuid.UUID, LineDelta] = {}
+    for account_id, debit, credit in lines:
+        d, c, n = deltas.get(account_id, (0, 0, 0))
+        deltas[account_id] = (d + (debit or 0), c + (credit or 0), n + 1)
+    return deltas
+
+
+def apply_line_deltas(connection, deltas: Dict[uuid.UUID, LineDelta]):
+    """
+    Menambahkan delta ke proyeksi account_balances menggunakan koneksi (dan transaksi) pemanggil.
+    SQLite & PostgreSQL memakai INSERT ... ON CONFLICT DO UPDATE; dialek lain memakai UPDATE lalu INSERT.
+    """
+    if not deltas:
+        return
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"account_id": account_id, "total_debit": d, "total_credit": c, "line_count": n, "updated_at": now}
+        for account_id, (d, c, n) in deltas.items()
+    ]
+
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(projection_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[projection_table.c.account_id],
+            set_={
+                "total_debit": projection_table.c.total_debit + stmt.excluded.total_debit,
+                "total_credit": projection_table.c.total_credit + stmt.excluded.total_credit,
+                "line_count": projection_table.c.line_count + stmt.excluded.line_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        connection.execute(stmt, rows)
+        return
+
+    # Fallback generik: UPDATE baris yang sudah ada, INSERT sisanya
+    for row in rows:
+        result = connection.execute(
+            update(projection_table)
+            .where(projection_table.c.account_id == row["account_id"])
+            .values(
+                total_debit=projection_table.c.total_debit + row["total_debit"],
+                total_credit=projection_table.c.total_credit + row["total_credit"],
+                line_count=projection_table.c.line_count + row["line_count"],
+                updated_at=row["updated_at"],
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(projection_table), [row])
+
+
+# --- POSTING HOOK (ORM) ---
+# Setiap flush yang menyisipkan JournalLine juga memperbarui account_balances
+# di dalam transaksi yang sama. Commit gagal = proyeksi ikut di-rollback.
+
+def _guard_posted_lines(session, flush_context, instances):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, JournalLine) and (obj in session.deleted or session.is_modified(obj)):
+            raise ValueError("JournalLine yang sudah diposting bersifat immutable. Gunakan jurnal koreksi (reversal).")
+
+
+def _project_new_lines(session, flush_context):
+    new_lines = [obj for obj in session.new if isinstance(obj, JournalLine)]
+    if not new_lines:
+        return
+    deltas = aggregate_line_deltas((line.account_id, line.debit_amount, line.credit_amount) for line in new_lines)
+    apply_line_deltas(session.connection(), deltas)
+
+
+def register_posting_hooks():
+    """Memasang hook posting pada seluruh Session ORM (idempotent)."""
+    if not event.contains(Session, "before_flush", _guard_posted_lines):
+        event.listen(Session, "before_flush", _guard_posted_lines)
+    if not event.contains(Session, "after_flush", _project_new_lines):
+        event.listen(Session, "after_flush", _project_new_lines)
+
+
+# --- REBUILD & VERIFIKASI ---
+
+def _journal_totals_statement():
+    return (
+        select(
+            JournalLine.account_id,
+            func.sum(JournalLine.debit_amount).label("total_debit"),
+            func.sum(JournalLine.credit_amount).label("total_credit"),
+            func.count().label("line_count"),
+        )
+        .group_by(JournalLine.account_id)
+    )
+
+
+def rebuild_account_balances(db) -> int:
+    """
+    Membangun ulang seluruh proyeksi dari journal_lines (satu INSERT ... SELECT).
+    Mengembalikan jumlah akun yang terproyeksi. Commit diserahkan ke pemanggil.
+    """
+    totals = _journal_totals_statement().subquery()
+    db.execute(delete(projection_table))
+    db.execute(
+        insert(projection_table).from_select(
+            ["account_id", "total_debit", "total_credit", "line_count", "updated_at"],
+            select(totals.c.account_id, totals.c.total_debit, totals.c.total_credit, totals.c.line_count,
+                   func.current_timestamp()),
+        )
+    )
+    return db.execute(select(func.count()).select_from(projection_table)).scalar()
+
+
+@dataclass(frozen=True)
+class ProjectionDrift:
+    """Selisih antara proyeksi account_balances dan hasil rebuild dari journal_lines."""
+    account_id: uuid.UUID
+    projected: LineDelta
+    actual: LineDelta
+
+
+def verify_account_balances(db) -> List[ProjectionDrift]:
+    """
+    Menghitung ulang saldo dari nol dan membandingkannya dengan proyeksi.
+    List kosong berarti proyeksi konsisten dengan ledger.
+    """
+    actual = {
+        row.account_id: (row.total_debit, row.total_credit, row.line_count)
+        for row in db.execute(_journal_totals_statement())
+    }
+    projected = {
+        row.account_id: (row.total_debit, row.total_credit, row.line_count)
+        for row in db.execute(select(projection_table))
+    }
+    zero = (0, 0, 0)
+    drifts = []
+    for account_id in actual.keys() | projected.keys():
+        a = actual.get(account_id, zero)
+        p = projected.get(account_id, zero)
+        if a != p:
+            drifts.append(ProjectionDrift(account_id=account_id, projected=p, actual=a))
+    return drifts
+
+
+if __name__ == "__main__":
+    import sys
+    from core_ledger.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if "--rebuild" in sys.argv:
+            count = rebuild_account_balances(db)
+            db.commit()
+            print(f"[+] Proyeksi account_balances dibangun ulang: {count} akun.")
+
+        drifts = verify_account_balances(db)
+        if not drifts:
+            print("[+] PROYEKSI SALDO KONSISTEN DENGAN JOURNAL LINES.")
+        else:
+            print(f"[!] DRIFT TERDETEKSI PADA {len(drifts)} AKUN:")
+            for drift in drifts:
+                print(f"    - {drift.account_id}: proyeksi (D/K/N)={drift.projected} | ledger={drift.actual}")
+            sys.exit(1)
+    finally:
+        db.close()
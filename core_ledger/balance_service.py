@@ -0,0 +1,181 @@
+# core_ledger/balance_service.py
+
+import enum
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Select, and_, func, select
+
+from core_ledger.models.financial_core import (
+    Account, AccountType, JournalEntry, JournalLine, Ledger, AccountBalanceProjection, AccountBalanceSnapshot,
+)
+
+# Akun bersaldo normal debit. Sisanya (Liability, Equity, Revenue) bersaldo normal kredit.
+DEBIT_NORMAL_TYPES = (AccountType.ASSET, AccountType.EXPENSE)
+
+
+class BalanceSource(enum.Enum):
+    # Proyeksi account_balances: O(jumlah akun), tidak bergantung panjang histori ledger
+    PROJECTION = "projection"
+    # Agregasi langsung dari journal_lines: sumber kebenaran, dipakai untuk verifikasi
+    JOURNAL = "journal"
+    # Snapshot period close terakhir + delta ledger yang masih terbuka: biaya sebanding aktivitas periode
+    PERIOD = "period"
+
+
+@dataclass(frozen=True)
+class AccountBalance:
+    """
+    Saldo satu akun hasil agregasi set-based.
+    Nilai disimpan sebagai total debit & kredit mentah, saldo dihitung sesuai sisi normal akun.
+    """
+    account_id: uuid.UUID
+    entity_id: uuid.UUID
+    account_type: AccountType
+    currency_id: str
+    parent_account_id: Optional[uuid.UUID]
+    risk_category: str
+    liquidity_class: str
+    active_flag: bool
+    total_debit: int
+    total_credit: int
+
+    @property
+    def balance(self) -> int:
+        if self.account_type in DEBIT_NORMAL_TYPES:
+            return self.total_debit - self.total_credit
+        return self.total_credit - self.total_debit
+
+
+@dataclass
+class BalanceReport:
+    """
+    Kumpulan saldo akun satu entitas, dikelompokkan per AccountType.
+    """
+    entity_id: uuid.UUID
+    by_type: Dict[AccountType, List[AccountBalance]] = field(default_factory=dict)
+
+    def accounts(self, *account_types: AccountType) -> List[AccountBalance]:
+        types = account_types or tuple(AccountType)
+        return [bal for t in types for bal in self.by_type.get(t, [])]
+
+    def total(self, *account_types: AccountType) -> int:
+        return sum(bal.balance for bal in self.accounts(*account_types))
+
+
+def _entity_scope(entity_ids):
+    # Daftar UUID, atau subquery SELECT entity_id (mis. seluruh turunan grup dari entity_closure)
+    return entity_ids if isinstance(entity_ids, Select) else list(entity_ids)
+
+
+def account_balance_statement(entity_ids: Iterable[uuid.UUID], account_types: Optional[Iterable[AccountType]] = None,
+                              source: BalanceSource = BalanceSource.PROJECTION):
+    """
+    Membangun SATU query untuk seluruh akun milik entity_ids.
+    PROJECTION membaca account_balances (lookup per akun), JOURNAL mengagregasi journal_lines (GROUP BY akun),
+    PERIOD menjumlahkan snapshot penutupan terakhir dengan journal_lines periode terbuka saja.
+    Keduanya menggantikan pola N+1: dua query SUM per akun.
+    """
+    account_cols = (
+        Account.account_id,
+        Account.entity_id,
+        Account.account_type,
+        Account.currency_id,
+        Account.parent_account_id,
+        Account.risk_category,
+        Account.liquidity_class,
+        Account.active_flag,
+    )
+    if source == BalanceSource.PROJECTION:
+        stmt = (
+            select(
+                *account_cols,
+                func.coalesce(AccountBalanceProjection.total_debit, 0).label("total_debit"),
+                func.coalesce(AccountBalanceProjection.total_credit, 0).label("total_credit"),
+            )
+            .outerjoin(AccountBalanceProjection, AccountBalanceProjection.account_id == Account.account_id)
+            .where(Account.entity_id.in_(_entity_scope(entity_ids)))
+        )
+    elif source == BalanceSource.PERIOD:
+        stmt = _period_statement(entity_ids, account_cols)
+    else:
+        stmt = (
+            select(
+                *account_cols,
+                func.coalesce(func.sum(JournalLine.debit_amount), 0).label("total_debit"),
+                func.coalesce(func.sum(JournalLine.credit_amount), 0).label("total_credit"),
+            )
+            .outerjoin(JournalLine, JournalLine.account_id == Account.account_id)
+            .where(Account.entity_id.in_(_entity_scope(entity_ids)))
+            .group_by(*account_cols)
+        )
+    if account_types is not None:
+        stmt = stmt.where(Account.account_type.in_(list(account_types)))
+    return stmt
+
+
+def _period_statement(entity_ids, account_cols):
+    """
+    Saldo = snapshot ledger tertutup terakhir milik entitas akun + delta dari ledger yang belum dikunci.
+    Snapshot bersifat kumulatif, jadi periode-periode lama tidak pernah dipindai ulang.
+    """
+    latest_closed = (
+        select(Ledger.ledger_id)
+        .where(Ledger.entity_id == Account.entity_id, Ledger.locked_flag == True)
+        .order_by(Ledger.period_end.desc())
+        .limit(1)
+        .correlate(Account)
+        .scalar_subquery()
+    )
+    open_deltas = (
+        select(
+            JournalLine.account_id,
+            func.sum(JournalLine.debit_amount).label("debit"),
+            func.sum(JournalLine.credit_amount).label("credit"),
+        )
+        .join(JournalEntry, JournalEntry.journal_id == JournalLine.journal_id)
+        .join(Ledger, Ledger.ledger_id == JournalEntry.ledger_id)
+        .where(Ledger.entity_id.in_(_entity_scope(entity_ids)), Ledger.locked_flag == False)
+        .group_by(JournalLine.account_id)
+        .subquery()
+    )
+    return (
+        select(
+            *account_cols,
+            (func.coalesce(AccountBalanceSnapshot.total_debit, 0)
+             + func.coalesce(open_deltas.c.debit, 0)).label("total_debit"),
+            (func.coalesce(AccountBalanceSnapshot.total_credit, 0)
+             + func.coalesce(open_deltas.c.credit, 0)).label("total_credit"),
+        )
+        .outerjoin(AccountBalanceSnapshot, and_(AccountBalanceSnapshot.account_id == Account.account_id,
+                                                AccountBalanceSnapshot.ledger_id == latest_closed))
+        .outerjoin(open_deltas, open_deltas.c.account_id == Account.account_id)
+        .where(Account.entity_id.in_(_entity_scope(entity_ids)))
+    )
+
+
+def rows_to_reports(entity_ids: Iterable[uuid.UUID], rows) -> Dict[uuid.UUID, BalanceReport]:
+    """Memetakan baris hasil query agregat menjadi BalanceReport per entitas."""
+    reports = {entity_id: BalanceReport(entity_id=entity_id) for entity_id in entity_ids}
+    for row in rows:
+        bal = AccountBalance(**row._mapping)
+        report = reports.setdefault(bal.entity_id, BalanceReport(entity_id=bal.entity_id))
+        report.by_type.setdefault(bal.account_type, []).append(bal)
+    return reports
+
+
+def get_balances_for_entities(db, entity_ids: Iterable[uuid.UUID],
+                              account_types: Optional[Iterable[AccountType]] = None,
+                              source: BalanceSource = BalanceSource.PROJECTION) -> Dict[uuid.UUID, BalanceReport]:
+    """Saldo seluruh akun untuk sekumpulan entitas dalam satu round trip."""
+    entity_ids = list(entity_ids)
+    rows = db.execute(account_balance_statement(entity_ids, account_types, source)).all()
+    return rows_to_reports(entity_ids, rows)
+
+
+def get_entity_balances(db, entity_id: uuid.UUID,
+                        account_types: Optional[Iterable[AccountType]] = None,
+                        source: BalanceSource = BalanceSource.PROJECTION) -> BalanceReport:
+    """Saldo seluruh akun satu entitas dalam satu round trip."""
+    return get_balances_for_entities(db, [entity_id], account_types, source)[entity_id]
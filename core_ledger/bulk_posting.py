@@ -0,0 +1,265 @@
+# core_ledger/bulk_posting.py
+
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import bindparam, insert, select, update
+
+from core_ledger.models.financial_core import TransactionEvent, JournalEntry, JournalLine
+from core_ledger.balance_projection import aggregate_line_deltas, apply_line_deltas
+from core_ledger.event_chain import EventChainer, create_due_checkpoints
+from core_ledger.period_close import assert_ledgers_open
+
+# Jumlah jurnal per executemany. Cukup besar untuk mengamortisasi round trip,
+# cukup kecil agar parameter set tidak membengkak di memori.
+DEFAULT_CHUNK_SIZE = 5000
+
+
+@dataclass
+class BulkLine:
+    """Satu sisi debit/kredit dari jurnal bulk."""
+    account_id: uuid.UUID
+    debit_amount: int = 0
+    credit_amount: int = 0
+    currency_id: str = "IDR"
+    risk_tag: str = "STANDARD_OPERATIONAL"
+    fx_rate_reference: Optional[str] = None
+
+
+@dataclass
+class BulkEntry:
+    """
+    Satu jurnal lengkap (event + header + lines) untuk posting bulk.
+    Total Debit = Total Credit divalidasi di memori sebelum menyentuh database.
+    """
+    ledger_id: uuid.UUID
+    event_type: str
+    source_system: str
+    authority_signature_hash: str
+    event_hash: str
+    transaction_type: str
+    approval_status: str
+    created_by: str
+    lines: List[BulkLine] = field(default_factory=list)
+    decision_reference_id: Optional[str] = None
+    approved_by: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+    @property
+    def total_debit(self) -> int:
+        return sum(line.debit_amount for line in self.lines)
+
+    @property
+    def total_credit(self) -> int:
+        return sum(line.credit_amount for line in self.lines)
+
+
+@dataclass
+class BulkPostingResult:
+    """event_ids/journal_ids hanya berisi jurnal yang benar-benar baru; event_hash yang sudah tercatat dilewati."""
+    event_ids: List[uuid.UUID]
+    journal_ids: List[uuid.UUID]
+    lines_posted: int
+    elapsed_seconds: float
+    new_event_hashes: List[str] = field(default_factory=list)
+    duplicate_event_hashes: List[str] = field(default_factory=list)
+
+    @property
+    def duplicates_skipped(self) -> int:
+        return len(self.duplicate_event_hashes)
+
+    @property
+    def entries_posted(self) -> int:
+        return len(self.journal_ids)
+
+    @property
+    def entries_per_second(self) -> float:
+        return self.entries_posted / self.elapsed_seconds if self.elapsed_seconds > 0 else float('inf')
+
+
+def validate_entries(entries: Sequence[BulkEntry]):
+    """Validasi double-entry per jurnal, sepenuhnya di memori. Satu pelanggaran menggagalkan seluruh batch."""
+    for i, entry in enumerate(entries):
+        if len(entry.lines) < 2:
+            raise ValueError(f"Jurnal #{i} ({entry.event_hash}) harus memiliki minimal 2 journal line.")
+        for line in entry.lines:
+            if line.debit_amount < 0 or line.credit_amount < 0:
+                raise ValueError(f"Jurnal #{i} ({entry.event_hash}) memiliki nominal negatif.")
+        if entry.total_debit != entry.total_credit:
+            raise ValueError(
+                f"FATAL ERROR: Jurnal #{i} ({entry.event_hash}) tidak seimbang: "
+                f"Debit {entry.total_debit} != Credit {entry.total_credit}."
+            )
+
+
+def _dedupe_batch(entries: Sequence[BulkEntry]) -> Tuple[List[BulkEntry], List[str]]:
+    """event_hash yang muncul lebih dari sekali di batch yang sama: kemunculan pertama yang diposting."""
+    seen: Set[str] = set()
+    unique, duplicates = [], []
+    for entry in entries:
+        if entry.event_hash in seen:
+            duplicates.append(entry.event_hash)
+        else:
+            seen.add(entry.event_hash)
+            unique.append(entry)
+    return unique, duplicates
+
+
+def _insert_events_ignore_duplicates(connection, event_rows: List[dict]) -> Set[uuid.UUID]:
+    """
+    SATU INSERT ... ON CONFLICT (event_hash) DO NOTHING RETURNING event_id per chunk (SQLite & PostgreSQL).
+    Dialek lain: satu SELECT event_hash ... IN (chunk) lalu INSERT biasa.
+    Mengembalikan event_id yang benar-benar tersisipkan.
+    """
+    events_table = TransactionEvent.__table__
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = (
+            dialect_insert(events_table)
+            .on_conflict_do_nothing(index_elements=[events_table.c.event_hash])
+            .returning(events_table.c.event_id)
+        )
+        return set(connection.execute(stmt, event_rows).scalars())
+
+    existing = set(connection.execute(
+        select(events_table.c.event_hash).where(events_table.c.event_hash.in_([row["event_hash"] for row in event_rows]))
+    ).scalars())
+    fresh = [row for row in event_rows if row["event_hash"] not in existing]
+    if fresh:
+        connection.execute(insert(events_table), fresh)
+    return {row["event_id"] for row in fresh}
+
+
+def _relink_events(connection, chainer: EventChainer, heads, event_rows: List[dict]):
+    """
+    Sebagian event di chunk ternyata duplikat: posisi rantai event yang tersisipkan dihitung ulang dari
+    ujung rantai sebelum chunk. Urutan naik aman terhadap ux_transaction_events_ledger_seq (seq hanya turun).
+    """
+    chainer.rewind(heads)
+    events_table = TransactionEvent.__table__
+    for row in event_rows:
+        row.update(chainer.link(row["ledger_id"], row["event_hash"]))
+    connection.execute(
+        update(events_table)
+        .where(events_table.c.event_id == bindparam("b_event_id"))
+        .values(chain_seq=bindparam("chain_seq"), prev_chain_hash=bindparam("prev_chain_hash"),
+                chain_hash=bindparam("chain_hash")),
+        [{"b_event_id": row["event_id"], "chain_seq": row["chain_seq"],
+          "prev_chain_hash": row["prev_chain_hash"], "chain_hash": row["chain_hash"]} for row in event_rows],
+    )
+
+
+def post_journal_batch(db, entries: Sequence[BulkEntry], chunk_size: int = DEFAULT_CHUNK_SIZE) -> BulkPostingResult:
+    """
+    Memposting batch jurnal dalam SATU transaksi menggunakan executemany level Core.
+    UUID dibuat di sisi klien sehingga tidak perlu flush untuk mendapatkan ID.
+    Event disambungkan ke hash chain ledger-nya dan proyeksi account_balances diperbarui di transaksi yang sama.
+    Batch bersifat atomik: gagal satu, seluruh batch di-rollback. Ledger yang sudah ditutup (locked) ditolak.
+
+    Idempoten terhadap event_hash: event yang sudah tercatat (replay feed / retry batch) dilewati beserta
+    jurnalnya lewat INSERT ... ON CONFLICT DO NOTHING, tanpa query pengecekan per event.
+    """
+    validate_entries(entries)
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    entries, duplicate_hashes = _dedupe_batch(entries)
+
+    event_ids: List[uuid.UUID] = []
+    journal_ids: List[uuid.UUID] = []
+    new_hashes: List[str] = []
+    lines_posted = 0
+    deltas = {}
+
+    try:
+        assert_ledgers_open(db.connection(), {entry.ledger_id for entry in entries})
+        chainer = EventChainer(db.connection())
+        for offset in range(0, len(entries), chunk_size):
+            chunk = entries[offset:offset + chunk_size]
+            heads = chainer.snapshot({entry.ledger_id for entry in chunk})
+            event_rows = []
+            for entry in chunk:
+                event_rows.append({
+                    "event_id": uuid.uuid4(),
+                    "event_type": entry.event_type,
+                    "source_system": entry.source_system,
+                    "decision_reference_id": entry.decision_reference_id,
+                    "authority_signature_hash": entry.authority_signature_hash,
+                    "timestamp": entry.timestamp or now,
+                    "event_hash": entry.event_hash,
+                    **chainer.link(entry.ledger_id, entry.event_hash),
+                })
+
+            inserted = _insert_events_ignore_duplicates(db.connection(), event_rows)
+            if len(inserted) < len(event_rows):
+                keep = [i for i, row in enumerate(event_rows) if row["event_id"] in inserted]
+                duplicate_hashes.extend(row["event_hash"] for row in event_rows if row["event_id"] not in inserted)
+                chunk = [chunk[i] for i in keep]
+                event_rows = [event_rows[i] for i in keep]
+                if not event_rows:
+                    chainer.rewind(heads)
+                    continue
+                _relink_events(db.connection(), chainer, heads, event_rows)
+
+            # Header & lines hanya dibangun untuk event yang benar-benar baru
+            journal_rows, line_rows = [], []
+            for entry, event_row in zip(chunk, event_rows):
+                journal_id = uuid.uuid4()
+                journal_rows.append({
+                    "journal_id": journal_id,
+                    "ledger_id": entry.ledger_id,
+                    "event_id": event_row["event_id"],
+                    "transaction_type": entry.transaction_type,
+                    "approval_status": entry.approval_status,
+                    "total_debit": entry.total_debit,
+                    "total_credit": entry.total_credit,
+                    "created_by": entry.created_by,
+                    "approved_by": entry.approved_by,
+                    "created_at": entry.timestamp or now,
+                })
+                for line in entry.lines:
+                    line_rows.append({
+                        "line_id": uuid.uuid4(),
+                        "journal_id": journal_id,
+                        "account_id": line.account_id,
+                        "debit_amount": line.debit_amount,
+                        "credit_amount": line.credit_amount,
+                        "currency_id": line.currency_id,
+                        "fx_rate_reference": line.fx_rate_reference,
+                        "risk_tag": line.risk_tag,
+                    })
+
+            db.execute(insert(JournalEntry.__table__), journal_rows)
+            db.execute(insert(JournalLine.__table__), line_rows)
+            lines_posted += len(line_rows)
+            event_ids.extend(row["event_id"] for row in event_rows)
+            journal_ids.extend(row["journal_id"] for row in journal_rows)
+            new_hashes.extend(row["event_hash"] for row in event_rows)
+
+            for account_id, (d, c, n) in aggregate_line_deltas(
+                    (row["account_id"], row["debit_amount"], row["credit_amount"]) for row in line_rows).items():
+                pd, pc, pn = deltas.get(account_id, (0, 0, 0))
+                deltas[account_id] = (pd + d, pc + c, pn + n)
+
+        apply_line_deltas(db.connection(), deltas)
+        for ledger_id in chainer.ledgers:
+            create_due_checkpoints(db.connection(), ledger_id, chainer.head(ledger_id)[0])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return BulkPostingResult(
+        event_ids=event_ids,
+        journal_ids=journal_ids,
+        lines_posted=lines_posted,
+        elapsed_seconds=time.perf_counter() - started,
+        new_event_hashes=new_hashes,
+        duplicate_event_hashes=duplicate_hashes,
+    )
@@ -1,32 +1,105 @@
 # core_ledger/database.py
 
 import os
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Perbaikan Path Import: Memanggil secara eksplisit dari root project
 from core_ledger.models.financial_core import Base
+from core_ledger.balance_projection import register_posting_hooks
+from core_ledger.event_chain import register_chain_hooks
+from core_ledger.period_close import register_period_hooks
+from core_ledger.entity_hierarchy import register_hierarchy_hooks
+from core_ledger.account_tree import register_account_tree_hooks
+from core_ledger.storage_profile import profile_from_env, create_profiled_engine, create_profiled_async_engine
 
 # Strategi Infrastruktur: Gunakan SQLite untuk ThinkPad X280, 
 # siapkan PostgreSQL untuk Sovereign Cloud Layer 0.
 DATABASE_URL = os.getenv("SAFAR_DB_URL", "sqlite:///./safar_core_local.db")
 
-# Argumen koneksi khusus SQLite (diabaikan jika menggunakan PostgreSQL)
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+# Profil penyimpanan (PRAGMA SQLite & connection pool), dipilih lewat SAFAR_DB_PROFILE
+# dan dapat di-override per parameter (SAFAR_DB_SYNCHRONOUS, SAFAR_DB_POOL_SIZE, dst.)
+STORAGE_PROFILE = profile_from_env()
 
-# Engine deterministik
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# Engine deterministik & session factory dibuat saat pertama dipakai (bukan efek samping import),
+# sehingga CLI yang tidak menyentuh database tidak membayar biaya pembuatan engine
+_engine = None
+_sessionmaker = None
 
-# Session factory yang aman dan terisolasi
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_profiled_engine(DATABASE_URL, STORAGE_PROFILE)
+    return _engine
+
+def SessionLocal():
+    """Session factory yang aman dan terisolasi: mengembalikan Session baru."""
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _sessionmaker()
+
+def __getattr__(name):
+    # Kompatibilitas: `from core_ledger.database import engine` tetap bekerja (engine dibuat saat itu)
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def async_database_url(url: str) -> str:
+    """
+    Menurunkan URL async dari SAFAR_DB_URL: aiosqlite untuk SQLite lokal, asyncpg untuk PostgreSQL.
+    URL yang sudah menyebut driver async dibiarkan apa adanya.
+    """
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect == "sqlite" and scheme != "sqlite+aiosqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if dialect in ("postgresql", "postgres") and scheme != "postgresql+asyncpg":
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("SAFAR_ASYNC_DB_URL", async_database_url(DATABASE_URL))
+
+# Engine async dibuat saat pertama dipakai, sehingga script sinkron tidak butuh aiosqlite/asyncpg
+_async_engine = None
+_async_sessionmaker = None
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_profiled_async_engine(ASYNC_DATABASE_URL, STORAGE_PROFILE)
+    return _async_engine
+
+def AsyncSessionLocal():
+    """Padanan async dari SessionLocal(): mengembalikan AsyncSession baru."""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_sessionmaker = async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker()
+
+# Setiap posting JournalLine memperbarui proyeksi account_balances dalam transaksi yang sama,
+# dan setiap TransactionEvent ber-ledger disambungkan ke hash chain ledger tersebut.
+# JournalEntry ke ledger yang sudah ditutup (period close) ditolak sebelum flush,
+# entity_closure mengikuti setiap Entity baru atau perubahan parent_entity_id,
+# dan cache pohon chart of accounts dibuang saat akun ditambah/dinonaktifkan.
+register_posting_hooks()
+register_chain_hooks()
+register_period_hooks()
+register_hierarchy_hooks()
+register_account_tree_hooks()
 
 def init_db():
     """
     Fungsi ini membaca seluruh metadata dari financial_core.py 
     dan membangun tabel-tabelnya ke dalam database.
     """
-    print("[*] Menghubungkan ke Storage Engine...")
+    from core_ledger.migrations import run_migrations
+
+    print(f"[*] Menghubungkan ke Storage Engine (profil: {STORAGE_PROFILE.name})...")
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    # Index & backfill untuk database yang dibuat sebelum skema terbaru
+    run_migrations(engine)
     print(f"[*] Skema Financial Core berhasil diinisiasi secara deterministik pada: {DATABASE_URL}")
 
 def get_db():
@@ -38,4 +111,20 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Padanan async dari get_db()."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    """
+    Menutup koneksi pool async. Koneksi asyncio terikat pada event loop,
+    jadi pemanggil yang memakai asyncio.run() berulang kali harus memanggil ini di akhir loop.
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_sessionmaker = None
\ No newline at end of file
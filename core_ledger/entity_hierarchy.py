@@ -0,0 +1,250 @@
+# core_ledger/entity_hierarchy.py
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, literal, select, true
+from sqlalchemy.orm import Session, aliased, attributes
+
+from core_ledger.models.financial_core import AccountType, Entity, EntityClosure
+from core_ledger.balance_service import DEBIT_NORMAL_TYPES, BalanceSource, account_balance_statement
+from core_ledger.fx import DEFAULT_REPORTING_CURRENCY, FxRateStore, convert_amounts
+
+# Konsolidasi grup memakai closure table entity_closure: seluruh turunan sebuah entitas
+# didapat dengan satu lookup index (ancestor_id), tanpa menelusuri pohon di Python.
+# Eliminasi transaksi antar-entitas tidak diperlukan: cross-entity mutation hanya lewat settlement engine.
+
+closure_table = EntityClosure.__table__
+
+# Batas kedalaman rekursi saat rebuild, sekaligus pengaman jika data lama mengandung siklus
+MAX_DEPTH = 64
+
+
+def rebuild_entity_closure(db) -> int:
+    """
+    Membangun ulang entity_closure dari Entity.parent_entity_id dengan satu recursive CTE.
+    Bekerja dengan Session maupun Connection; transaksi dikelola pemanggil.
+    """
+    tree = select(
+        Entity.entity_id.label("ancestor_id"),
+        Entity.entity_id.label("descendant_id"),
+        literal(0).label("depth"),
+    ).cte("tree", recursive=True)
+    child = aliased(Entity)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.entity_id, tree.c.depth + 1)
+        .join(child, child.parent_entity_id == tree.c.descendant_id)
+        .where(tree.c.depth < MAX_DEPTH)
+    )
+    db.execute(delete(closure_table))
+    db.execute(insert(closure_table).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth),
+    ))
+    return db.execute(select(func.count()).select_from(closure_table)).scalar()
+
+
+def descendants_statement(root_entity_id: uuid.UUID, include_self: bool = True):
+    """SELECT entity_id seluruh turunan root; dapat langsung dipakai sebagai entity_ids balance service."""
+    stmt = select(closure_table.c.descendant_id).where(closure_table.c.ancestor_id == root_entity_id)
+    if not include_self:
+        stmt = stmt.where(closure_table.c.depth > 0)
+    return stmt
+
+
+# --- PEMELIHARAAN OTOMATIS (ORM) ---
+
+def _link_new_entities(connection, entities: List[Entity]):
+    """Baris closure untuk entitas baru: diri sendiri + seluruh ancestor parent-nya (parent diproses lebih dulu)."""
+    pending = {entity.entity_id: entity for entity in entities}
+    while pending:
+        ready = [e for e in pending.values() if e.parent_entity_id not in pending]
+        for entity in ready:
+            connection.execute(insert(closure_table).values(
+                ancestor_id=entity.entity_id, descendant_id=entity.entity_id, depth=0))
+            if entity.parent_entity_id is not None:
+                connection.execute(insert(closure_table).from_select(
+                    ["ancestor_id", "descendant_id", "depth"],
+                    select(closure_table.c.ancestor_id, literal(entity.entity_id, Entity.entity_id.type),
+                           closure_table.c.depth + 1)
+                    .where(closure_table.c.descendant_id == entity.parent_entity_id),
+                ))
+            del pending[entity.entity_id]
+
+
+def _move_subtree(connection, entity_id: uuid.UUID, new_parent_id: Optional[uuid.UUID]):
+    """Memindahkan subtree entity_id ke parent baru: putus path ke ancestor lama, sambung ke ancestor baru."""
+    subtree = select(closure_table.c.descendant_id).where(closure_table.c.ancestor_id == entity_id)
+    if new_parent_id is not None and connection.execute(
+            subtree.where(closure_table.c.descendant_id == new_parent_id)).first() is not None:
+        raise ValueError(f"Hierarki siklik: {new_parent_id} adalah turunan dari {entity_id}.")
+
+    connection.execute(delete(closure_table).where(
+        closure_table.c.descendant_id.in_(subtree),
+        closure_table.c.ancestor_id.not_in(subtree),
+    ))
+    if new_parent_id is None:
+        return
+    above = closure_table.alias("above")
+    below = closure_table.alias("below")
+    connection.execute(insert(closure_table).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+        .select_from(above.join(below, true()))
+        .where(above.c.descendant_id == new_parent_id, below.c.ancestor_id == entity_id),
+    ))
+
+
+def _maintain_closure(session, flush_context):
+    new_entities = [obj for obj in session.new if isinstance(obj, Entity)]
+    moved = [
+        obj for obj in session.dirty
+        if isinstance(obj, Entity) and attributes.get_history(obj, "parent_entity_id").has_changes()
+    ]
+    if not new_entities and not moved:
+        return
+    connection = session.connection()
+    if new_entities:
+        _link_new_entities(connection, new_entities)
+    for entity in moved:
+        _move_subtree(connection, entity.entity_id, entity.parent_entity_id)
+
+
+def register_hierarchy_hooks():
+    """Memasang pemeliharaan entity_closure pada seluruh Session ORM (idempotent)."""
+    if not event.contains(Session, "after_flush", _maintain_closure):
+        event.listen(Session, "after_flush", _maintain_closure)
+
+
+# --- KONSOLIDASI ---
+
+@dataclass
+class ConsolidatedBalance:
+    """
+    Neraca konsolidasi satu grup (root + seluruh turunannya), per AccountType.
+    by_type[t] = (total_debit, total_credit) seluruh akun grup bertipe t, dalam reporting_currency.
+    """
+    root_entity_id: uuid.UUID
+    reporting_currency: str = DEFAULT_REPORTING_CURRENCY
+    entity_count: int = 0
+    by_type: Dict[AccountType, Tuple[int, int]] = field(default_factory=dict)
+
+    def total(self, *account_types: AccountType) -> int:
+        total = 0
+        for account_type in account_types or tuple(AccountType):
+            debit, credit = self.by_type.get(account_type, (0, 0))
+            total += debit - credit if account_type in DEBIT_NORMAL_TYPES else credit - debit
+        return total
+
+
+def consolidated_balances(db, root_entity_ids: Iterable[uuid.UUID],
+                          account_types: Optional[Iterable[AccountType]] = None,
+                          source: BalanceSource = BalanceSource.PROJECTION,
+                          fx_store: Optional[FxRateStore] = None,
+                          reporting_currency: str = DEFAULT_REPORTING_CURRENCY,
+                          as_of: Optional[date] = None) -> Dict[uuid.UUID, ConsolidatedBalance]:
+    """
+    Neraca konsolidasi untuk beberapa grup dalam SATU query agregat:
+    saldo per akun (balance service, sumber sesuai `source`) di-join ke entity_closure
+    lalu di-GROUP BY (root, tipe akun, mata uang). Grup boleh saling bertumpuk (induk & sub-holding sekaligus).
+    Saldo valuta asing dikonversi ke reporting_currency dengan kurs penutupan `as_of` (vektor NumPy);
+    fx_store wajib jika grup memiliki akun di luar reporting_currency.
+    """
+    import numpy as np
+
+    root_entity_ids = list(root_entity_ids)
+    members = select(closure_table.c.descendant_id).where(closure_table.c.ancestor_id.in_(root_entity_ids))
+    balances = account_balance_statement(members.distinct(), account_types, source).subquery()
+    rows = db.execute(
+        select(
+            closure_table.c.ancestor_id,
+            balances.c.account_type,
+            balances.c.currency_id,
+            func.sum(balances.c.total_debit),
+            func.sum(balances.c.total_credit),
+        )
+        .join(balances, balances.c.entity_id == closure_table.c.descendant_id)
+        .where(closure_table.c.ancestor_id.in_(root_entity_ids))
+        .group_by(closure_table.c.ancestor_id, balances.c.account_type, balances.c.currency_id)
+    ).all()
+
+    debits = np.array([row[3] for row in rows], dtype=np.int64)
+    credits = np.array([row[4] for row in rows], dtype=np.int64)
+    currencies = np.array([row[2] for row in rows], dtype=str)
+    if np.any(currencies != reporting_currency):
+        if fx_store is None:
+            raise ValueError(f"Grup memiliki akun di luar {reporting_currency}: fx_store diperlukan untuk konversi.")
+        as_of = as_of or datetime.now(timezone.utc).date()
+        no_reference = np.full(len(rows), "", dtype=str)
+        debits = convert_amounts(fx_store, debits, currencies, no_reference, reporting_currency, as_of)
+        credits = convert_amounts(fx_store, credits, currencies, no_reference, reporting_currency, as_of)
+
+    reports = {root: ConsolidatedBalance(root_entity_id=root, reporting_currency=reporting_currency)
+               for root in root_entity_ids}
+    for row, debit, credit in zip(rows, debits.tolist(), credits.tolist()):
+        root, account_type = row[0], row[1]
+        if not isinstance(account_type, AccountType):
+            account_type = AccountType[account_type]
+        prev_debit, prev_credit = reports[root].by_type.get(account_type, (0, 0))
+        reports[root].by_type[account_type] = (prev_debit + debit, prev_credit + credit)
+
+    counts = db.execute(
+        select(closure_table.c.ancestor_id, func.count())
+        .where(closure_table.c.ancestor_id.in_(root_entity_ids))
+        .group_by(closure_table.c.ancestor_id)
+    )
+    for root, count in counts:
+        reports[root].entity_count = count
+    return reports
+
+
+def consolidated_capital(db, root_entity_id: uuid.UUID, source: BalanceSource = BalanceSource.PROJECTION,
+                         fx_store: Optional[FxRateStore] = None) -> int:
+    """Modal inti grup: total Equity seluruh entitas di bawah root (termasuk root), dalam mata uang pelaporan."""
+    report = consolidated_balances(db, [root_entity_id], [AccountType.EQUITY], source, fx_store)[root_entity_id]
+    return report.total(AccountType.EQUITY)
+
+
+if __name__ == "__main__":
+    import argparse
+    from core_ledger.database import SessionLocal, engine
+    from core_ledger.fx import get_rate_store
+
+    parser = argparse.ArgumentParser(description="Neraca konsolidasi grup entitas.")
+    parser.add_argument("--root", default="Ujung Langit Foundation", help="Nama entitas induk grup")
+    parser.add_argument("--rebuild", action="store_true", help="Bangun ulang entity_closure dari parent_entity_id")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            count = rebuild_entity_closure(db)
+            db.commit()
+            print(f"[+] entity_closure dibangun ulang: {count} baris.")
+
+        root = db.query(Entity).filter(Entity.name == args.root).first()
+        if not root:
+            raise SystemExit(f"[!] Entitas '{args.root}' tidak ditemukan.")
+
+        members = db.execute(
+            select(Entity.name, closure_table.c.depth)
+            .join(closure_table, closure_table.c.descendant_id == Entity.entity_id)
+            .where(closure_table.c.ancestor_id == root.entity_id)
+            .order_by(closure_table.c.depth, Entity.name)
+        ).all()
+        report = consolidated_balances(db, [root.entity_id], fx_store=get_rate_store(engine))[root.entity_id]
+
+        print("=" * 60)
+        print(f"    NERACA KONSOLIDASI GRUP: {root.name.upper()}")
+        print("=" * 60)
+        for name, depth in members:
+            print(f"    {'  ' * depth}- {name}")
+        print("-" * 60)
+        for account_type in AccountType:
+            print(f"[*] {account_type.value:<10}: {report.total(account_type):,} {report.reporting_currency}")
+        print(f"[*] Entitas dalam grup : {report.entity_count}")
+        print("=" * 60)
+    finally:
+        db.close()
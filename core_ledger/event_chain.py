@@ -0,0 +1,354 @@
+# core_ledger/event_chain.py
+
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session
+
+from core_ledger.models.financial_core import Ledger, LedgerCheckpoint, TransactionEvent
+
+# Jumlah event per checkpoint Merkle. Inclusion proof membaca paling banyak sejumlah ini
+# chain_hash, dan verifikasi inkremental cukup dimulai dari checkpoint terakhir.
+CHECKPOINT_INTERVAL = 1024
+
+events_table = TransactionEvent.__table__
+checkpoints_table = LedgerCheckpoint.__table__
+
+
+# --- PRIMITIF KRIPTOGRAFI ---
+
+def compute_chain_hash(prev_chain_hash: str, event_hash: str) -> str:
+    return hashlib.sha256(f"{prev_chain_hash}{event_hash}".encode()).hexdigest()
+
+
+def _leaf(chain_hash: str) -> bytes:
+    # Prefix 0x00/0x01 memisahkan domain leaf dan node (mencegah second-preimage pada pohon)
+    return hashlib.sha256(b"\x00" + bytes.fromhex(chain_hash)).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _next_level(level: List[bytes]) -> List[bytes]:
+    # Node tanpa pasangan naik apa adanya (tidak diduplikasi)
+    return [_node(level[i], level[i + 1]) if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)]
+
+
+def merkle_root(chain_hashes: List[str]) -> str:
+    if not chain_hashes:
+        raise ValueError("Merkle root membutuhkan minimal satu event.")
+    level = [_leaf(h) for h in chain_hashes]
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+
+def merkle_proof(chain_hashes: List[str], index: int) -> List[Tuple[str, str]]:
+    """Jalur audit dari leaf ke root: daftar (hash saudara, 'L'/'R' posisi saudara)."""
+    level = [_leaf(h) for h in chain_hashes]
+    path = []
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append((level[sibling].hex(), "L" if sibling < index else "R"))
+        level = _next_level(level)
+        index //= 2
+    return path
+
+
+def verify_merkle_proof(chain_hash: str, path: List[Tuple[str, str]], root: str) -> bool:
+    node = _leaf(chain_hash)
+    for sibling_hex, side in path:
+        sibling = bytes.fromhex(sibling_hex)
+        node = _node(sibling, node) if side == "L" else _node(node, sibling)
+    return node.hex() == root
+
+
+# --- PENYAMBUNGAN EVENT BARU ---
+
+class EventChainer:
+    """
+    Menyambungkan event baru ke ujung rantai hash ledger-nya.
+    Satu instance per transaksi: ujung rantai dibaca sekali per ledger lalu dilanjutkan di memori.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+        self._heads: Dict[uuid.UUID, Tuple[int, str]] = {}
+
+    def head(self, ledger_id: uuid.UUID) -> Tuple[int, str]:
+        if ledger_id not in self._heads:
+            row = self.connection.execute(
+                select(events_table.c.chain_seq, events_table.c.chain_hash)
+                .where(events_table.c.ledger_id == ledger_id, events_table.c.chain_seq.is_not(None))
+                .order_by(events_table.c.chain_seq.desc())
+                .limit(1)
+            ).first()
+            if row is None:
+                # Rantai dimulai dari opening_balance_hash: event terikat ke state pembukaan ledger
+                opening = self.connection.execute(
+                    select(Ledger.opening_balance_hash).where(Ledger.ledger_id == ledger_id)
+                ).scalar()
+                if opening is None:
+                    raise ValueError(f"Ledger {ledger_id} tidak ditemukan.")
+                row = (0, opening)
+            self._heads[ledger_id] = (row[0], row[1])
+        return self._heads[ledger_id]
+
+    def link(self, ledger_id: uuid.UUID, event_hash: str) -> dict:
+        seq, prev = self.head(ledger_id)
+        chain_hash = compute_chain_hash(prev, event_hash)
+        self._heads[ledger_id] = (seq + 1, chain_hash)
+        return {"ledger_id": ledger_id, "chain_seq": seq + 1, "prev_chain_hash": prev, "chain_hash": chain_hash}
+
+    @property
+    def ledgers(self):
+        return list(self._heads)
+
+    def snapshot(self, ledger_ids) -> Dict[uuid.UUID, Tuple[int, str]]:
+        """
+        Posisi ujung rantai ledger_ids sebelum event berikutnya disisipkan; dipakai untuk menyambung ulang
+        jika sebagian event batal disisipkan. Ujung rantai dibaca dari database lebih dulu bila belum dikenal.
+        """
+        for ledger_id in ledger_ids:
+            self.head(ledger_id)
+        return dict(self._heads)
+
+    def rewind(self, heads: Dict[uuid.UUID, Tuple[int, str]]):
+        self._heads = dict(heads)
+
+
+def _last_checkpoint_seq(connection, ledger_id: uuid.UUID) -> int:
+    return connection.execute(
+        select(checkpoints_table.c.seq_to)
+        .where(checkpoints_table.c.ledger_id == ledger_id)
+        .order_by(checkpoints_table.c.seq_to.desc())
+        .limit(1)
+    ).scalar() or 0
+
+
+def _chain_hashes(connection, ledger_id: uuid.UUID, seq_from: int, seq_to: int) -> List[str]:
+    return list(connection.execute(
+        select(events_table.c.chain_hash)
+        .where(events_table.c.ledger_id == ledger_id,
+               events_table.c.chain_seq >= seq_from, events_table.c.chain_seq <= seq_to)
+        .order_by(events_table.c.chain_seq)
+    ).scalars())
+
+
+def create_due_checkpoints(connection, ledger_id: uuid.UUID, head_seq: int,
+                           interval: int = CHECKPOINT_INTERVAL, force: bool = False) -> int:
+    """
+    Menulis checkpoint untuk setiap blok penuh `interval` event yang belum ter-checkpoint.
+    force=True juga menutup sisa blok yang belum penuh (dipakai saat period close).
+    """
+    created = 0
+    last = _last_checkpoint_seq(connection, ledger_id)
+    while head_seq - last >= interval or (force and head_seq > last):
+        seq_to = min(last + interval, head_seq)
+        hashes = _chain_hashes(connection, ledger_id, last + 1, seq_to)
+        connection.execute(insert(checkpoints_table).values(
+            checkpoint_id=uuid.uuid4(), ledger_id=ledger_id, seq_from=last + 1, seq_to=seq_to,
+            merkle_root=merkle_root(hashes), last_chain_hash=hashes[-1],
+        ))
+        last = seq_to
+        created += 1
+    return created
+
+
+# --- POSTING HOOK (ORM) ---
+
+def _chain_new_events(session, flush_context, instances):
+    new_events = [obj for obj in session.new
+                  if isinstance(obj, TransactionEvent) and obj.ledger_id is not None and obj.chain_seq is None]
+    if not new_events:
+        return
+    chainer = EventChainer(session.connection())
+    for obj in new_events:
+        for key, value in chainer.link(obj.ledger_id, obj.event_hash).items():
+            setattr(obj, key, value)
+    session.info.setdefault("chained_ledgers", {}).update(chainer._heads)
+
+
+def _checkpoint_chained_ledgers(session, flush_context):
+    heads = session.info.pop("chained_ledgers", None)
+    for ledger_id, (seq, _) in (heads or {}).items():
+        create_due_checkpoints(session.connection(), ledger_id, seq)
+
+
+def register_chain_hooks():
+    """Memasang hook hash chain pada seluruh Session ORM (idempotent)."""
+    if not event.contains(Session, "before_flush", _chain_new_events):
+        event.listen(Session, "before_flush", _chain_new_events)
+    if not event.contains(Session, "after_flush", _checkpoint_chained_ledgers):
+        event.listen(Session, "after_flush", _checkpoint_chained_ledgers)
+
+
+# --- BACKFILL EVENT LAMA ---
+
+def chain_unlinked_events(connection, ledger_id: uuid.UUID, events: List[Tuple[uuid.UUID, str]]) -> int:
+    """Menyambungkan event lama (event_id, event_hash) yang belum punya chain ke rantai ledger, sesuai urutan."""
+    chainer = EventChainer(connection)
+    for event_id, event_hash in events:
+        connection.execute(
+            events_table.update().where(events_table.c.event_id == event_id)
+            .values(**chainer.link(ledger_id, event_hash))
+        )
+    if events:
+        create_due_checkpoints(connection, ledger_id, chainer.head(ledger_id)[0])
+    return len(events)
+
+
+# --- INCLUSION PROOF ---
+
+@dataclass
+class InclusionProof:
+    event_id: uuid.UUID
+    ledger_id: uuid.UUID
+    chain_seq: int
+    chain_hash: str
+    merkle_root: str
+    path: List[Tuple[str, str]]
+
+    def verify(self) -> bool:
+        return verify_merkle_proof(self.chain_hash, self.path, self.merkle_root)
+
+
+def inclusion_proof(db, event_id: uuid.UUID) -> Optional[InclusionProof]:
+    """
+    Bukti bahwa event termasuk dalam checkpoint ledger-nya: O(log n) hash saudara.
+    None jika event belum tercakup checkpoint mana pun.
+    """
+    ev = db.execute(
+        select(events_table.c.ledger_id, events_table.c.chain_seq, events_table.c.chain_hash)
+        .where(events_table.c.event_id == event_id)
+    ).first()
+    if ev is None or ev.chain_seq is None:
+        return None
+    cp = db.execute(
+        select(checkpoints_table)
+        .where(checkpoints_table.c.ledger_id == ev.ledger_id,
+               checkpoints_table.c.seq_from <= ev.chain_seq, checkpoints_table.c.seq_to >= ev.chain_seq)
+    ).first()
+    if cp is None:
+        return None
+    hashes = _chain_hashes(db, ev.ledger_id, cp.seq_from, cp.seq_to)
+    return InclusionProof(
+        event_id=event_id, ledger_id=ev.ledger_id, chain_seq=ev.chain_seq, chain_hash=ev.chain_hash,
+        merkle_root=cp.merkle_root, path=merkle_proof(hashes, ev.chain_seq - cp.seq_from),
+    )
+
+
+# --- VERIFIKASI RANTAI ---
+
+@dataclass
+class ChainVerification:
+    ledger_id: uuid.UUID
+    start_seq: int
+    events_verified: int = 0
+    checkpoints_verified: int = 0
+    elapsed_seconds: float = 0.0
+    violations: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events_verified / self.elapsed_seconds if self.elapsed_seconds > 0 else float('inf')
+
+
+def verify_ledger_chain(db, ledger_id: uuid.UUID, incremental: bool = True, batch_size: int = 10000) -> ChainVerification:
+    """
+    Menghitung ulang chain_hash dan Merkle root setiap checkpoint, secara streaming.
+    incremental=True mulai dari checkpoint terakhir (dipercaya sebagai jangkar) sehingga
+    hanya event setelahnya yang di-hash ulang; incremental=False memverifikasi sejak genesis.
+    """
+    started = time.perf_counter()
+    checkpoints = {
+        cp.seq_to: cp for cp in db.execute(
+            select(checkpoints_table).where(checkpoints_table.c.ledger_id == ledger_id)
+            .order_by(checkpoints_table.c.seq_to))
+    }
+    if incremental and checkpoints:
+        anchor = checkpoints[max(checkpoints)]
+        seq, prev = anchor.seq_to, anchor.last_chain_hash
+    else:
+        seq = 0
+        prev = db.execute(select(Ledger.opening_balance_hash).where(Ledger.ledger_id == ledger_id)).scalar()
+
+    report = ChainVerification(ledger_id=ledger_id, start_seq=seq)
+    block: List[str] = []
+    block_from = seq + 1
+
+    rows = db.execute(
+        select(events_table.c.event_id, events_table.c.chain_seq, events_table.c.event_hash,
+               events_table.c.prev_chain_hash, events_table.c.chain_hash)
+        .where(events_table.c.ledger_id == ledger_id, events_table.c.chain_seq > seq)
+        .order_by(events_table.c.chain_seq)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        if row.chain_seq != seq + 1:
+            report.violations.append(f"Celah rantai: seq {seq + 1} hilang sebelum seq {row.chain_seq}.")
+        expected = compute_chain_hash(prev, row.event_hash)
+        if row.prev_chain_hash != prev or row.chain_hash != expected:
+            report.violations.append(f"Event {row.event_id} (seq {row.chain_seq}): chain_hash tidak cocok.")
+        seq, prev = row.chain_seq, row.chain_hash
+        block.append(row.chain_hash)
+        report.events_verified += 1
+
+        cp = checkpoints.get(seq)
+        if cp is not None:
+            if cp.seq_from != block_from or merkle_root(block) != cp.merkle_root or cp.last_chain_hash != prev:
+                report.violations.append(f"Checkpoint seq {cp.seq_from}-{cp.seq_to}: Merkle root tidak cocok.")
+            report.checkpoints_verified += 1
+            block, block_from = [], seq + 1
+
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from core_ledger.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Verifikasi hash chain & Merkle checkpoint ledger.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify_cmd = sub.add_parser("verify")
+    verify_cmd.add_argument("--ledger", help="ledger_id (default: semua ledger)")
+    verify_cmd.add_argument("--full", action="store_true", help="Verifikasi sejak genesis, bukan sejak checkpoint terakhir")
+    prove_cmd = sub.add_parser("prove")
+    prove_cmd.add_argument("event_id")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "prove":
+            proof = inclusion_proof(db, uuid.UUID(args.event_id))
+            if proof is None:
+                print("[!] Event belum tercakup checkpoint mana pun.")
+                raise SystemExit(1)
+            print(f"[*] Event #{proof.chain_seq} | Merkle root: {proof.merkle_root}")
+            print(f"[*] Panjang jalur audit: {len(proof.path)} hash")
+            print("[+] INCLUSION PROOF VALID." if proof.verify() else "[!] INCLUSION PROOF TIDAK VALID!")
+            raise SystemExit(0 if proof.verify() else 1)
+
+        ledger_ids = [uuid.UUID(args.ledger)] if args.ledger else list(db.execute(select(Ledger.ledger_id)).scalars())
+        failed = False
+        for ledger_id in ledger_ids:
+            result = verify_ledger_chain(db, ledger_id, incremental=not args.full)
+            status = "[+] UTUH" if result.ok else "[!] TERKOMPROMI"
+            print(f"{status} Ledger {ledger_id}: {result.events_verified:,} event sejak seq {result.start_seq}, "
+                  f"{result.checkpoints_verified} checkpoint, {result.events_per_second:,.0f} events/sec")
+            for violation in result.violations[:20]:
+                print(f"    - {violation}")
+            failed = failed or not result.ok
+        raise SystemExit(1 if failed else 0)
+    finally:
+        db.close()
@@ -0,0 +1,267 @@
+# core_ledger/fx.py
+
+import uuid
+import weakref
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from core_ledger.models.financial_core import AccountType, FxRate, JournalEntry, JournalLine
+from core_ledger.balance_service import DEBIT_NORMAL_TYPES, BalanceReport
+
+# Store kurs lokal (tabel fx_rates) dengan cache LRU di memori proses.
+# Konversi laporan: kurs di-resolve sekali per (mata uang, referensi) unik lalu seluruh
+# jumlah dikonversi dalam satu operasi NumPy, bukan aritmetika per baris di Python.
+# Hanya kurs yang ditemukan yang di-cache. Kurs yang dicatat lewat record_rate membuang cache seluruh store
+# di proses ini begitu transaksinya di-commit; kurs dari proses lain baru terlihat setelah FxRateStore.clear().
+
+DEFAULT_REPORTING_CURRENCY = "IDR"
+DEFAULT_CACHE_SIZE = 4096
+
+def record_rate(db, base_currency: str, quote_currency: str, rate: float, rate_date: date,
+                reference: Optional[str] = None, source: str = "MANUAL") -> FxRate:
+    """
+    Mencatat kurs baru. Satu pasangan hanya punya satu kurs per tanggal (ux_fx_rates_pair_date).
+    Setelah db di-commit, cache seluruh FxRateStore di proses ini dibuang (lihat _invalidate_after_commit).
+    """
+    if rate <= 0:
+        raise ValueError(f"Kurs {base_currency}/{quote_currency} harus positif.")
+    fx_rate = FxRate(base_currency=base_currency, quote_currency=quote_currency, rate=rate,
+                     rate_date=rate_date, reference=reference, source=source)
+    db.add(fx_rate)
+    db.info["fx_rates_changed"] = True
+    if not event.contains(Session, "after_commit", _invalidate_after_commit):
+        event.listen(Session, "after_commit", _invalidate_after_commit)
+    return fx_rate
+
+
+def _invalidate_after_commit(session):
+    # Kurs baru bisa menggantikan hasil lookup yang sudah di-cache untuk tanggal yang sama atau sesudahnya
+    if session.info.pop("fx_rates_changed", False):
+        invalidate_rate_stores()
+
+
+class _RateNotFound(LookupError):
+    """Kurs tidak ditemukan di fx_rates (dilempar dari loader agar tidak di-cache oleh lru_cache)."""
+
+
+class FxRateStore:
+    """
+    Resolusi kurs terhadap satu mata uang pelaporan, dengan cache LRU per instance.
+    Kurs pasangan langsung dipakai apa adanya, pasangan terbalik di-invers.
+    Kurs yang tidak ditemukan tidak di-cache: kurs yang dicatat kemudian langsung terlihat.
+    """
+
+    def __init__(self, bind, maxsize: int = DEFAULT_CACHE_SIZE):
+        # bind: Engine (koneksi dibuka per cache miss; dipegang lewat weakref agar store per engine
+        # tidak menahan engine tetap hidup) atau Session/Connection milik pemanggil
+        self._engine = weakref.ref(bind) if isinstance(bind, Engine) else None
+        self.bind = bind if self._engine is None else None
+        self._rate_on = lru_cache(maxsize=maxsize)(self._load_rate_on)
+        self._rate_by_reference = lru_cache(maxsize=maxsize)(self._load_rate_by_reference)
+
+    def _execute(self, stmt):
+        if self._engine is not None:
+            engine = self._engine()
+            if engine is None:
+                raise RuntimeError("Engine FxRateStore sudah di-dispose.")
+            with engine.connect() as connection:
+                return connection.execute(stmt).first()
+        return self.bind.execute(stmt).first()
+
+    def _load_rate_on(self, base: str, quote: str, on: date) -> Optional[float]:
+        row = self._execute(
+            select(FxRate.base_currency, FxRate.rate)
+            .where(
+                ((FxRate.base_currency == base) & (FxRate.quote_currency == quote))
+                | ((FxRate.base_currency == quote) & (FxRate.quote_currency == base)),
+                FxRate.rate_date <= on,
+            )
+            .order_by(FxRate.rate_date.desc(), (FxRate.base_currency == base).desc())
+            .limit(1)
+        )
+        if row is None:
+            raise _RateNotFound
+        return row.rate if row.base_currency == base else 1.0 / row.rate
+
+    def _load_rate_by_reference(self, reference: str) -> Tuple[str, str, float]:
+        row = self._execute(
+            select(FxRate.base_currency, FxRate.quote_currency, FxRate.rate).where(FxRate.reference == reference)
+        )
+        if row is None:
+            raise _RateNotFound
+        return tuple(row)
+
+    def rate(self, currency: str, reporting_currency: str, on: date, reference: Optional[str] = None) -> float:
+        """Kurs 1 unit `currency` dalam `reporting_currency`; fx_rate_reference diutamakan jika ada."""
+        if currency == reporting_currency:
+            return 1.0
+        if reference:
+            try:
+                base, quote, rate = self._rate_by_reference(reference)
+            except _RateNotFound:
+                raise ValueError(f"fx_rate_reference '{reference}' tidak ditemukan di fx_rates.") from None
+            if (base, quote) == (currency, reporting_currency):
+                return rate
+            if (base, quote) == (reporting_currency, currency):
+                return 1.0 / rate
+            raise ValueError(f"fx_rate_reference '{reference}' adalah kurs {base}/{quote}, "
+                             f"bukan {currency}/{reporting_currency}.")
+        try:
+            return self._rate_on(currency, reporting_currency, on)
+        except _RateNotFound:
+            raise ValueError(f"Tidak ada kurs {currency}/{reporting_currency} pada atau sebelum {on}.") from None
+
+    def rates(self, keys: Iterable[Tuple[str, Optional[str]]], reporting_currency: str, on: date) -> np.ndarray:
+        """Vektor kurs untuk deretan (currency, reference)."""
+        return np.array([self.rate(currency, reporting_currency, on, reference) for currency, reference in keys],
+                        dtype=np.float64)
+
+    def clear(self):
+        """
+        Membuang seluruh kurs yang di-cache. Otomatis untuk record_rate di proses ini; perlu dipanggil manual
+        setelah kurs dicatat atau dikoreksi oleh proses lain atau lewat SQL langsung.
+        """
+        self._rate_on.cache_clear()
+        self._rate_by_reference.cache_clear()
+
+    def cache_info(self):
+        return {"rate_on": self._rate_on.cache_info(), "by_reference": self._rate_by_reference.cache_info()}
+
+
+def convert_amounts(store: FxRateStore, amounts: np.ndarray, currencies: np.ndarray, references: np.ndarray,
+                    reporting_currency: str, on: date) -> np.ndarray:
+    """
+    Konversi vektor jumlah (unit terkecil, int64) ke mata uang pelaporan.
+    Kurs di-resolve sekali per pasangan (currency, reference) unik, lalu dibroadcast via indeks invers.
+    """
+    if len(amounts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    # Pemisah \x1f (unit separator): tidak muncul di kode mata uang/referensi dan tidak dipangkas NumPy
+    keys = np.char.add(np.char.add(currencies.astype(str), "\x1f"), references.astype(str))
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    pairs = [key.split("\x1f") for key in unique_keys.tolist()]
+    unique_rates = store.rates([(currency, reference or None) for currency, reference in pairs],
+                               reporting_currency, on)
+    return np.rint(amounts.astype(np.float64) * unique_rates[inverse]).astype(np.int64)
+
+
+# --- LAPORAN TERKONVERSI ---
+
+@dataclass
+class ConvertedReport:
+    """BalanceReport satu entitas setelah dikonversi ke mata uang pelaporan (saldo sisi normal akun)."""
+    entity_id: uuid.UUID
+    reporting_currency: str
+    as_of: date
+    balances: Dict[uuid.UUID, int] = field(default_factory=dict)
+    account_types: Dict[uuid.UUID, AccountType] = field(default_factory=dict)
+
+    def total(self, *account_types: AccountType) -> int:
+        types = account_types or tuple(AccountType)
+        return sum(value for account_id, value in self.balances.items() if self.account_types[account_id] in types)
+
+
+def convert_report(db, report: BalanceReport, store: FxRateStore,
+                   reporting_currency: str = DEFAULT_REPORTING_CURRENCY,
+                   as_of: Optional[date] = None) -> ConvertedReport:
+    """
+    Mengonversi saldo akun ke mata uang pelaporan.
+    Akun dalam mata uang pelaporan dipakai langsung dari report. Akun valuta asing dihitung ulang
+    dari journal_lines per (akun, currency_id, fx_rate_reference) sehingga baris dengan kurs transaksi
+    dikonversi dengan kurs itu, sisanya dengan kurs penutupan per `as_of`.
+    Hanya jurnal dengan created_at sampai akhir hari `as_of` yang dihitung; untuk laporan tanggal lampau,
+    `report` sebaiknya juga saldo per tanggal itu (point_in_time.get_entity_balances_as_of).
+    """
+    as_of = as_of or datetime.now(timezone.utc).date()
+    day_end = datetime.combine(as_of + timedelta(days=1), time.min)
+    converted = ConvertedReport(entity_id=report.entity_id, reporting_currency=reporting_currency, as_of=as_of)
+    accounts = report.accounts()
+    foreign_ids = []
+    for bal in accounts:
+        converted.account_types[bal.account_id] = bal.account_type
+        if bal.currency_id == reporting_currency:
+            converted.balances[bal.account_id] = bal.balance
+        else:
+            foreign_ids.append(bal.account_id)
+    if not foreign_ids:
+        return converted
+
+    rows = db.execute(
+        select(
+            JournalLine.account_id,
+            JournalLine.currency_id,
+            func.coalesce(JournalLine.fx_rate_reference, ""),
+            func.sum(JournalLine.debit_amount) - func.sum(JournalLine.credit_amount),
+        )
+        .join(JournalEntry, JournalEntry.journal_id == JournalLine.journal_id)
+        .where(JournalLine.account_id.in_(foreign_ids), JournalEntry.created_at < day_end)
+        .group_by(JournalLine.account_id, JournalLine.currency_id, JournalLine.fx_rate_reference)
+    ).all()
+    index = {account_id: i for i, account_id in enumerate(foreign_ids)}
+    net = np.zeros(len(foreign_ids), dtype=np.int64)
+    if rows:
+        account_idx = np.fromiter((index[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+        currencies = np.array([row[1] for row in rows])
+        references = np.array([row[2] for row in rows])
+        amounts = np.fromiter((row[3] for row in rows), dtype=np.int64, count=len(rows))
+        np.add.at(net, account_idx, convert_amounts(store, amounts, currencies, references, reporting_currency, as_of))
+
+    for account_id, value in zip(foreign_ids, net.tolist()):
+        sign = 1 if converted.account_types[account_id] in DEBIT_NORMAL_TYPES else -1
+        converted.balances[account_id] = sign * value
+    return converted
+
+
+_STORES: "weakref.WeakKeyDictionary[Engine, FxRateStore]" = weakref.WeakKeyDictionary()
+
+
+def invalidate_rate_stores():
+    """Membuang cache kurs seluruh FxRateStore milik get_rate_store di proses ini."""
+    for store in list(_STORES.values()):
+        store.clear()
+
+
+def get_rate_store(engine) -> FxRateStore:
+    """Satu FxRateStore (dan cache LRU-nya) per engine untuk seluruh proses."""
+    store = _STORES.get(engine)
+    if store is None:
+        store = _STORES[engine] = FxRateStore(engine)
+    return store
+
+
+if __name__ == "__main__":
+    import argparse
+    from core_ledger.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Store kurs valuta (fx_rates).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    set_cmd = sub.add_parser("set", help="Catat kurs: 1 BASE = RATE QUOTE")
+    set_cmd.add_argument("base")
+    set_cmd.add_argument("quote")
+    set_cmd.add_argument("rate", type=float)
+    set_cmd.add_argument("--date", type=date.fromisoformat, default=None)
+    set_cmd.add_argument("--reference", default=None, help="Kode kurs untuk JournalLine.fx_rate_reference")
+    list_cmd = sub.add_parser("list", help="Tampilkan kurs terakhir per pasangan")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "set":
+            fx_rate = record_rate(db, args.base.upper(), args.quote.upper(), args.rate,
+                                  args.date or datetime.now(timezone.utc).date(), args.reference)
+            db.commit()
+            print(f"[+] 1 {fx_rate.base_currency} = {fx_rate.rate:,} {fx_rate.quote_currency} "
+                  f"(berlaku {fx_rate.rate_date}, ref: {fx_rate.reference or '-'})")
+        else:
+            for fx_rate in db.query(FxRate).order_by(FxRate.base_currency, FxRate.quote_currency, FxRate.rate_date):
+                print(f"    {fx_rate.rate_date}  1 {fx_rate.base_currency} = {fx_rate.rate:,} {fx_rate.quote_currency}"
+                      f"  ref: {fx_rate.reference or '-'}")
+    finally:
+        db.close()
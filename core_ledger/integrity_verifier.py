@@ -0,0 +1,298 @@
+# core_ledger/integrity_verifier.py
+
+import json
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, type_coerce
+from sqlalchemy.types import NullType
+
+from core_ledger.models.financial_core import Account, AccountType, JournalEntry, JournalLine
+
+# Verifier independen dari proyeksi & snapshot: seluruh pemeriksaan dihitung ulang dari
+# journal_entries + journal_lines, dibaca secara streaming (yield_per) sehingga memori
+# per worker dibatasi oleh chunk_size, bukan oleh ukuran ledger.
+
+DEFAULT_CHUNK_SIZE = 20000
+MAX_VIOLATIONS_PER_PARTITION = 10000
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Unit kerja satu worker: satu ledger, opsional dibatasi rentang created_at [start, end)."""
+    ledger_id: uuid.UUID
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+
+@dataclass
+class PartitionReport:
+    partition: Partition
+    entries_checked: int = 0
+    lines_checked: int = 0
+    violation_count: int = 0
+    violations: List[dict] = field(default_factory=list)
+    # (entity_id mentah, nama AccountType) -> [total_debit, total_credit]
+    type_totals: Dict[Tuple, List[int]] = field(default_factory=dict)
+
+    def add_violation(self, violation: dict):
+        self.violation_count += 1
+        if len(self.violations) < MAX_VIOLATIONS_PER_PARTITION:
+            self.violations.append(violation)
+
+
+def plan_partitions(db, by: str = "ledger", slices: int = 1) -> List[Partition]:
+    """
+    by="ledger": satu partisi per ledger.
+    by="time"  : setiap ledger dipecah menjadi `slices` rentang waktu sama lebar (untuk ledger raksasa).
+    """
+    ledgers = db.execute(
+        select(JournalEntry.ledger_id, func.min(JournalEntry.created_at), func.max(JournalEntry.created_at))
+        .group_by(JournalEntry.ledger_id)
+    ).all()
+    partitions = []
+    for ledger_id, first, last in ledgers:
+        if by == "ledger" or slices <= 1 or first == last:
+            partitions.append(Partition(ledger_id))
+            continue
+        step = (last - first) / slices
+        bounds = [first + step * i for i in range(slices)] + [None]
+        # Rentang pertama tanpa batas bawah, terakhir tanpa batas atas: tidak ada jurnal yang terlewat
+        bounds[0] = None
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            partitions.append(Partition(ledger_id, start, end))
+    return partitions
+
+
+def _raw(column):
+    # Lewati konversi tipe per baris (UUID, Enum): verifier hanya butuh kesetaraan nilai mentah
+    return type_coerce(column, NullType())
+
+
+def _partition_statement(partition: Partition):
+    stmt = (
+        select(
+            _raw(JournalEntry.journal_id),
+            JournalEntry.total_debit,
+            JournalEntry.total_credit,
+            JournalLine.debit_amount,
+            JournalLine.credit_amount,
+            _raw(Account.entity_id),
+            _raw(Account.account_type),
+        )
+        .select_from(JournalEntry)
+        .outerjoin(JournalLine, JournalLine.journal_id == JournalEntry.journal_id)
+        .outerjoin(Account, Account.account_id == JournalLine.account_id)
+        .where(JournalEntry.ledger_id == partition.ledger_id)
+        .order_by(JournalEntry.created_at, JournalEntry.journal_id)
+    )
+    if partition.start is not None:
+        stmt = stmt.where(JournalEntry.created_at >= partition.start)
+    if partition.end is not None:
+        stmt = stmt.where(JournalEntry.created_at < partition.end)
+    return stmt
+
+
+def verify_partition(connection, partition: Partition, chunk_size: int = DEFAULT_CHUNK_SIZE) -> PartitionReport:
+    """Streaming satu partisi: keseimbangan per jurnal, header vs jumlah lines, dan total per tipe akun."""
+    report = PartitionReport(partition=partition)
+    totals = report.type_totals
+
+    def close_entry(journal_id, header_debit, header_credit, debit, credit, n_lines):
+        report.entries_checked += 1
+        if n_lines == 0:
+            report.add_violation({"type": "EMPTY_ENTRY", "journal_id": journal_id})
+            return
+        if debit != credit:
+            report.add_violation({"type": "UNBALANCED_ENTRY", "journal_id": journal_id,
+                                  "line_debit": debit, "line_credit": credit})
+        if header_debit != debit or header_credit != credit:
+            report.add_violation({"type": "HEADER_MISMATCH", "journal_id": journal_id,
+                                  "header_debit": header_debit, "header_credit": header_credit,
+                                  "line_debit": debit, "line_credit": credit})
+
+    current = None
+    header_debit = header_credit = debit = credit = n_lines = 0
+    result = connection.execution_options(yield_per=chunk_size).execute(_partition_statement(partition))
+    for journal_id, h_debit, h_credit, l_debit, l_credit, entity_id, account_type in result:
+        if journal_id != current:
+            if current is not None:
+                close_entry(current, header_debit, header_credit, debit, credit, n_lines)
+            current, header_debit, header_credit = journal_id, h_debit, h_credit
+            debit = credit = n_lines = 0
+        if l_debit is None:
+            continue  # jurnal tanpa lines (LEFT JOIN)
+        debit += l_debit
+        credit += l_credit
+        n_lines += 1
+        report.lines_checked += 1
+        if entity_id is None:
+            report.add_violation({"type": "ORPHAN_LINE", "journal_id": journal_id})
+            continue
+        bucket = totals.get((entity_id, account_type))
+        if bucket is None:
+            bucket = totals[(entity_id, account_type)] = [0, 0]
+        bucket[0] += l_debit
+        bucket[1] += l_credit
+    if current is not None:
+        close_entry(current, header_debit, header_credit, debit, credit, n_lines)
+
+    return report
+
+
+def _verify_partition_worker(db_url: str, partition: Partition, chunk_size: int) -> PartitionReport:
+    from core_ledger.storage_profile import create_profiled_engine
+
+    engine = create_profiled_engine(db_url)
+    try:
+        with engine.connect() as connection:
+            return verify_partition(connection, partition, chunk_size)
+    finally:
+        engine.dispose()
+
+
+def _decode_ids(dialect, report: PartitionReport):
+    """Mengubah journal_id/entity_id mentah menjadi UUID hanya untuk baris yang perlu dilaporkan."""
+    to_uuid = JournalEntry.__table__.c.journal_id.type.result_processor(dialect, None) or (lambda v: v)
+    for violation in report.violations:
+        violation["journal_id"] = str(to_uuid(violation["journal_id"]))
+    report.type_totals = {
+        (to_uuid(entity_id), AccountType[account_type]): values
+        for (entity_id, account_type), values in report.type_totals.items()
+    }
+
+
+@dataclass
+class IntegrityReport:
+    partitions: int
+    workers: int
+    entries_checked: int
+    lines_checked: int
+    elapsed_seconds: float
+    violation_count: int
+    violations: List[dict]
+
+    @property
+    def ok(self) -> bool:
+        return self.violation_count == 0
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines_checked / self.elapsed_seconds if self.elapsed_seconds > 0 else float('inf')
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "status": "OK" if self.ok else "VIOLATIONS",
+            "partitions": self.partitions,
+            "workers": self.workers,
+            "entries_checked": self.entries_checked,
+            "lines_checked": self.lines_checked,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "lines_per_second": round(self.lines_per_second, 1),
+            "violation_count": self.violation_count,
+            "violations": self.violations,
+        }, indent=2)
+
+
+def _entity_equation_violations(type_totals: Dict[Tuple, List[int]]) -> List[dict]:
+    """
+    Persamaan akuntansi per entitas: Aset = Kewajiban + Modal + (Pendapatan - Beban).
+    Setara dengan total debit = total kredit seluruh akun entitas.
+    """
+    per_entity: Dict[uuid.UUID, Dict[AccountType, int]] = {}
+    for (entity_id, account_type), (debit, credit) in type_totals.items():
+        per_entity.setdefault(entity_id, {})[account_type] = debit - credit
+
+    violations = []
+    for entity_id, net in per_entity.items():
+        assets = net.get(AccountType.ASSET, 0)
+        liabilities = -net.get(AccountType.LIABILITY, 0)
+        equity = -net.get(AccountType.EQUITY, 0)
+        retained = -net.get(AccountType.REVENUE, 0) - net.get(AccountType.EXPENSE, 0)
+        if assets != liabilities + equity + retained:
+            violations.append({"type": "ENTITY_EQUATION", "entity_id": str(entity_id), "assets": assets,
+                               "liabilities": liabilities, "equity": equity, "retained_earnings": retained})
+    return violations
+
+
+def verify_ledger_integrity(db_url: str, by: str = "ledger", slices: int = 1, workers: int = 1,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE) -> IntegrityReport:
+    """
+    Verifikasi integritas double-entry seluruh ledger.
+    Partisi (per ledger atau per rentang waktu) dibagi ke `workers` proses; workers=1 berjalan di proses ini.
+    """
+    from core_ledger.storage_profile import create_profiled_engine
+
+    started = time.perf_counter()
+    engine = create_profiled_engine(db_url)
+    try:
+        with engine.connect() as connection:
+            partitions = plan_partitions(connection, by=by, slices=slices)
+            if workers <= 1 or ":memory:" in db_url:
+                workers = 1
+                reports = [verify_partition(connection, p, chunk_size) for p in partitions]
+        dialect = engine.dialect
+    finally:
+        engine.dispose()
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(_verify_partition_worker, [db_url] * len(partitions), partitions,
+                                    [chunk_size] * len(partitions)))
+
+    type_totals: Dict[Tuple, List[int]] = {}
+    violations: List[dict] = []
+    violation_count = 0
+    for report in reports:
+        _decode_ids(dialect, report)
+        for violation in report.violations:
+            violation["ledger_id"] = str(report.partition.ledger_id)
+        violations.extend(report.violations)
+        violation_count += report.violation_count
+        for key, (debit, credit) in report.type_totals.items():
+            bucket = type_totals.setdefault(key, [0, 0])
+            bucket[0] += debit
+            bucket[1] += credit
+
+    equation = _entity_equation_violations(type_totals)
+    return IntegrityReport(
+        partitions=len(partitions),
+        workers=workers,
+        entries_checked=sum(r.entries_checked for r in reports),
+        lines_checked=sum(r.lines_checked for r in reports),
+        elapsed_seconds=time.perf_counter() - started,
+        violation_count=violation_count + len(equation),
+        violations=violations + equation,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+    from core_ledger.database import DATABASE_URL
+
+    parser = argparse.ArgumentParser(description="Verifikasi integritas double-entry ledger (streaming & paralel).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--by", choices=["ledger", "time"], default="ledger")
+    parser.add_argument("--slices", type=int, default=1, help="Jumlah rentang waktu per ledger (untuk --by time)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", help="Tulis laporan JSON ke file ini (default: stdout)")
+    args = parser.parse_args()
+
+    result = verify_ledger_integrity(DATABASE_URL, by=args.by, slices=args.slices,
+                                     workers=args.workers, chunk_size=args.chunk_size)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(result.to_json())
+        status = "[+] LEDGER UTUH" if result.ok else f"[!] {result.violation_count} PELANGGARAN"
+        print(f"{status}: {result.lines_checked:,} lines / {result.entries_checked:,} jurnal dalam "
+              f"{result.elapsed_seconds:,.1f} detik ({result.lines_per_second:,.0f} lines/sec). Laporan: {args.output}")
+    else:
+        print(result.to_json())
+    sys.exit(0 if result.ok else 1)
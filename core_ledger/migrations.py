@@ -0,0 +1,210 @@
+# core_ledger/migrations.py
+
+import uuid
+
+from sqlalchemy import func, inspect, insert, select
+from sqlalchemy.schema import CreateTable
+
+from core_ledger.models.financial_core import (
+    Base, SchemaMigration, JournalLine, JournalEntry, AccountBalanceProjection, TransactionEvent,
+)
+from core_ledger.models.types import BinaryUUID
+from core_ledger.balance_projection import rebuild_account_balances
+from core_ledger.event_chain import chain_unlinked_events
+from core_ledger.entity_hierarchy import rebuild_entity_closure
+
+# Migrasi bersifat append-only: versi yang sudah dirilis tidak boleh diubah atau diurutkan ulang.
+# create_all() hanya membuat tabel baru; perubahan pada tabel yang sudah ada (index, backfill)
+# untuk database lama seperti safar_core_local.db harus lewat langkah di bawah ini.
+# Migrasi dijalankan urut versi. v1-v6 belum pernah dirilis (safar_core_local.db belum punya schema_migrations),
+# sehingga konversi key UUID ditempatkan sebagai v1: langkah sesudahnya selalu membaca/menulis key BLOB.
+
+
+def _backfill_account_balances(connection):
+    """Database lama belum punya proyeksi account_balances: bangun sekali dari journal_lines."""
+    has_lines = connection.execute(select(JournalLine.line_id).limit(1)).first() is not None
+    has_projection = connection.execute(select(AccountBalanceProjection.account_id).limit(1)).first() is not None
+    if has_lines and not has_projection:
+        count = rebuild_account_balances(connection)
+        print(f"    [+] Proyeksi account_balances dibangun dari journal_lines: {count} akun.")
+
+
+def _create_indexes(connection, *names):
+    """
+    Membuat index (dideklarasikan di financial_core.py) berdasarkan nama, pada tabel yang sudah ada.
+    Setiap langkah menyebut index-nya secara eksplisit agar langkah lama tetap valid
+    ketika model mendapat kolom/index baru di kemudian hari.
+    """
+    indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        indexes[name].create(bind=connection, checkfirst=True)
+
+
+def _create_hot_path_indexes(connection):
+    _create_indexes(
+        connection,
+        "ix_entities_name",
+        "ix_accounts_entity_type",
+        "ix_ledgers_entity_locked",
+        "ix_transaction_events_timestamp",
+        "ix_journal_entries_ledger_created",
+        "ix_journal_entries_event",
+        "ix_journal_lines_journal",
+        "ix_journal_lines_account_amounts",
+    )
+
+
+def _add_missing_columns(connection, table):
+    """ALTER TABLE ADD COLUMN untuk kolom model yang belum ada di tabel fisik (kolom baru harus nullable)."""
+    existing = {col["name"] for col in inspect(connection).get_columns(table.name)}
+    for column in table.columns:
+        if column.name not in existing:
+            col_type = column.type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}")
+
+
+def _event_hash_chain(connection):
+    """Kolom hash chain pada transaction_events, lalu sambungkan event lama per ledger sesuai urutan waktu."""
+    _add_missing_columns(connection, TransactionEvent.__table__)
+    _create_indexes(connection, "ux_transaction_events_ledger_seq")
+
+    rows = connection.execute(
+        select(JournalEntry.ledger_id, TransactionEvent.event_id, TransactionEvent.event_hash)
+        .join(JournalEntry, JournalEntry.event_id == TransactionEvent.event_id)
+        .where(TransactionEvent.chain_seq.is_(None))
+        .distinct()
+        .order_by(JournalEntry.ledger_id, TransactionEvent.timestamp, TransactionEvent.event_id)
+    ).all()
+    per_ledger = {}
+    for row in rows:
+        per_ledger.setdefault(row.ledger_id, []).append((row.event_id, row.event_hash))
+    for ledger_id, events in per_ledger.items():
+        count = chain_unlinked_events(connection, ledger_id, events)
+        print(f"    [+] Ledger {ledger_id}: {count} event lama disambungkan ke hash chain.")
+
+
+def _event_hash_unique(connection):
+    """
+    Unique index pada event_hash untuk ingest idempoten.
+    Duplikat lama tidak dihapus otomatis (masing-masing bisa sudah punya jurnal): migrasi berhenti dan melaporkannya.
+    """
+    duplicates = connection.execute(
+        select(TransactionEvent.event_hash, func.count())
+        .group_by(TransactionEvent.event_hash)
+        .having(func.count() > 1)
+    ).all()
+    if duplicates:
+        sample = ", ".join(f"{event_hash[:16]}.. (x{count})" for event_hash, count in duplicates[:5])
+        raise ValueError(f"{len(duplicates)} event_hash tercatat lebih dari sekali; selesaikan manual "
+                         f"sebelum unique index dibuat: {sample}")
+    _create_indexes(connection, "ux_transaction_events_event_hash")
+
+
+def _backfill_entity_closure(connection):
+    """Closure table hierarki entitas untuk entitas yang dibuat sebelum entity_closure ada."""
+    count = rebuild_entity_closure(connection)
+    print(f"    [+] entity_closure dibangun dari parent_entity_id: {count} baris.")
+
+
+def _uuid_text_to_blob(value):
+    # Nilai yang sudah BLOB (atau NULL) dibiarkan apa adanya
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def _rebuild_sqlite_table(connection, table, physical):
+    """
+    SQLite tidak bisa mengubah tipe kolom: tabel dibangun ulang dengan DDL model terkini
+    (tabel baru -> salin + konversi -> drop tabel lama -> rename -> index).
+    Hanya index yang sudah ada sebelumnya yang dibuat ulang; index baru tetap milik migrasinya sendiri.
+    """
+    previous_indexes = {index["name"] for index in inspect(connection).get_indexes(table.name)}
+    temp_name = f"{table.name}__rebuild"
+    ddl = str(CreateTable(table).compile(dialect=connection.dialect)).strip()
+    connection.exec_driver_sql(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {temp_name} ", 1))
+    columns = [column for column in table.columns if column.name in physical]
+    targets = ", ".join(column.name for column in columns)
+    sources = ", ".join(
+        f"uuid_text_to_blob({column.name})" if isinstance(column.type, BinaryUUID) else column.name
+        for column in columns
+    )
+    copied = connection.exec_driver_sql(
+        f"INSERT INTO {temp_name} ({targets}) SELECT {sources} FROM {table.name}").rowcount
+    connection.exec_driver_sql(f"DROP TABLE {table.name}")
+    connection.exec_driver_sql(f"ALTER TABLE {temp_name} RENAME TO {table.name}")
+    for index in table.indexes:
+        if index.name in previous_indexes:
+            index.create(connection)
+    return copied
+
+
+def _binary_uuid_keys(connection):
+    """
+    SQLite: kolom UUID lama (postgresql.UUID: teks 32 karakter, deklarasi tipe "UUID") menjadi BLOB 16 byte (BinaryUUID).
+    Tabel dibangun ulang, bukan sekadar UPDATE: deklarasi "UUID" ber-affinity NUMERIC sehingga join ke tabel
+    baru ber-affinity BLOB tidak bisa memakai index. PostgreSQL sudah memakai uuid native.
+    Tabel yang seluruh kolom UUID-nya sudah BLOB (database baru) dilewati.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    connection.connection.driver_connection.create_function(
+        "uuid_text_to_blob", 1, _uuid_text_to_blob, deterministic=True)
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        physical = {col["name"]: str(col["type"]) for col in inspector.get_columns(table.name)}
+        legacy = [
+            column.name for column in table.columns
+            if isinstance(column.type, BinaryUUID) and physical.get(column.name, "BLOB") != "BLOB"
+        ]
+        if legacy:
+            # Kolom model yang belum ada (ditambahkan migrasi berikutnya) langsung lahir sebagai BLOB
+            copied = _rebuild_sqlite_table(connection, table, physical)
+            print(f"    [+] {table.name}: {copied:,} baris, kolom {', '.join(legacy)} menjadi BLOB 16 byte.")
+
+
+MIGRATIONS = [
+    # Konversi representasi key lebih dulu: langkah berikutnya membaca/menulis UUID sebagai BLOB 16 byte
+    (1, "binary_uuid_keys", _binary_uuid_keys),
+    (2, "account_balances_backfill", _backfill_account_balances),
+    (3, "hot_path_indexes", _create_hot_path_indexes),
+    (4, "event_hash_chain", _event_hash_chain),
+    (5, "entity_closure_backfill", _backfill_entity_closure),
+    (6, "event_hash_unique", _event_hash_unique),
+]
+
+# Migrasi yang menulis ulang sebagian besar halaman (v1: tabel ber-key teks dibangun ulang):
+# file SQLite baru menyusut setelah VACUUM
+_VACUUM_AFTER = {1}
+
+
+def run_migrations(engine):
+    """
+    Menjalankan setiap migrasi yang belum tercatat di schema_migrations, berurutan menurut versi.
+    Tiap langkah berjalan dalam transaksinya sendiri bersama pencatatan versinya.
+    """
+    SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+    with engine.connect() as connection:
+        applied = set(connection.execute(select(SchemaMigration.version)).scalars())
+
+    newly_applied = []
+    pending = [migration for migration in MIGRATIONS if migration[0] not in applied]
+    for version, name, step in sorted(pending, key=lambda m: m[0]):
+        print(f"[*] Menerapkan migrasi v{version}: {name}")
+        with engine.begin() as connection:
+            step(connection)
+            connection.execute(insert(SchemaMigration.__table__).values(version=version, name=name))
+        newly_applied.append(version)
+
+    if engine.dialect.name == "sqlite" and _VACUUM_AFTER.intersection(newly_applied):
+        print("[*] VACUUM: memadatkan file database...")
+        # VACUUM tidak boleh berjalan di dalam transaksi
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql("VACUUM")
+    return newly_applied
+
+
+def current_version(engine) -> int:
+    with engine.connect() as connection:
+        return max(connection.execute(select(SchemaMigration.version)).scalars(), default=0)
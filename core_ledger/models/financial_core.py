@@ -2,8 +2,8 @@
 
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, Date, DateTime, Float, ForeignKey, Enum, Integer, Index
+from core_ledger.models.types import BinaryUUID
 from sqlalchemy.orm import declarative_base, relationship
 import enum
 
@@ -22,10 +22,14 @@ class Entity(Base):
     Tidak ada cross-entity mutation tanpa settlement engine.
     """
     __tablename__ = 'entities'
+    __table_args__ = (
+        # Lookup entitas berdasarkan nama (genesis, terminal, dashboard)
+        Index('ix_entities_name', 'name'),
+    )
 
-    entity_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    entity_id = Column(BinaryUUID(), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
-    parent_entity_id = Column(UUID(as_uuid=True), ForeignKey('entities.entity_id'), nullable=True)
+    parent_entity_id = Column(BinaryUUID(), ForeignKey('entities.entity_id'), nullable=True)
     jurisdiction_id = Column(String(100), nullable=False)
     risk_appetite_profile_id = Column(String(100), nullable=False)
     capital_buffer_id = Column(String(100), nullable=False)
@@ -44,12 +48,16 @@ class Account(Base):
     Account tidak pernah dihapus. Hanya dinonaktifkan.
     """
     __tablename__ = 'accounts'
+    __table_args__ = (
+        # Chart of accounts per entitas, difilter per tipe akun (balance service)
+        Index('ix_accounts_entity_type', 'entity_id', 'account_type'),
+    )
 
-    account_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    entity_id = Column(UUID(as_uuid=True), ForeignKey('entities.entity_id'), nullable=False)
+    account_id = Column(BinaryUUID(), primary_key=True, default=uuid.uuid4)
+    entity_id = Column(BinaryUUID(), ForeignKey('entities.entity_id'), nullable=False)
     account_type = Column(Enum(AccountType), nullable=False)
     currency_id = Column(String(10), nullable=False)
-    parent_account_id = Column(UUID(as_uuid=True), ForeignKey('accounts.account_id'), nullable=True)
+    parent_account_id = Column(BinaryUUID(), ForeignKey('accounts.account_id'), nullable=True)
     risk_category = Column(String(100), nullable=False)
     liquidity_class = Column(String(50), nullable=False)
     active_flag = Column(Boolean, default=True, nullable=False)
@@ -64,9 +72,13 @@ class Ledger(Base):
     Ledger period yang sudah ditutup tidak bisa diubah.
     """
     __tablename__ = 'ledgers'
+    __table_args__ = (
+        # Mencari ledger aktif (belum dikunci) milik entitas
+        Index('ix_ledgers_entity_locked', 'entity_id', 'locked_flag'),
+    )
 
-    ledger_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    entity_id = Column(UUID(as_uuid=True), ForeignKey('entities.entity_id'), nullable=False)
+    ledger_id = Column(BinaryUUID(), primary_key=True, default=uuid.uuid4)
+    entity_id = Column(BinaryUUID(), ForeignKey('entities.entity_id'), nullable=False)
     opening_balance_hash = Column(String(256), nullable=False)
     closing_balance_hash = Column(String(256), nullable=True)
     period_start = Column(DateTime, nullable=False)
@@ -76,14 +88,23 @@ class Ledger(Base):
     # Relasi
     entity = relationship("Entity", back_populates="ledgers")
     journal_entries = relationship("JournalEntry", back_populates="ledger")
+    checkpoints = relationship("LedgerCheckpoint", back_populates="ledger", order_by="LedgerCheckpoint.seq_to")
 
 class TransactionEvent(Base):
     """
     Event source layer. Semua perubahan ledger harus berasal dari event.
     """
     __tablename__ = 'transaction_events'
+    __table_args__ = (
+        # Replay & audit berdasarkan rentang waktu
+        Index('ix_transaction_events_timestamp', 'timestamp'),
+        # Posisi unik event di rantai hash ledger-nya (dua writer tidak bisa mengklaim slot yang sama)
+        Index('ux_transaction_events_ledger_seq', 'ledger_id', 'chain_seq', unique=True),
+        # Ingest idempoten: event yang sama (replay feed / retry) tidak bisa tercatat dua kali
+        Index('ux_transaction_events_event_hash', 'event_hash', unique=True),
+    )
 
-    event_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id = Column(BinaryUUID(), primary_key=True, default=uuid.uuid4)
     event_type = Column(String(100), nullable=False)
     source_system = Column(String(100), nullable=False)
     decision_reference_id = Column(String(255), nullable=True)
@@ -91,19 +112,52 @@ class TransactionEvent(Base):
     timestamp = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     event_hash = Column(String(256), nullable=False)
 
+    # Hash chain per ledger (lihat core_ledger/event_chain.py):
+    # chain_hash = SHA-256(prev_chain_hash || event_hash), event pertama menyambung ke opening_balance_hash
+    ledger_id = Column(BinaryUUID(), ForeignKey('ledgers.ledger_id'), nullable=True)
+    chain_seq = Column(Integer, nullable=True)
+    prev_chain_hash = Column(String(64), nullable=True)
+    chain_hash = Column(String(64), nullable=True)
+
     # Relasi
     journal_entries = relationship("JournalEntry", back_populates="event")
 
+class LedgerCheckpoint(Base):
+    """
+    Merkle root periodik atas chain_hash event dalam rentang [seq_from, seq_to] satu ledger.
+    Memungkinkan inclusion proof O(log n) dan verifikasi inkremental sejak checkpoint terakhir.
+    """
+    __tablename__ = 'ledger_checkpoints'
+    __table_args__ = (
+        Index('ux_ledger_checkpoints_ledger_seq', 'ledger_id', 'seq_to', unique=True),
+    )
+
+    checkpoint_id = Column(BinaryUUID(), primary_key=True, default=uuid.uuid4)
+    ledger_id = Column(BinaryUUID(), ForeignKey('ledgers.ledger_id'), nullable=False)
+    seq_from = Column(Integer, nullable=False)
+    seq_to = Column(Integer, nullable=False)
+    merkle_root = Column(String(64), nullable=False)
+    last_chain_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    # Relasi
+    ledger = relationship("Ledger", back_populates="checkpoints")
+
 class JournalEntry(Base):
     """
     Representasi transaksi tingkat atas.
     Total Debit = Total Credit (hard constraint).
     """
     __tablename__ = 'journal_entries'
+    __table_args__ = (
+        # Jurnal per ledger berurutan waktu (period close, point-in-time)
+        Index('ix_journal_entries_ledger_created', 'ledger_id', 'created_at'),
+        Index('ix_journal_entries_event', 'event_id'),
+    )
 
-    journal_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    ledger_id = Column(UUID(as_uuid=True), ForeignKey('ledgers.ledger_id'), nullable=False)
-    event_id = Column(UUID(as_uuid=True), ForeignKey('transaction_events.event_id'), nullable=False)
+    journal_id = Column(BinaryUUID(), primary_key=True, default=uuid.uuid4)
+    ledger_id = Column(BinaryUUID(), ForeignKey('ledgers.ledger_id'), nullable=False)
+    event_id = Column(BinaryUUID(), ForeignKey('transaction_events.event_id'), nullable=False)
     transaction_type = Column(String(100), nullable=False)
     approval_status = Column(String(50), nullable=False)
     total_debit = Column(Integer, nullable=False) 
@@ -122,10 +176,15 @@ class JournalLine(Base):
     Detail per akun.
     """
     __tablename__ = 'journal_lines'
+    __table_args__ = (
+        Index('ix_journal_lines_journal', 'journal_id'),
+        # Covering index: SUM(debit/credit) per akun terbaca langsung dari index tanpa menyentuh tabel
+        Index('ix_journal_lines_account_amounts', 'account_id', 'debit_amount', 'credit_amount'),
+    )
 
-    line_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    journal_id = Column(UUID(as_uuid=True), ForeignKey('journal_entries.journal_id'), nullable=False)
-    account_id = Column(UUID(as_uuid=True), ForeignKey('accounts.account_id'), nullable=False)
+    line_id = Column(BinaryUUID(), primary_key=True, default=uuid.uuid4)
+    journal_id = Column(BinaryUUID(), ForeignKey('journal_entries.journal_id'), nullable=False)
+    account_id = Column(BinaryUUID(), ForeignKey('accounts.account_id'), nullable=False)
     debit_amount = Column(Integer, default=0, nullable=False)
     credit_amount = Column(Integer, default=0, nullable=False)
     currency_id = Column(String(10), nullable=False)
@@ -134,4 +193,86 @@ class JournalLine(Base):
 
     # Relasi
     journal = relationship("JournalEntry", back_populates="lines")
-    account = relationship("Account")
\ No newline at end of file
+    account = relationship("Account")
+
+class AccountBalanceProjection(Base):
+    """
+    Proyeksi materialized saldo berjalan per akun.
+    Diperbarui di transaksi yang sama dengan insert JournalLine (lihat core_ledger/balance_projection.py).
+    Bukan sumber kebenaran: selalu bisa dibangun ulang dari journal_lines.
+    """
+    __tablename__ = 'account_balances'
+
+    account_id = Column(BinaryUUID(), ForeignKey('accounts.account_id'), primary_key=True)
+    total_debit = Column(Integer, default=0, nullable=False)
+    total_credit = Column(Integer, default=0, nullable=False)
+    line_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    # Relasi
+    account = relationship("Account")
+
+class AccountBalanceSnapshot(Base):
+    """
+    Saldo kumulatif per akun saat sebuah Ledger ditutup (period close).
+    Saldo terkini = snapshot periode tertutup terakhir + delta periode yang masih terbuka.
+    """
+    __tablename__ = 'account_balance_snapshots'
+    __table_args__ = (
+        Index('ix_account_balance_snapshots_account', 'account_id', 'ledger_id'),
+    )
+
+    ledger_id = Column(BinaryUUID(), ForeignKey('ledgers.ledger_id'), primary_key=True)
+    account_id = Column(BinaryUUID(), ForeignKey('accounts.account_id'), primary_key=True)
+    total_debit = Column(Integer, default=0, nullable=False)
+    total_credit = Column(Integer, default=0, nullable=False)
+    closed_at = Column(DateTime, nullable=False)
+
+    # Relasi
+    ledger = relationship("Ledger")
+    account = relationship("Account")
+
+class EntityClosure(Base):
+    """
+    Closure table hierarki entitas: satu baris per pasangan (ancestor, descendant), termasuk diri sendiri (depth 0).
+    Dipelihara otomatis dari Entity.parent_entity_id (lihat core_ledger/entity_hierarchy.py).
+    """
+    __tablename__ = 'entity_closure'
+    __table_args__ = (
+        Index('ix_entity_closure_descendant', 'descendant_id', 'depth'),
+    )
+
+    ancestor_id = Column(BinaryUUID(), ForeignKey('entities.entity_id'), primary_key=True)
+    descendant_id = Column(BinaryUUID(), ForeignKey('entities.entity_id'), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+class FxRate(Base):
+    """
+    Kurs valuta: 1 unit base_currency = rate unit quote_currency, berlaku mulai rate_date.
+    JournalLine.fx_rate_reference merujuk ke kolom reference untuk kurs transaksi spesifik.
+    """
+    __tablename__ = 'fx_rates'
+    __table_args__ = (
+        # Kurs terakhir <= tanggal untuk satu pasangan mata uang
+        Index('ux_fx_rates_pair_date', 'base_currency', 'quote_currency', 'rate_date', unique=True),
+        Index('ux_fx_rates_reference', 'reference', unique=True),
+    )
+
+    rate_id = Column(BinaryUUID(), primary_key=True, default=uuid.uuid4)
+    base_currency = Column(String(10), nullable=False)
+    quote_currency = Column(String(10), nullable=False)
+    rate_date = Column(Date, nullable=False)
+    rate = Column(Float, nullable=False)
+    reference = Column(String(100), nullable=True)
+    source = Column(String(100), default="MANUAL", nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+class SchemaMigration(Base):
+    """
+    Catatan migrasi skema yang sudah diterapkan (lihat core_ledger/migrations.py).
+    """
+    __tablename__ = 'schema_migrations'
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    applied_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
\ No newline at end of file
@@ -0,0 +1,46 @@
+# core_ledger/models/types.py
+
+import uuid
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+
+class BinaryUUID(TypeDecorator):
+    """
+    UUID lintas dialek: tipe native `uuid` di PostgreSQL, BLOB 16 byte di SQLite (dan dialek lain).
+    postgresql.UUID di SQLite jatuh ke teks 32 karakter, sehingga setiap key & index dua kali lebih besar.
+    Nilai Python selalu uuid.UUID; string UUID juga diterima saat bind.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            # Diimpor di sini: paket dialek PostgreSQL (beserta asyncpg) mahal diimpor di jalur SQLite
+            from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+            return dialect.type_descriptor(PG_UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    @staticmethod
+    def _to_uuid(value):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return uuid.UUID(bytes=bytes(value))
+        # Teks heksadesimal 32/36 karakter dari database lama (sebelum migrasi binary_uuid_keys)
+        return uuid.UUID(str(value))
+
+    def process_bind_param(self, value, dialect):
+        value = self._to_uuid(value)
+        if value is None or dialect.name == "postgresql":
+            return value
+        return value.bytes
+
+    def literal_processor(self, dialect):
+        # literal_binds (mis. EXPLAIN QUERY PLAN): literal BLOB X'..' di SQLite, literal uuid di PostgreSQL
+        if dialect.name == "postgresql":
+            return lambda value: f"'{self._to_uuid(value)}'"
+        return lambda value: f"X'{self._to_uuid(value).hex}'"
+
+    def process_result_value(self, value, dialect):
+        return self._to_uuid(value)
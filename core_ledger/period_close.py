@@ -0,0 +1,202 @@
+# core_ledger/period_close.py
+
+import hashlib
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+from core_ledger.models.financial_core import (
+    AccountBalanceSnapshot, JournalEntry, JournalLine, Ledger, TransactionEvent,
+)
+from core_ledger.event_chain import create_due_checkpoints
+
+snapshots_table = AccountBalanceSnapshot.__table__
+
+
+@dataclass
+class PeriodCloseResult:
+    closed_ledger_id: uuid.UUID
+    next_ledger_id: uuid.UUID
+    closing_balance_hash: str
+    accounts_snapshotted: int
+    entries_in_period: int
+
+
+def previous_closed_ledger(db, entity_id: uuid.UUID, before: Optional[datetime] = None) -> Optional[Ledger]:
+    """Ledger tertutup terakhir milik entitas (opsional: yang period_end-nya <= before)."""
+    stmt = (
+        select(Ledger)
+        .where(Ledger.entity_id == entity_id, Ledger.locked_flag == True)
+        .order_by(Ledger.period_end.desc())
+        .limit(1)
+    )
+    if before is not None:
+        stmt = stmt.where(Ledger.period_end <= before)
+    return db.execute(stmt).scalars().first()
+
+
+def load_snapshot(db, ledger_id: uuid.UUID) -> Dict[uuid.UUID, Tuple[int, int]]:
+    return {
+        row.account_id: (row.total_debit, row.total_credit)
+        for row in db.execute(select(snapshots_table).where(snapshots_table.c.ledger_id == ledger_id))
+    }
+
+
+def period_deltas(db, ledger_id: uuid.UUID) -> Dict[uuid.UUID, Tuple[int, int]]:
+    """Total debit/kredit per akun dari jurnal di dalam satu ledger saja (biaya = aktivitas periode)."""
+    rows = db.execute(
+        select(JournalLine.account_id, func.sum(JournalLine.debit_amount), func.sum(JournalLine.credit_amount))
+        .join(JournalEntry, JournalEntry.journal_id == JournalLine.journal_id)
+        .where(JournalEntry.ledger_id == ledger_id)
+        .group_by(JournalLine.account_id)
+    )
+    return {account_id: (debit, credit) for account_id, debit, credit in rows}
+
+
+def compute_closing_hash(opening_balance_hash: str, last_chain_hash: Optional[str],
+                         snapshot: Dict[uuid.UUID, Tuple[int, int]]) -> str:
+    """
+    Hash penutupan mengikat tiga hal: state pembukaan, ujung hash chain event periode ini,
+    dan seluruh saldo penutupan (urutan kanonis berdasarkan account_id).
+    """
+    digest = hashlib.sha256()
+    digest.update(opening_balance_hash.encode())
+    digest.update((last_chain_hash or "NO_EVENTS").encode())
+    for account_id in sorted(snapshot, key=str):
+        debit, credit = snapshot[account_id]
+        digest.update(f"|{account_id}:{debit}:{credit}".encode())
+    return digest.hexdigest()
+
+
+def close_period(db, ledger_id: uuid.UUID, period_end: Optional[datetime] = None,
+                 next_period_end: Optional[datetime] = None) -> PeriodCloseResult:
+    """
+    Menutup periode ledger dalam satu transaksi:
+    1. snapshot saldo kumulatif = snapshot periode sebelumnya + delta periode ini,
+    2. checkpoint Merkle terakhir & closing_balance_hash,
+    3. kunci ledger, lalu buka ledger berikutnya dengan opening_balance_hash = closing hash.
+    Baris ledger dikunci (SELECT ... FOR UPDATE) sebelum delta periode dibaca: posting yang berjalan bersamaan
+    (assert_ledgers_open, FOR SHARE) menunggu commit penutupan lalu melihat locked_flag, sehingga tidak ada jurnal
+    yang masuk ke periode tertutup tanpa tercatat di snapshot. SQLite sudah menserialkan writer.
+    """
+    ledger = db.execute(
+        select(Ledger).where(Ledger.ledger_id == ledger_id).with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+    if ledger is None:
+        raise ValueError(f"Ledger {ledger_id} tidak ditemukan.")
+    if ledger.locked_flag:
+        raise ValueError(f"Ledger {ledger_id} sudah ditutup. Periode tertutup tidak bisa diubah.")
+
+    period_end = period_end or datetime.now(timezone.utc)
+    try:
+        previous = previous_closed_ledger(db, ledger.entity_id)
+        snapshot = load_snapshot(db, previous.ledger_id) if previous else {}
+        deltas = period_deltas(db, ledger_id)
+        for account_id, (debit, credit) in deltas.items():
+            prev_debit, prev_credit = snapshot.get(account_id, (0, 0))
+            snapshot[account_id] = (prev_debit + debit, prev_credit + credit)
+
+        if snapshot:
+            db.execute(insert(snapshots_table), [
+                {"ledger_id": ledger_id, "account_id": account_id, "total_debit": debit,
+                 "total_credit": credit, "closed_at": period_end}
+                for account_id, (debit, credit) in snapshot.items()
+            ])
+
+        head = db.execute(
+            select(TransactionEvent.chain_seq, TransactionEvent.chain_hash)
+            .where(TransactionEvent.ledger_id == ledger_id, TransactionEvent.chain_seq.is_not(None))
+            .order_by(TransactionEvent.chain_seq.desc())
+            .limit(1)
+        ).first()
+        if head is not None:
+            create_due_checkpoints(db.connection(), ledger_id, head.chain_seq, force=True)
+
+        closing_hash = compute_closing_hash(ledger.opening_balance_hash, head.chain_hash if head else None, snapshot)
+        ledger.closing_balance_hash = closing_hash
+        ledger.period_end = period_end
+        ledger.locked_flag = True
+
+        next_ledger = Ledger(
+            entity_id=ledger.entity_id,
+            opening_balance_hash=closing_hash,
+            period_start=period_end,
+            period_end=next_period_end or period_end, # Akan di-update saat periode ini ditutup
+            locked_flag=False,
+        )
+        db.add(next_ledger)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    entries = db.execute(
+        select(func.count()).select_from(JournalEntry).where(JournalEntry.ledger_id == ledger_id)
+    ).scalar()
+    return PeriodCloseResult(
+        closed_ledger_id=ledger_id,
+        next_ledger_id=next_ledger.ledger_id,
+        closing_balance_hash=closing_hash,
+        accounts_snapshotted=len(snapshot),
+        entries_in_period=entries,
+    )
+
+
+# --- GUARD: PERIODE TERTUTUP TIDAK BISA DIPOSTING ---
+
+def assert_ledgers_open(connection, ledger_ids):
+    # FOR SHARE: posting paralel tidak saling menunggu, tetapi menunggu close_period (FOR UPDATE) yang sedang
+    # berjalan lalu membaca locked_flag terbaru; kunci bertahan sampai transaksi posting selesai
+    rows = connection.execute(
+        select(Ledger.ledger_id, Ledger.locked_flag)
+        .where(Ledger.ledger_id.in_(list(ledger_ids)))
+        .with_for_update(read=True)
+    ).all()
+    locked = [ledger_id for ledger_id, locked_flag in rows if locked_flag]
+    if locked:
+        raise ValueError(f"Ledger {locked[0]} sudah ditutup. Posting ke periode tertutup ditolak.")
+
+
+def _guard_locked_ledgers(session, flush_context, instances):
+    ledger_ids = {obj.ledger_id for obj in session.new if isinstance(obj, JournalEntry) and obj.ledger_id}
+    if ledger_ids:
+        assert_ledgers_open(session.connection(), ledger_ids)
+
+
+def register_period_hooks():
+    """Memasang guard periode tertutup pada seluruh Session ORM (idempotent)."""
+    if not event.contains(Session, "before_flush", _guard_locked_ledgers):
+        event.listen(Session, "before_flush", _guard_locked_ledgers)
+
+
+if __name__ == "__main__":
+    import argparse
+    from core_ledger.database import SessionLocal
+    from core_ledger.models.financial_core import Entity
+
+    parser = argparse.ArgumentParser(description="Tutup periode ledger aktif sebuah entitas.")
+    parser.add_argument("--entity", default="Ujung Langit Foundation")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        entity = db.query(Entity).filter(Entity.name == args.entity).first()
+        if not entity:
+            raise SystemExit(f"[!] Entitas '{args.entity}' tidak ditemukan.")
+        ledger = db.query(Ledger).filter(Ledger.entity_id == entity.entity_id, Ledger.locked_flag == False).first()
+        if not ledger:
+            raise SystemExit("[!] Tidak ada Ledger aktif untuk entitas ini.")
+
+        print(f"=== PERIOD CLOSE: {entity.name} ===")
+        result = close_period(db, ledger.ledger_id)
+        print(f"[+] Ledger {result.closed_ledger_id} DIKUNCI ({result.entries_in_period:,} jurnal, "
+              f"{result.accounts_snapshotted} akun di-snapshot)")
+        print(f"    Closing Balance Hash: {result.closing_balance_hash}")
+        print(f"[+] Ledger baru dibuka: {result.next_ledger_id}")
+    finally:
+        db.close()
@@ -0,0 +1,218 @@
+# core_ledger/point_in_time.py
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, not_, select
+
+from core_ledger.models.financial_core import (
+    Account, AccountType, JournalEntry, JournalLine, Ledger, AccountBalanceSnapshot,
+)
+from core_ledger.balance_service import DEBIT_NORMAL_TYPES, BalanceReport, rows_to_reports
+
+# Saldo "per tanggal X" (as of): snapshot period close terakhir yang period_end-nya <= X,
+# ditambah journal_lines dengan created_at <= X dari ledger yang belum tertutup pada saat X.
+# Range scan memakai index (ledger_id, created_at) pada journal_entries.
+
+_ACCOUNT_COLS = (
+    Account.account_id,
+    Account.entity_id,
+    Account.account_type,
+    Account.currency_id,
+    Account.parent_account_id,
+    Account.risk_category,
+    Account.liquidity_class,
+    Account.active_flag,
+)
+
+
+def as_of_statement(as_of: datetime, entity_ids: Optional[Iterable[uuid.UUID]] = None,
+                    account_ids: Optional[Iterable[uuid.UUID]] = None,
+                    account_types: Optional[Iterable[AccountType]] = None):
+    """
+    SATU query saldo per akun pada titik waktu `as_of` (inklusif).
+    Akun dipilih lewat entity_ids dan/atau account_ids.
+    """
+    if entity_ids is None and account_ids is None:
+        raise ValueError("as_of_statement membutuhkan entity_ids atau account_ids.")
+
+    closed_at_as_of = and_(Ledger.locked_flag == True, Ledger.period_end <= as_of)
+    base_ledger = (
+        select(Ledger.ledger_id)
+        .where(Ledger.entity_id == Account.entity_id, closed_at_as_of)
+        .order_by(Ledger.period_end.desc())
+        .limit(1)
+        .correlate(Account)
+        .scalar_subquery()
+    )
+
+    account_filter = []
+    if entity_ids is not None:
+        account_filter.append(Account.entity_id.in_(list(entity_ids)))
+    if account_ids is not None:
+        account_filter.append(Account.account_id.in_(list(account_ids)))
+    if account_types is not None:
+        account_filter.append(Account.account_type.in_(list(account_types)))
+
+    # Delta dipindai dari sisi ledger -> journal_entries (ledger_id, created_at) -> journal_lines,
+    # sehingga biaya sebanding jumlah jurnal periode terbuka, bukan seluruh histori akun.
+    if entity_ids is not None:
+        entity_scope = list(entity_ids)
+    else:
+        entity_scope = select(Account.entity_id).where(Account.account_id.in_(list(account_ids))).distinct()
+    deltas = (
+        select(
+            JournalLine.account_id,
+            func.sum(JournalLine.debit_amount).label("debit"),
+            func.sum(JournalLine.credit_amount).label("credit"),
+        )
+        .select_from(Ledger)
+        .join(JournalEntry, JournalEntry.ledger_id == Ledger.ledger_id)
+        .join(JournalLine, JournalLine.journal_id == JournalEntry.journal_id)
+        .where(Ledger.entity_id.in_(entity_scope), not_(closed_at_as_of), JournalEntry.created_at <= as_of)
+        .group_by(JournalLine.account_id)
+        .subquery()
+    )
+    return (
+        select(
+            *_ACCOUNT_COLS,
+            (func.coalesce(AccountBalanceSnapshot.total_debit, 0)
+             + func.coalesce(deltas.c.debit, 0)).label("total_debit"),
+            (func.coalesce(AccountBalanceSnapshot.total_credit, 0)
+             + func.coalesce(deltas.c.credit, 0)).label("total_credit"),
+        )
+        .outerjoin(AccountBalanceSnapshot, and_(AccountBalanceSnapshot.account_id == Account.account_id,
+                                                AccountBalanceSnapshot.ledger_id == base_ledger))
+        .outerjoin(deltas, deltas.c.account_id == Account.account_id)
+        .where(*account_filter)
+    )
+
+
+def get_balances_as_of(db, entity_ids: Iterable[uuid.UUID], as_of: datetime,
+                       account_types: Optional[Iterable[AccountType]] = None) -> Dict[uuid.UUID, BalanceReport]:
+    """Padanan get_balances_for_entities() pada titik waktu `as_of`."""
+    entity_ids = list(entity_ids)
+    rows = db.execute(as_of_statement(as_of, entity_ids=entity_ids, account_types=account_types)).all()
+    return rows_to_reports(entity_ids, rows)
+
+
+def get_entity_balances_as_of(db, entity_id: uuid.UUID, as_of: datetime,
+                              account_types: Optional[Iterable[AccountType]] = None) -> BalanceReport:
+    """Contoh: modal inti per tanggal X = get_entity_balances_as_of(db, id, X, [EQUITY]).total(EQUITY)."""
+    return get_balances_as_of(db, [entity_id], as_of, account_types)[entity_id]
+
+
+# --- TIME SERIES HARIAN ---
+
+@dataclass
+class BalanceSeries:
+    """
+    Saldo akhir hari (sisi normal akun) untuk setiap hari di [start, end].
+    balances[account_id][i] adalah saldo pada akhir hari days[i].
+    """
+    days: List[date]
+    account_types: Dict[uuid.UUID, AccountType]
+    balances: Dict[uuid.UUID, List[int]] = field(default_factory=dict)
+
+    def total(self, *account_types: AccountType) -> List[int]:
+        """Jumlah saldo harian seluruh akun (opsional: hanya tipe tertentu)."""
+        totals = [0] * len(self.days)
+        for account_id, series in self.balances.items():
+            if account_types and self.account_types[account_id] not in account_types:
+                continue
+            for i, value in enumerate(series):
+                totals[i] += value
+        return totals
+
+
+def _as_date(value) -> date:
+    # SQLite mengembalikan date() sebagai string 'YYYY-MM-DD', PostgreSQL sebagai objek date
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def daily_balance_series(db, account_ids: Iterable[uuid.UUID], start: date, end: date) -> BalanceSeries:
+    """
+    Time series saldo harian untuk sekumpulan akun dalam DUA query, berapa pun jumlah harinya:
+    1. saldo pembuka as-of awal hari `start`,
+    2. delta debit/kredit per (akun, hari) di rentang [start, end], lalu dijumlahkan kumulatif.
+    """
+    if end < start:
+        raise ValueError("end harus >= start.")
+    account_ids = list(account_ids)
+    window_start = datetime.combine(start, time.min)
+    window_end = datetime.combine(end + timedelta(days=1), time.min)
+
+    opening_rows = db.execute(
+        as_of_statement(window_start - timedelta(microseconds=1), account_ids=account_ids)
+    ).all()
+    account_types = {row.account_id: row.account_type for row in opening_rows}
+    net = {row.account_id: row.total_debit - row.total_credit for row in opening_rows}
+
+    day = func.date(JournalEntry.created_at)
+    day_rows = db.execute(
+        select(
+            JournalLine.account_id,
+            day.label("day"),
+            func.sum(JournalLine.debit_amount),
+            func.sum(JournalLine.credit_amount),
+        )
+        .join(JournalEntry, JournalEntry.journal_id == JournalLine.journal_id)
+        .where(
+            JournalLine.account_id.in_(account_ids),
+            JournalEntry.created_at >= window_start,
+            JournalEntry.created_at < window_end,
+        )
+        .group_by(JournalLine.account_id, day)
+    )
+
+    n_days = (end - start).days + 1
+    daily_net = {account_id: [0] * n_days for account_id in account_types}
+    for account_id, day_value, debit, credit in day_rows:
+        daily_net[account_id][(_as_date(day_value) - start).days] += debit - credit
+
+    series = BalanceSeries(days=[start + timedelta(days=i) for i in range(n_days)], account_types=account_types)
+    for account_id, changes in daily_net.items():
+        sign = 1 if account_types[account_id] in DEBIT_NORMAL_TYPES else -1
+        running = net[account_id]
+        values = []
+        for change in changes:
+            running += change
+            values.append(sign * running)
+        series.balances[account_id] = values
+    return series
+
+
+if __name__ == "__main__":
+    import argparse
+    from core_ledger.database import SessionLocal
+    from core_ledger.models.financial_core import Entity
+
+    parser = argparse.ArgumentParser(description="Saldo entitas per tanggal (as of) dan time series harian.")
+    parser.add_argument("--entity", default="Ujung Langit Foundation")
+    parser.add_argument("--as-of", type=datetime.fromisoformat, default=None,
+                        help="Titik waktu ISO, mis. 2026-03-31T23:59:59 (default: sekarang)")
+    parser.add_argument("--series", nargs=2, metavar=("START", "END"), type=date.fromisoformat,
+                        help="Cetak modal inti harian untuk rentang tanggal ini")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        entity = db.query(Entity).filter(Entity.name == args.entity).first()
+        if not entity:
+            raise SystemExit(f"[!] Entitas '{args.entity}' tidak ditemukan.")
+        as_of = args.as_of or datetime.now(timezone.utc)
+        report = get_entity_balances_as_of(db, entity.entity_id, as_of)
+        print(f"=== SALDO {entity.name} PER {as_of.isoformat()} ===")
+        for account_type in AccountType:
+            print(f"    {account_type.value:<10}: {report.total(account_type):,} IDR")
+
+        if args.series:
+            equity_ids = [a.account_id for a in report.accounts(AccountType.EQUITY)]
+            series = daily_balance_series(db, equity_ids, *args.series)
+            print("\n=== MODAL INTI HARIAN ===")
+            for day, value in zip(series.days, series.total(AccountType.EQUITY)):
+                print(f"    {day.isoformat()}: {value:,} IDR")
+    finally:
+        db.close()
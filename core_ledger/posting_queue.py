@@ -0,0 +1,269 @@
+# core_ledger/posting_queue.py
+
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, select, update
+
+from core_ledger.models.financial_core import Entity, Ledger
+from core_ledger.bulk_posting import BulkEntry, post_journal_batch, validate_entries
+
+# Satu writer per proses: producer (thread web/worker/script) tidak membuka transaksi tulis sendiri,
+# melainkan menaruh jurnal di antrean terbatas. Thread writer menggabungkan antrean menjadi satu
+# transaksi (group commit) setiap max_batch_entries jurnal atau max_latency_ms sejak permintaan pertama,
+# sehingga SQLite hanya melihat satu writer dan fsync diamortisasi atas banyak jurnal.
+# Antar-proses tetap mengandalkan busy_timeout profil penyimpanan.
+
+DEFAULT_MAX_BATCH_ENTRIES = 500
+DEFAULT_MAX_LATENCY_MS = 20
+DEFAULT_QUEUE_SIZE = 10_000
+
+_STOP = object()
+
+
+class EntityVersionConflict(ValueError):
+    """Entity.version sudah berubah sejak dibaca producer (optimistic concurrency)."""
+
+
+@dataclass
+class _PostingRequest:
+    entries: List[BulkEntry]
+    expected_versions: Dict[uuid.UUID, int]
+    future: Future = field(default_factory=Future)
+
+
+class PostingService:
+    """
+    Antrean posting in-process dengan satu thread writer dan group commit.
+
+    submit() mengembalikan Future yang selesai dengan daftar journal_id (urut sesuai entries;
+    None untuk event_hash yang sudah pernah tercatat) setelah transaksinya ter-commit.
+    expected_versions {entity_id: version} menolak permintaan jika Entity.version entitas tersebut
+    sudah berubah; setiap permintaan yang ter-commit menaikkan version entitas yang ledger-nya diposting
+    (termasuk permintaan yang seluruh event-nya ternyata duplikat).
+    """
+
+    def __init__(self, session_factory, max_batch_entries: int = DEFAULT_MAX_BATCH_ENTRIES,
+                 max_latency_ms: float = DEFAULT_MAX_LATENCY_MS, max_queue: int = DEFAULT_QUEUE_SIZE):
+        self.session_factory = session_factory
+        self.max_batch_entries = max_batch_entries
+        self.max_latency = max_latency_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._ledger_entities: Dict[uuid.UUID, uuid.UUID] = {}
+        self.stats = {"batches": 0, "entries": 0, "requests": 0, "rejected": 0}
+
+    # --- PRODUCER ---
+
+    def start(self) -> "PostingService":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="safar-posting-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, entries: Sequence[BulkEntry], expected_versions: Optional[Dict[uuid.UUID, int]] = None,
+               timeout: Optional[float] = None) -> Future:
+        """
+        Menaruh satu permintaan (satu atau beberapa jurnal, atomik) di antrean.
+        Antrean penuh memblokir producer (backpressure); lewat `timeout` detik, queue.Full dilempar.
+        """
+        if self._thread is None:
+            raise RuntimeError("PostingService belum dijalankan: panggil start().")
+        if not self._thread.is_alive():
+            raise RuntimeError("Thread writer PostingService sudah berhenti.")
+        request = _PostingRequest(entries=list(entries), expected_versions=dict(expected_versions or {}))
+        self._queue.put(request, timeout=timeout)
+        return request.future
+
+    def post(self, entries: Sequence[BulkEntry], expected_versions: Optional[Dict[uuid.UUID, int]] = None,
+             timeout: Optional[float] = None) -> List[Optional[uuid.UUID]]:
+        """submit() lalu menunggu commit."""
+        return self.submit(entries, expected_versions, timeout).result(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Menghentikan writer setelah seluruh permintaan yang sudah antre diproses."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- WRITER ---
+
+    def _collect(self, first) -> tuple:
+        """Permintaan pertama + apa pun yang datang sebelum batas jumlah jurnal atau tenggat latensi."""
+        batch, n_entries = [first], len(first.entries)
+        deadline = time.monotonic() + self.max_latency
+        while n_entries < self.max_batch_entries:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                return batch, True
+            batch.append(request)
+            n_entries += len(request.entries)
+        return batch, False
+
+    def _run(self):
+        db = self.session_factory()
+        try:
+            stopping = False
+            while not stopping:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                batch, stopping = self._collect(first)
+                try:
+                    self._commit_group(db, batch)
+                except Exception as exc:
+                    # Galat di luar penanganan per permintaan (mis. "database is locked" saat membaca
+                    # Entity.version): seluruh permintaan grup yang belum selesai gagal, writer tetap hidup.
+                    db = self._reset_session(db)
+                    for request in batch:
+                        if not request.future.done():
+                            self._fail(request, exc)
+        finally:
+            db.close()
+
+    def _reset_session(self, db):
+        """Rollback session writer; jika rollback pun gagal, session diganti yang baru."""
+        try:
+            db.rollback()
+            return db
+        except Exception:
+            db.close()
+            return self.session_factory()
+
+    def _entity_of(self, db, ledger_ids) -> Dict[uuid.UUID, uuid.UUID]:
+        missing = [ledger_id for ledger_id in ledger_ids if ledger_id not in self._ledger_entities]
+        if missing:
+            rows = db.execute(select(Ledger.ledger_id, Ledger.entity_id).where(Ledger.ledger_id.in_(missing)))
+            self._ledger_entities.update({ledger_id: entity_id for ledger_id, entity_id in rows})
+            db.rollback()
+        unknown = [ledger_id for ledger_id in ledger_ids if ledger_id not in self._ledger_entities]
+        if unknown:
+            raise ValueError(f"Ledger {unknown[0]} tidak ditemukan.")
+        return self._ledger_entities
+
+    def _admit(self, db, batch: List[_PostingRequest]) -> Tuple[List[tuple], Dict[uuid.UUID, int]]:
+        """
+        Validasi di memori + pengecekan Entity.version untuk seluruh grup dengan satu SELECT.
+        Permintaan yang gagal langsung diselesaikan dengan exception; sisanya (request, entitas) diteruskan
+        bersama version yang diperiksa, yang menjadi syarat UPDATE di _post.
+        """
+        admitted = []
+        for request in batch:
+            try:
+                validate_entries(request.entries)
+                ledger_entities = self._entity_of(db, {entry.ledger_id for entry in request.entries})
+                entities = {ledger_entities[entry.ledger_id] for entry in request.entries}
+                admitted.append((request, entities))
+            except Exception as exc:
+                self._fail(request, exc)
+
+        entity_ids = set().union(*(entities for _, entities in admitted)) if admitted else set()
+        for request, _ in admitted:
+            entity_ids.update(request.expected_versions)
+        current = dict(db.execute(
+            select(Entity.entity_id, Entity.version).where(Entity.entity_id.in_(entity_ids))
+        ).all()) if entity_ids else {}
+        db.rollback()
+        checked = dict(current)
+
+        accepted = []
+        for request, entities in admitted:
+            missing = [entity_id for entity_id in (*entities, *request.expected_versions) if entity_id not in current]
+            if missing:
+                self._fail(request, ValueError(f"Entitas {missing[0]} tidak ditemukan."))
+                continue
+            stale = [(entity_id, version) for entity_id, version in request.expected_versions.items()
+                     if current.get(entity_id) != version]
+            if stale:
+                entity_id, version = stale[0]
+                self._fail(request, EntityVersionConflict(
+                    f"Entity {entity_id}: version {current.get(entity_id)} != {version} yang diharapkan."))
+                continue
+            # Permintaan berikutnya dalam grup yang sama melihat version setelah permintaan ini
+            for entity_id in entities:
+                current[entity_id] = current[entity_id] + 1
+            accepted.append((request, entities))
+        return accepted, checked
+
+    def _post(self, db, group: List[tuple], versions: Dict[uuid.UUID, int]):
+        """
+        Satu transaksi: bump Entity.version + seluruh jurnal grup, lalu commit.
+        UPDATE bersyarat pada `versions` hasil _admit: version yang diubah proses lain sesudah pengecekan
+        membuat grup ditolak, bukan lolos dari expected_versions.
+        """
+        bumps: Dict[uuid.UUID, int] = {}
+        for _, entities in group:
+            for entity_id in entities:
+                bumps[entity_id] = bumps.get(entity_id, 0) + 1
+        entities_table = Entity.__table__
+        result = db.execute(
+            update(entities_table)
+            .where(entities_table.c.entity_id == bindparam("b_entity_id"),
+                   entities_table.c.version == bindparam("b_version"))
+            .values(version=entities_table.c.version + bindparam("b_bump")),
+            [{"b_entity_id": entity_id, "b_version": versions[entity_id], "b_bump": bump}
+             for entity_id, bump in bumps.items()],
+        )
+        if result.rowcount != len(bumps):
+            db.rollback()
+            raise EntityVersionConflict("Entity.version diubah proses lain selama group commit.")
+        entries = [entry for request, _ in group for entry in request.entries]
+        return post_journal_batch(db, entries)
+
+    def _commit_group(self, db, batch: List[_PostingRequest]):
+        accepted, versions = self._admit(db, batch)
+        if not accepted:
+            return
+        try:
+            results = [(accepted, self._post(db, accepted, versions))]
+        except Exception:
+            # Satu permintaan bermasalah (mis. ledger terkunci) tidak boleh menggagalkan yang lain:
+            # ulangi per permintaan (pengecekan version ikut diulang) agar hanya permintaan itu yang gagal.
+            db.rollback()
+            results = []
+            for request, _ in accepted:
+                try:
+                    admitted, versions = self._admit(db, [request])
+                    if admitted:
+                        results.append((admitted, self._post(db, admitted, versions)))
+                except Exception as exc:
+                    db.rollback()
+                    self._fail(request, exc)
+
+        for group, result in results:
+            journal_by_hash = dict(zip(result.new_event_hashes, result.journal_ids))
+            for request, _ in group:
+                # Hanya kemunculan pertama sebuah event_hash yang membawa journal_id
+                ids = [journal_by_hash.pop(entry.event_hash, None) for entry in request.entries]
+                request.future.set_result(ids)
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(group)
+            self.stats["entries"] += sum(len(request.entries) for request, _ in group)
+
+    def _fail(self, request: _PostingRequest, exc: Exception):
+        self.stats["rejected"] += 1
+        request.future.set_exception(exc)
+
+
+def current_entity_version(db, entity_id: uuid.UUID) -> int:
+    """Version yang dibaca producer sebelum submit(..., expected_versions={entity_id: version})."""
+    version = db.execute(select(Entity.version).where(Entity.entity_id == entity_id)).scalar()
+    if version is None:
+        raise ValueError(f"Entitas {entity_id} tidak ditemukan.")
+    return version
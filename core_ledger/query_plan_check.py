@@ -0,0 +1,89 @@
+# core_ledger/query_plan_check.py
+
+import re
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from core_ledger.models.financial_core import (
+    Entity, Account, AccountType, Ledger, TransactionEvent, JournalEntry, JournalLine,
+)
+from core_ledger.balance_service import BalanceSource, account_balance_statement
+from core_ledger.point_in_time import as_of_statement
+
+# Baris EXPLAIN QUERY PLAN SQLite yang menandakan full table scan (tanpa index apa pun):
+# "SCAN t" (SQLite >= 3.36) atau "SCAN TABLE t" (versi lama), tanpa apa pun sesudah nama tabel.
+# "SCAN t USING [COVERING] INDEX ..." tidak dihitung: itu pembacaan index, bukan tabel.
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+
+
+def known_queries():
+    """
+    Query hot path dari transaction_engine, balance_sheet, terminal & dashboard.
+    Parameter dummy tidak berpengaruh pada rencana eksekusi SQLite.
+    """
+    entity_id = uuid.uuid4()
+    ledger_id = uuid.uuid4()
+    journal_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    return {
+        "entity_by_name": select(Entity).where(Entity.name == "Ujung Langit Foundation"),
+        "open_ledger_by_entity": select(Ledger).where(Ledger.entity_id == entity_id, Ledger.locked_flag == False),
+        "accounts_by_entity_type": select(Account).where(
+            Account.entity_id == entity_id, Account.account_type == AccountType.EQUITY),
+        "balances_projection": account_balance_statement([entity_id], source=BalanceSource.PROJECTION),
+        "balances_journal_scan": account_balance_statement([entity_id], source=BalanceSource.JOURNAL),
+        "balances_period": account_balance_statement([entity_id], source=BalanceSource.PERIOD),
+        "balances_as_of": as_of_statement(now, entity_ids=[entity_id]),
+        "lines_by_journal": select(JournalLine).where(JournalLine.journal_id == journal_id),
+        "entries_by_ledger_period": select(JournalEntry).where(
+            JournalEntry.ledger_id == ledger_id, JournalEntry.created_at >= now),
+        "events_by_time_range": select(TransactionEvent).where(
+            TransactionEvent.timestamp >= now, TransactionEvent.timestamp < now),
+        "event_chain_head": select(TransactionEvent.chain_seq, TransactionEvent.chain_hash).where(
+            TransactionEvent.ledger_id == ledger_id, TransactionEvent.chain_seq.is_not(None)
+        ).order_by(TransactionEvent.chain_seq.desc()).limit(1),
+    }
+
+
+def explain(connection, stmt):
+    """Mengembalikan baris 'detail' dari EXPLAIN QUERY PLAN untuk statement SQLAlchemy."""
+    compiled = stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+
+
+def check_query_plans(engine):
+    """
+    Menjalankan EXPLAIN QUERY PLAN untuk setiap query yang dikenal.
+    Mengembalikan dict {nama_query: [detail scan]} untuk query yang jatuh ke full table scan.
+    Hanya didukung untuk SQLite; planner PostgreSQL bergantung statistik tabel.
+    """
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"Query plan check hanya didukung untuk SQLite, bukan '{engine.dialect.name}'.")
+
+    failures = {}
+    with engine.connect() as connection:
+        for name, stmt in known_queries().items():
+            scans = [detail for detail in explain(connection, stmt) if _FULL_SCAN.match(detail)]
+            if scans:
+                failures[name] = scans
+    return failures
+
+
+if __name__ == "__main__":
+    import sys
+    from core_ledger.database import engine, init_db
+
+    init_db()
+    failures = check_query_plans(engine)
+    print("=" * 60)
+    print("    QUERY PLAN CHECK - FINANCIAL CORE HOT PATHS")
+    print("=" * 60)
+    for name in known_queries():
+        status = "[!] FULL SCAN" if name in failures else "[+] INDEXED "
+        print(f"{status} {name}")
+        for detail in failures.get(name, []):
+            print(f"        {detail}")
+    print("=" * 60)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,160 @@
+# core_ledger/storage_profile.py
+
+import os
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    Profil penyimpanan: PRAGMA SQLite + pengaturan connection pool per backend.
+    Nilai None berarti biarkan default SQLite/SQLAlchemy.
+    """
+    name: str
+    # --- SQLite (diterapkan lewat event 'connect' pada setiap koneksi baru) ---
+    journal_mode: Optional[str] = None      # WAL: reader tidak memblokir writer dan sebaliknya
+    synchronous: Optional[str] = None       # NORMAL aman di WAL (durable sampai checkpoint)
+    cache_size: Optional[int] = None        # Negatif = KiB (konvensi SQLite)
+    mmap_size: Optional[int] = None         # Byte
+    temp_store: Optional[str] = None        # MEMORY untuk sort/GROUP BY sementara
+    busy_timeout_ms: Optional[int] = None   # Menunggu lock, bukan langsung "database is locked"
+    # --- Connection pool ---
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+
+
+PROFILES = {
+    # Perilaku lama: rollback journal, tanpa PRAGMA tambahan
+    "legacy": StorageProfile(name="legacy"),
+    # Dashboard (reader) dan script posting (writer) berjalan bersamaan
+    "production": StorageProfile(
+        name="production",
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-65536,
+        mmap_size=268435456,
+        temp_store="MEMORY",
+        busy_timeout_ms=5000,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+    ),
+    # Import/replay massal: durabilitas ditukar dengan throughput, jalankan hanya saat offline
+    "bulk_import": StorageProfile(
+        name="bulk_import",
+        journal_mode="WAL",
+        synchronous="OFF",
+        cache_size=-262144,
+        mmap_size=1073741824,
+        temp_store="MEMORY",
+        busy_timeout_ms=30000,
+        pool_size=2,
+        max_overflow=0,
+    ),
+}
+
+DEFAULT_PROFILE = "production"
+
+# Override per-parameter lewat environment, di samping SAFAR_DB_URL
+_ENV_OVERRIDES = {
+    "SAFAR_DB_JOURNAL_MODE": ("journal_mode", str),
+    "SAFAR_DB_SYNCHRONOUS": ("synchronous", str),
+    "SAFAR_DB_CACHE_SIZE": ("cache_size", int),
+    "SAFAR_DB_MMAP_SIZE": ("mmap_size", int),
+    "SAFAR_DB_TEMP_STORE": ("temp_store", str),
+    "SAFAR_DB_BUSY_TIMEOUT_MS": ("busy_timeout_ms", int),
+    "SAFAR_DB_POOL_SIZE": ("pool_size", int),
+    "SAFAR_DB_MAX_OVERFLOW": ("max_overflow", int),
+    "SAFAR_DB_POOL_RECYCLE": ("pool_recycle", int),
+}
+
+
+def profile_from_env(environ=None) -> StorageProfile:
+    """Memilih profil dari SAFAR_DB_PROFILE lalu menerapkan override SAFAR_DB_* yang ada."""
+    environ = os.environ if environ is None else environ
+    name = environ.get("SAFAR_DB_PROFILE", DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f"SAFAR_DB_PROFILE tidak dikenal: '{name}'. Pilihan: {', '.join(PROFILES)}")
+
+    overrides = {}
+    for env_name, (attr, cast) in _ENV_OVERRIDES.items():
+        if env_name in environ:
+            overrides[attr] = cast(environ[env_name])
+    return replace(PROFILES[name], **overrides)
+
+
+def sqlite_pragmas(profile: StorageProfile):
+    """Daftar PRAGMA (nama, nilai) yang akan dieksekusi pada koneksi SQLite baru."""
+    pragmas = [
+        ("journal_mode", profile.journal_mode),
+        ("synchronous", profile.synchronous),
+        ("cache_size", profile.cache_size),
+        ("mmap_size", profile.mmap_size),
+        ("temp_store", profile.temp_store),
+        ("busy_timeout", profile.busy_timeout_ms),
+    ]
+    return [(name, value) for name, value in pragmas if value is not None]
+
+
+def engine_kwargs(url: str, profile: StorageProfile) -> dict:
+    """Argumen create_engine sesuai backend: pool SQLite file, SQLite in-memory, atau server (PostgreSQL)."""
+    if url.startswith("sqlite"):
+        kwargs = {"connect_args": {"check_same_thread": False}}
+        if ":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"):
+            # Database in-memory hanya ada selama koneksi hidup: satu koneksi dipakai bersama
+            kwargs["poolclass"] = StaticPool
+            return kwargs
+        kwargs.update(pool_size=profile.pool_size, max_overflow=profile.max_overflow,
+                      pool_recycle=profile.pool_recycle)
+        return kwargs
+
+    return {
+        "pool_size": profile.pool_size,
+        "max_overflow": profile.max_overflow,
+        "pool_recycle": profile.pool_recycle,
+        "pool_pre_ping": profile.pool_pre_ping,
+    }
+
+
+def attach_sqlite_pragmas(engine, profile: StorageProfile):
+    """Memasang hook 'connect' yang menerapkan PRAGMA profil ke setiap koneksi DBAPI baru."""
+    pragmas = sqlite_pragmas(profile)
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_profiled_engine(url: str, profile: Optional[StorageProfile] = None, **kwargs):
+    """create_engine dengan profil penyimpanan terpasang."""
+    profile = profile or profile_from_env()
+    engine = create_engine(url, **{**engine_kwargs(url, profile), **kwargs})
+    attach_sqlite_pragmas(engine, profile)
+    return engine
+
+
+def create_profiled_async_engine(url: str, profile: Optional[StorageProfile] = None, **kwargs):
+    """
+    create_async_engine (SQLAlchemy asyncio) dengan profil penyimpanan yang sama.
+    PRAGMA dipasang pada sync_engine karena event 'connect' berjalan di lapisan sinkron.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    profile = profile or profile_from_env()
+    engine = create_async_engine(url, **{**engine_kwargs(url, profile), **kwargs})
+    attach_sqlite_pragmas(engine.sync_engine, profile)
+    return engine
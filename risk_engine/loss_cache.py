@@ -0,0 +1,131 @@
+# risk_engine/loss_cache.py
+
+import hashlib
+import math
+import os
+from dataclasses import replace
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from risk_engine.monte_carlo_engine import VAR_LEVELS, MonteCarloSimulator, StressTestResult, default_parameters
+
+# Cache distribusi kerugian ter-normalisasi (modal = 1). Kerugian simulasi sebanding lurus dengan modal,
+# sehingga CBSS tidak bergantung modal: satu simulasi per kombinasi StressParameters + konfigurasi sampling,
+# lalu setiap modal hanya lookup O(1) + skala (StressTestResult.scaled).
+# Lapisan: LRU di memori proses, opsional file .npy per kunci di direktori (bertahan antar proses).
+
+DEFAULT_CACHE_SIZE = 128
+
+# Field hasil yang disimpan di .npy (urutan tetap), diikuti VaR lalu CVaR per VAR_LEVELS;
+# field lain berasal dari kunci cache. Field jalur None (sampling selain "path") disimpan sebagai NaN.
+_STORED_FIELDS = ("iterations", "blocks", "converged", "p95_loss", "p95_ci_low", "p95_ci_high",
+                  "mean_loss", "std_loss", "max_loss", "cbss", "terminal_breach_probability",
+                  "first_passage_probability", "max_drawdown_mean", "max_drawdown_p95", "max_drawdown_worst")
+_OPTIONAL_FIELDS = ("converged", "first_passage_probability", "max_drawdown_mean", "max_drawdown_p95",
+                    "max_drawdown_worst")
+
+
+class LossDistributionCache:
+    """
+    Hasil stress test ter-normalisasi per kunci (parameter model, horizon, jumlah jalur, seed, opsi sampling).
+    `workers` (proses untuk simulasi saat cache miss) bukan bagian kunci: hasil identik berapa pun jumlah worker.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, directory: Optional[str] = None, workers: int = 1):
+        self.directory = directory
+        self.workers = max(1, workers)
+        self.simulations = 0
+        self._normalized = lru_cache(maxsize=maxsize)(self._load)
+
+    def lookup(self, capital: float, iterations: int, time_horizon_days: int, **options) -> StressTestResult:
+        # Skala hanya sah untuk modal positif: modal <= 0 membalik urutan kuantil kerugian
+        if not capital > 0:
+            raise ValueError(f"Modal harus positif untuk stress test ter-cache, bukan {capital}.")
+        # parameters=None dan default eksplisit berbagi satu entri
+        options["parameters"] = options.get("parameters") or default_parameters()
+        key = (iterations, time_horizon_days, tuple(sorted(options.items())))
+        return self._normalized(key).scaled(capital)
+
+    def _path(self, key) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"loss_{digest}.npy")
+
+    def _load(self, key) -> StressTestResult:
+        iterations, time_horizon_days, options = key
+        options = dict(options)
+        template = StressTestResult(
+            iterations=iterations, time_horizon_days=time_horizon_days, chunk_size=options["chunk_size"],
+            workers=self.workers, quantile_method=options["quantile_method"], sampling=options["sampling"],
+            antithetic=options["antithetic"], quasi_random=options["quasi_random"],
+            shock_tilt=options["shock_tilt"], blocks=0, p95_loss=math.nan, p95_ci_low=math.nan,
+            p95_ci_high=math.nan, converged=None, mean_loss=math.nan, std_loss=math.nan,
+            max_loss=math.nan, cbss=math.nan, var_ladder={}, cvar_ladder={}, floor=options["floor"],
+            terminal_breach_probability=math.nan, first_passage_probability=None, max_drawdown_mean=None,
+            max_drawdown_p95=None, max_drawdown_worst=None,
+        )
+        if self.directory is not None and os.path.exists(self._path(key)):
+            return self._decode(template, np.load(self._path(key)))
+
+        self.simulations += 1
+        result = MonteCarloSimulator(current_capital=1.0).run_chunked_stress_test(
+            iterations, time_horizon_days, workers=self.workers, **options)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            # Tulis ke file sementara lalu rename: pembaca lain tidak pernah melihat file setengah jadi
+            temporary = self._path(key) + f".{os.getpid()}.tmp"
+            with open(temporary, "wb") as handle:
+                np.save(handle, self._encode(result))
+            os.replace(temporary, self._path(key))
+        return result
+
+    @staticmethod
+    def _encode(result: StressTestResult) -> np.ndarray:
+        values = []
+        for name in _STORED_FIELDS:
+            value = getattr(result, name)
+            values.append(math.nan if value is None else float(value))
+        values += [result.var_ladder[q] for q in VAR_LEVELS] + [result.cvar_ladder[q] for q in VAR_LEVELS]
+        return np.array(values, dtype=np.float64)
+
+    @staticmethod
+    def _decode(template: StressTestResult, stored: np.ndarray) -> StressTestResult:
+        stored = stored.tolist()
+        values = dict(zip(_STORED_FIELDS, stored))
+        values["iterations"] = int(values["iterations"])
+        values["blocks"] = int(values["blocks"])
+        for name in _OPTIONAL_FIELDS:
+            if math.isnan(values[name]):
+                values[name] = None
+        if values["converged"] is not None:
+            values["converged"] = bool(values["converged"])
+        ladders = stored[len(_STORED_FIELDS):]
+        values["var_ladder"] = dict(zip(VAR_LEVELS, ladders[:len(VAR_LEVELS)]))
+        values["cvar_ladder"] = dict(zip(VAR_LEVELS, ladders[len(VAR_LEVELS):]))
+        return replace(template, **values)
+
+    def clear(self):
+        """Membuang cache memori (file .npy tetap; hapus direktorinya untuk invalidasi penuh)."""
+        self._normalized.cache_clear()
+
+    def cache_info(self):
+        return self._normalized.cache_info()
+
+
+_CACHE: Optional[LossDistributionCache] = None
+
+
+def get_loss_cache() -> LossDistributionCache:
+    """
+    Satu cache per proses. SAFAR_MC_CACHE_DIR mengaktifkan lapisan .npy di disk,
+    SAFAR_MC_CACHE_SIZE mengatur kapasitas LRU memori, SAFAR_MC_WORKERS jumlah proses saat cache miss.
+    """
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = LossDistributionCache(
+            maxsize=int(os.environ.get("SAFAR_MC_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+            directory=os.environ.get("SAFAR_MC_CACHE_DIR") or None,
+            workers=int(os.environ.get("SAFAR_MC_WORKERS", 1)),
+        )
+    return _CACHE
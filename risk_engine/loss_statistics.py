@@ -0,0 +1,284 @@
+# risk_engine/loss_statistics.py
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Statistik kerugian yang dilipat blok demi blok (streaming), sehingga simulasi tidak perlu
+# menyimpan seluruh vektor kerugian: memori ditentukan ukuran blok, bukan jumlah iterasi.
+
+
+# Nilai kritis Student-t dua sisi 95% (kuantil 0.975) untuk derajat bebas 1..30
+_T_975 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+          2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+          2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+_Z_975 = 1.959964
+
+
+@dataclass
+class RunningLossStats:
+    """
+    Jumlah, rata-rata, varians (Welford/Chan, stabil secara numerik), minimum & maksimum kerugian.
+    Dengan `weights` (importance sampling) rata-rata & varians dihitung berbobot (ternormalisasi sendiri).
+    """
+    count: int = 0
+    weight: float = 0.0
+    weighted: bool = False
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def update(self, losses: np.ndarray, weights: Optional[np.ndarray] = None):
+        n = len(losses)
+        if n == 0:
+            return
+        if weights is None:
+            block_weight = n
+            block_mean = float(losses.mean())
+            block_m2 = float(((losses - block_mean) ** 2).sum())
+        else:
+            self.weighted = True
+            block_weight = float(weights.sum())
+            block_mean = float((weights * losses).sum() / block_weight)
+            block_m2 = float((weights * (losses - block_mean) ** 2).sum())
+        total = self.weight + block_weight
+        delta = block_mean - self.mean
+        self.mean += delta * block_weight / total
+        self.m2 += block_m2 + delta * delta * self.weight * block_weight / total
+        self.weight = total
+        self.count += n
+        self.minimum = min(self.minimum, float(losses.min()))
+        self.maximum = max(self.maximum, float(losses.max()))
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        if self.weighted:
+            return math.sqrt(self.m2 / self.weight * self.count / (self.count - 1))
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+class TailQuantile:
+    """
+    Kuantil EKSAK untuk jumlah sampel dengan batas atas yang diketahui di depan (total_count): hanya nilai
+    teratas yang dibutuhkan interpolasi linear np.percentile yang disimpan (±(1 - q) x total), dipangkas per blok
+    dengan np.partition. Hasil identik dengan np.percentile(seluruh_kerugian, q * 100) untuk berapa pun sampel
+    yang sudah masuk (<= total_count), sehingga dapat dibaca di tengah jalan (mode adaptif).
+    """
+
+    def __init__(self, q: float, total_count: int):
+        if not 0 <= q <= 1:
+            raise ValueError("q harus di antara 0 dan 1.")
+        self.q = q
+        self.total_count = total_count
+        # Posisi (0-based, urut naik) yang diinterpolasi np.percentile: floor(h) dan floor(h) + 1
+        self._rank = (total_count - 1) * q
+        self._keep = total_count - int(math.floor(self._rank))
+        self._tail = np.empty(0, dtype=np.float64)
+        self.count = 0
+
+    def update(self, losses: np.ndarray):
+        self.count += len(losses)
+        tail = np.concatenate([self._tail, losses])
+        if len(tail) > self._keep:
+            tail = np.partition(tail, len(tail) - self._keep)[len(tail) - self._keep:]
+        self._tail = tail
+
+    def value(self) -> float:
+        return self.ladder([self.q])[0][self.q]
+
+    def ladder(self, quantiles: Iterable[float]) -> Tuple[Dict[float, float], Dict[float, float]]:
+        """
+        VaR (interpolasi np.percentile) dan CVaR (rata-rata ceil((1 - q) . n) nilai teratas) untuk setiap q >= self.q,
+        dengan SATU np.partition multi-kth atas nilai yang disimpan, bukan sort penuh per kuantil.
+        """
+        if not 0 < self.count <= self.total_count:
+            raise ValueError(f"TailQuantile menerima {self.count} sampel, batasnya 1..{self.total_count}.")
+        quantiles = list(quantiles)
+        if any(q < self.q for q in quantiles):
+            raise ValueError(f"Kuantil di bawah {self.q} tidak tersimpan di TailQuantile ini.")
+        size = len(self._tail)
+        # Indeks 0 nilai tersimpan adalah posisi count - size di urutan seluruh sampel
+        offset = self.count - size
+        plan, kth = {}, set()
+        for q in quantiles:
+            # q dibulatkan seperti np.percentile(x, q * 100), yang membagi kembali dengan 100
+            rank = (self.count - 1) * (q * 100 / 100)
+            lower = int(math.floor(rank))
+            position = lower - offset
+            upper = min(position + 1, size - 1)
+            # round(): (1 - 0.999) x 1e6 = 1000.0000000000009 tidak boleh menjadi 1001 jalur
+            start = size - max(1, math.ceil(round((1 - q) * self.count, 9)))
+            plan[q] = (position, upper, rank - lower, start)
+            kth.update((position, upper, start))
+        tail = np.partition(self._tail, sorted(kth))
+        var, cvar = {}, {}
+        for q, (position, upper, frac, start) in plan.items():
+            lower_value, upper_value = tail[position], tail[upper]
+            if frac == 0 or upper == position:
+                var[q] = float(lower_value)
+            elif frac >= 0.5:
+                # Urutan operasi sama dengan lerp np.percentile agar hasil identik bit-per-bit
+                var[q] = float(upper_value - (upper_value - lower_value) * (1 - frac))
+            else:
+                var[q] = float(lower_value + (upper_value - lower_value) * frac)
+            cvar[q] = float(tail[start:].mean())
+        return var, cvar
+
+
+class WeightedTailQuantile:
+    """
+    Kuantil atas untuk sampel BERBOBOT (importance sampling), estimator tak bias F(x) = 1 - sum(w . 1{L > x}) / n:
+    kuantil = nilai terkecil x dengan sum(w . 1{L >= x}) >= (1 - q) . n. Karena bobot positif dan n <= total_count,
+    nilai di bawah massa bobot (1 - q) . total_count teratas tidak akan pernah terpakai dan dibuang per blok.
+    """
+
+    def __init__(self, q: float, total_count: int):
+        if not 0 <= q <= 1:
+            raise ValueError("q harus di antara 0 dan 1.")
+        self.q = q
+        self.total_count = total_count
+        self._mass = (1 - q) * total_count
+        # Disimpan urut menurun berdasarkan nilai
+        self._values = np.empty(0, dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+        self.count = 0
+
+    def update(self, values: np.ndarray, weights: np.ndarray):
+        self.count += len(values)
+        merged = np.concatenate([self._values, values])
+        merged_weights = np.concatenate([self._weights, weights])
+        # Stabil (timsort) memanfaatkan bagian yang sudah terurut
+        order = np.argsort(-merged, kind="stable")
+        merged, merged_weights = merged[order], merged_weights[order]
+        keep = int(np.searchsorted(np.cumsum(merged_weights), self._mass, side="left")) + 1
+        self._values, self._weights = merged[:keep], merged_weights[:keep]
+
+    def value(self) -> float:
+        return self.ladder([self.q])[0][self.q]
+
+    def ladder(self, quantiles: Iterable[float]) -> Tuple[Dict[float, float], Dict[float, float]]:
+        """VaR berbobot dan CVaR berbobot (rata-rata berbobot nilai >= VaR) untuk setiap q >= self.q."""
+        if not 0 < self.count <= self.total_count:
+            raise ValueError(f"WeightedTailQuantile menerima {self.count} sampel, batasnya 1..{self.total_count}.")
+        quantiles = list(quantiles)
+        if any(q < self.q for q in quantiles):
+            raise ValueError(f"Kuantil di bawah {self.q} tidak tersimpan di WeightedTailQuantile ini.")
+        cumulative = np.cumsum(self._weights)
+        weighted_sum = np.cumsum(self._weights * self._values)
+        var, cvar = {}, {}
+        for q in quantiles:
+            index = min(int(np.searchsorted(cumulative, (1 - q) * self.count, side="left")), len(self._values) - 1)
+            var[q] = float(self._values[index])
+            cvar[q] = float(weighted_sum[index] / cumulative[index])
+        return var, cvar
+
+
+def student_t_975(df: int) -> float:
+    """Kuantil 0.975 distribusi Student-t (tabel untuk df <= 30, ekspansi Cornish-Fisher di atasnya)."""
+    if df < 1:
+        raise ValueError("Derajat bebas minimal 1.")
+    if df <= len(_T_975):
+        return _T_975[df - 1]
+    z = _Z_975
+    return z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+
+
+def batch_confidence_interval(center: float, batch_estimates: List[float]) -> Tuple[float, float]:
+    """
+    Interval kepercayaan 95% metode batch means: setiap batch (blok dengan stream acak independen)
+    menghasilkan estimasi sendiri; lebar interval = t(B - 1) . sd(estimasi) / sqrt(B) di sekitar `center`.
+    Berlaku juga untuk variat antitetik, Sobol ter-acak, dan importance sampling selama batch saling independen.
+    """
+    batches = len(batch_estimates)
+    if batches < 2:
+        return math.nan, math.nan
+    half_width = student_t_975(batches - 1) * float(np.std(batch_estimates, ddof=1)) / math.sqrt(batches)
+    return center - half_width, center + half_width
+
+
+@dataclass
+class QuantileSketch:
+    """
+    Sketch kuantil streaming dengan galat RELATIF terbatas (skema bucket logaritmik ala DDSketch):
+    setiap kuantil yang dilaporkan berada dalam ±relative_accuracy dari nilai sampel pada rank tersebut.
+    Memori sebanding jumlah bucket (log rentang nilai / relative_accuracy), tidak bergantung jumlah sampel.
+    Nilai negatif (keuntungan) disimpan di store terpisah berdasarkan magnitudonya.
+    """
+    relative_accuracy: float = 0.005
+    count: int = 0
+    zero_count: int = 0
+    positive: Dict[int, int] = field(default_factory=dict)
+    negative: Dict[int, int] = field(default_factory=dict)
+
+    # Di bawah ambang ini nilai dianggap nol (kerugian < 1e-9 unit mata uang)
+    MIN_INDEXABLE = 1e-9
+
+    def __post_init__(self):
+        if not 0 < self.relative_accuracy < 1:
+            raise ValueError("relative_accuracy harus di antara 0 dan 1.")
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def _add_to(self, store: Dict[int, int], magnitudes: np.ndarray):
+        if len(magnitudes) == 0:
+            return
+        keys = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        unique, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self._add_to(self.positive, values[values > self.MIN_INDEXABLE])
+        self._add_to(self.negative, -values[values < -self.MIN_INDEXABLE])
+        self.zero_count += int(np.count_nonzero(np.abs(values) <= self.MIN_INDEXABLE))
+
+    def _bucket_value(self, key: int) -> float:
+        # Titik tengah bucket (gamma^(k-1), gamma^k] dalam galat relatif
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            raise ValueError("Sketch masih kosong.")
+        rank = q * (self.count - 1)
+        seen = 0
+        # Urutan naik: negatif dengan magnitudo terbesar, nol, lalu positif
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.positive))
+
+    def tail_mean(self, q: float) -> float:
+        """Rata-rata (1 - q) . count nilai teratas (CVaR), dari titik tengah bucket."""
+        if self.count == 0:
+            raise ValueError("Sketch masih kosong.")
+        needed = max(1.0, (1 - q) * self.count)
+        buckets = [(self._bucket_value(key), self.positive[key]) for key in sorted(self.positive, reverse=True)]
+        buckets.append((0.0, self.zero_count))
+        buckets += [(-self._bucket_value(key), self.negative[key]) for key in sorted(self.negative)]
+        taken, total = 0.0, 0.0
+        for value, count in buckets:
+            used = min(count, needed - taken)
+            total += value * used
+            taken += used
+            if taken >= needed:
+                break
+        return total / taken
+
+    @property
+    def bucket_count(self) -> int:
+        return len(self.positive) + len(self.negative)
@@ -1,57 +1,587 @@
 # risk_engine/monte_carlo_engine.py
 
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache, partial
+from typing import Dict, Optional, Sequence
+
 import numpy as np
 
+from risk_engine.loss_statistics import (QuantileSketch, RunningLossStats, TailQuantile, WeightedTailQuantile,
+                                         batch_confidence_interval)
+from risk_engine.quasi_random import scrambled_sobol
+
+# Asumsi Volatilitas Pasar Harian (Normal variance)
+DAILY_VOLATILITY = 0.002 # 0.2% volatilitas harian
+
+# Asumsi Probabilitas Macro Shock (Regime Shift, Liquidity Freeze)
+SHOCK_PROBABILITY = 0.01 # 1% kemungkinan terjadi shock per hari
+SHOCK_IMPACT_MEAN = -0.05 # Jika terjadi shock, rata-rata kerugian 5% dari modal
+SHOCK_IMPACT_STD = 0.02   # Deviasi shock
+# Konstanta di atas adalah nilai default StressParameters; skenario "bagaimana jika" cukup mengisi StressParameters.
+
+# Jumlah jalur per blok. Sampler "dense": blok 4.096 x 365 hari ~ 12 MB per matriks float64;
+# sampler "sparse" hanya butuh beberapa vektor sepanjang n_paths.
+# Setiap blok punya stream acak sendiri (SeedSequence.spawn), sehingga hasil hanya bergantung pada
+# (seed, chunk_size) dan identik bit-per-bit berapa pun jumlah worker yang dipakai.
+DEFAULT_CHUNK_SIZE = 4096
+DEFAULT_SEED = 42
+TAIL_QUANTILE = 0.95
+
+# Mode adaptif: berhenti begitu lebar CI 95% p95 (relatif terhadap p95) <= target, minimal MIN_BLOCKS blok
+# (batch) agar estimasi sebaran antar-blok stabil, maksimal `iterations` jalur.
+DEFAULT_TARGET_CI_WIDTH = 0.02
+DEFAULT_MAX_ITERATIONS = 1_000_000
+MIN_BLOCKS = 10
+# Importance sampling: probabilitas shock dinaikkan 1.5x (lebih banyak jalur di ekor kerugian)
+DEFAULT_SHOCK_TILT = 1.5
+
+# Tangga VaR/CVaR yang dihitung dalam satu pass (satu np.partition atas ekor tersimpan, bukan sort per kuantil)
+VAR_LEVELS = (0.90, 0.95, 0.99, 0.999)
+# Lantai modal (fraksi modal awal) untuk probabilitas breach terminal & first-passage
+DEFAULT_CAPITAL_FLOOR = 0.7
+# Sampler "path": hari per potongan; memori per blok jalur x PATH_DAY_CHUNK, bukan jalur x hari
+PATH_DAY_CHUNK = 32
+
+# Return harian <= -100% berarti modal habis (ruin), bukan NaN/-inf di ruang log: growth harian dilantai
+# di nilai positif terkecil, sehingga log-modal ~ -708 dan kerugian = modal (lihat _log_growth)
+RUIN_GROWTH = np.finfo(np.float64).tiny
+
+# Field StressTestResult dalam satuan mata uang: sebanding lurus dengan modal (kerugian = modal x (1 - growth))
+LOSS_FIELDS = ("p95_loss", "p95_ci_low", "p95_ci_high", "mean_loss", "std_loss", "max_loss")
+LADDER_FIELDS = ("var_ladder", "cvar_ladder")
+
+@dataclass(frozen=True)
+class StressParameters:
+    """Parameter model stress test (per hari). Hashable: dipakai sebagai bagian kunci LossDistributionCache."""
+    daily_volatility: float = DAILY_VOLATILITY
+    shock_probability: float = SHOCK_PROBABILITY
+    shock_impact_mean: float = SHOCK_IMPACT_MEAN
+    shock_impact_std: float = SHOCK_IMPACT_STD
+
+    def __post_init__(self):
+        if not all(math.isfinite(getattr(self, f.name)) for f in fields(self)):
+            raise ValueError("Parameter stress test harus berhingga (bukan NaN/inf).")
+        if self.daily_volatility < 0 or self.shock_impact_std < 0:
+            raise ValueError("Volatilitas dan deviasi shock tidak boleh negatif.")
+        if not 0 <= self.shock_probability < 1:
+            raise ValueError("shock_probability harus di antara 0 dan 1.")
+        # Shock tunggal rata-rata menghabiskan seluruh modal: bukan skenario stress, melainkan ruin pasti
+        if self.shock_impact_mean <= -1:
+            raise ValueError("shock_impact_mean harus di atas -1 (kerugian rata-rata per shock < 100% modal).")
+
+def default_parameters() -> StressParameters:
+    """Parameter dari konstanta modul yang berlaku saat ini."""
+    return StressParameters(DAILY_VOLATILITY, SHOCK_PROBABILITY, SHOCK_IMPACT_MEAN, SHOCK_IMPACT_STD)
+
+def relative_ci_width(low: float, high: float, center: float) -> float:
+    """
+    Lebar CI relatif terhadap |center| (p95 negatif = untung, tetap bermakna). Untuk center 0 lebar relatif tidak
+    terdefinisi: 0 bila interval berupa satu titik (mis. parameter tanpa risiko), selain itu inf (belum konvergen).
+    """
+    if center == 0:
+        return 0.0 if high == low else math.inf
+    return (high - low) / abs(center)
+
+@dataclass
+class StressTestResult:
+    """
+    Ringkasan simulasi chunked: statistik kerugian dilipat per blok, p95 eksak atau dari sketch.
+    var_ladder / cvar_ladder: VaR & CVaR (expected shortfall) per kuantil VAR_LEVELS.
+    floor: lantai modal (fraksi modal awal); terminal_breach_probability: P(modal akhir < floor).
+    Field jalur (hanya sampling "path", selain itu None): first_passage_probability = P(modal pernah < floor
+    di hari mana pun), max_drawdown_* = penurunan terdalam dari puncak berjalan (fraksi puncak).
+    """
+    iterations: int
+    time_horizon_days: int
+    chunk_size: int
+    workers: int
+    quantile_method: str
+    sampling: str
+    antithetic: bool
+    quasi_random: bool
+    shock_tilt: float
+    blocks: int
+    p95_loss: float
+    p95_ci_low: float
+    p95_ci_high: float
+    converged: Optional[bool]
+    mean_loss: float
+    std_loss: float
+    max_loss: float
+    cbss: float
+    var_ladder: Dict[float, float]
+    cvar_ladder: Dict[float, float]
+    floor: float
+    terminal_breach_probability: float
+    first_passage_probability: Optional[float]
+    max_drawdown_mean: Optional[float]
+    max_drawdown_p95: Optional[float]
+    max_drawdown_worst: Optional[float]
+
+    @property
+    def survival_probability(self) -> float:
+        """P(modal tidak pernah jatuh di bawah floor): dari first passage bila tersedia, selain itu hanya akhir horizon."""
+        if self.first_passage_probability is not None:
+            return 1 - self.first_passage_probability
+        return 1 - self.terminal_breach_probability
+
+    @property
+    def p95_ci_width(self) -> float:
+        """Lebar CI 95% p95 relatif terhadap |p95| (NaN bila kurang dari 2 blok; lihat relative_ci_width untuk p95 0)."""
+        return relative_ci_width(self.p95_ci_low, self.p95_ci_high, self.p95_loss)
+
+    def scaled(self, capital: float) -> "StressTestResult":
+        """
+        Hasil untuk modal lain dari hasil ter-normalisasi (modal 1): field kerugian dikali modal, CBSS tetap.
+        Identik dengan simulasi ulang pada modal tersebut sampai pembulatan floating point.
+        Hanya untuk modal positif: modal <= 0 membalik urutan kuantil sehingga p95 & CBSS hasil skala salah.
+        """
+        if not capital > 0:
+            raise ValueError(f"Modal harus positif untuk menskala hasil stress test, bukan {capital}.")
+        scaled = replace(self, **{name: getattr(self, name) * capital for name in LOSS_FIELDS},
+                         **{name: {q: value * capital for q, value in getattr(self, name).items()}
+                            for name in LADDER_FIELDS})
+        return replace(scaled, cbss=capital / scaled.p95_loss if scaled.p95_loss > 0 else float('inf'))
+
+@lru_cache(maxsize=256)
+def _binomial_cdf(trials: int, probability: float) -> np.ndarray:
+    """CDF Binomial(trials, probability) di k = 0..trials, untuk inverse-CDF dari uniform (antitetik/Sobol/sweep)."""
+    if probability == 0:
+        return np.ones(trials + 1)
+    k = np.arange(trials + 1)
+    log_pmf = np.array([math.lgamma(trials + 1) - math.lgamma(i + 1) - math.lgamma(trials - i + 1) for i in k])
+    log_pmf += k * math.log(probability) + (trials - k) * math.log1p(-probability)
+    cdf = np.cumsum(np.exp(log_pmf))
+    return cdf / cdf[-1]
+
+def _log_growth(returns: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """log(1 + r) per hari dengan r <= -100% diperlakukan sebagai ruin (growth RUIN_GROWTH), bukan NaN/-inf."""
+    growth = np.add(returns, 1, out=out)
+    np.maximum(growth, RUIN_GROWTH, out=growth)
+    return np.log(growth, out=growth)
+
+def _path_drivers(rng: np.random.Generator, n_paths: int, antithetic: bool, quasi_random: bool):
+    """
+    Penggerak acak dominan per jalur: uniform untuk jumlah hari shock dan normal baku untuk difusi hari tenang
+    (Box-Muller dari dua uniform). Sumber uniform: Sobol ter-acak (3 dimensi) atau pseudo-random;
+    dengan `antithetic` setengah jalur kedua adalah cerminan (1 - u, -z) dari setengah pertama.
+    """
+    base = -(-n_paths // 2) if antithetic else n_paths
+    uniforms = scrambled_sobol(rng, base, 3) if quasi_random else rng.random((base, 3))
+    u_shocks = uniforms[:, 0]
+    z_calm = np.sqrt(-2 * np.log1p(-uniforms[:, 1])) * np.cos(2 * np.pi * uniforms[:, 2])
+    if antithetic:
+        u_shocks = np.concatenate([u_shocks, 1 - u_shocks])[:n_paths]
+        z_calm = np.concatenate([z_calm, -z_calm])[:n_paths]
+    return u_shocks, z_calm
+
+def simulate_block_losses_dense(current_capital: float, seed: np.random.SeedSequence, n_paths: int,
+                                time_horizon_days: int, parameters: Optional[StressParameters] = None):
+    """
+    Model referensi per hari: matriks growth jalur x hari, mask shock, lalu produk kumulatif.
+    Growth harian dilantai di 0: return <= -100% menghabiskan modal (ruin), bukan membalik tanda produk.
+    Fungsi level modul agar dapat dikirim ke worker ProcessPoolExecutor. Mengembalikan (kerugian, None, None).
+    """
+    params = parameters or default_parameters()
+    rng = np.random.default_rng(seed)
+    growth = rng.normal(0, params.daily_volatility, (n_paths, time_horizon_days))
+    shocks = rng.random((n_paths, time_horizon_days)) < params.shock_probability
+    growth[shocks] += rng.normal(params.shock_impact_mean, params.shock_impact_std, int(np.count_nonzero(shocks)))
+    growth += 1
+    np.maximum(growth, 0, out=growth)
+    cumulative_returns = np.prod(growth, axis=1)
+    return current_capital * (1 - cumulative_returns), None, None
+
+def simulate_block_losses(current_capital: float, seed: np.random.SeedSequence, n_paths: int,
+                          time_horizon_days: int, antithetic: bool = False, quasi_random: bool = False,
+                          shock_tilt: float = 1.0, parameters: Optional[StressParameters] = None):
+    """
+    Model yang sama di ruang log-return tanpa matriks jalur x hari (~99% isinya hari tanpa shock):
+      - jumlah hari shock per jalur ~ Binomial(hari, shock_probability);
+      - hari tenang: jumlah log(1 + e) atas m hari ~ N(-m.sigma^2/2, sigma.sqrt(m)) ditarik SEKALI per jalur
+        (galat aproksimasi orde sigma^3 per hari, ~1e-8 untuk sigma 0.2%);
+      - hari shock: hanya kejadian shock yang ditarik, return hariannya N(mean shock, hypot(sigma, std shock));
+        return <= -100% adalah ruin (_log_growth), sama dengan lantai growth 0 pada sampler dense.
+    Posisi hari shock tidak mempengaruhi modal akhir (produk komutatif), sehingga tidak perlu ditarik.
+    Reduksi varians (magnitudo per kejadian shock tetap pseudo-random):
+      - antithetic / quasi_random: jumlah shock & difusi dari _path_drivers (inverse-CDF Binomial);
+      - shock_tilt > 1: importance sampling, jumlah shock ditarik dengan probabilitas shock x shock_tilt
+        dan setiap jalur diberi bobot rasio likelihood Binomial.
+    Mengembalikan (kerugian, bobot, None) dengan bobot None bila tanpa importance sampling.
+    """
+    params = parameters or default_parameters()
+    volatility = params.daily_volatility
+    rng = np.random.default_rng(seed)
+    shock_probability = params.shock_probability * shock_tilt
+    if antithetic or quasi_random:
+        u_shocks, z_calm = _path_drivers(rng, n_paths, antithetic, quasi_random)
+        cdf = _binomial_cdf(time_horizon_days, shock_probability)
+        shock_days = np.minimum(np.searchsorted(cdf, u_shocks, side="right"), time_horizon_days)
+        calm_days = time_horizon_days - shock_days
+        log_growth = -0.5 * volatility ** 2 * calm_days + volatility * np.sqrt(calm_days) * z_calm
+    else:
+        shock_days = rng.binomial(time_horizon_days, shock_probability, n_paths)
+        calm_days = time_horizon_days - shock_days
+        log_growth = rng.normal(-0.5 * volatility ** 2 * calm_days, volatility * np.sqrt(calm_days))
+    total_shocks = int(shock_days.sum())
+    if total_shocks:
+        shock_returns = rng.normal(params.shock_impact_mean, math.hypot(volatility, params.shock_impact_std),
+                                   total_shocks)
+        owner = np.repeat(np.arange(n_paths), shock_days)
+        log_growth += np.bincount(owner, weights=_log_growth(shock_returns, out=shock_returns), minlength=n_paths)
+    weights = None
+    if shock_tilt != 1.0:
+        # Rasio likelihood p^k (1-p)^(n-k) / p'^k (1-p')^(n-k) dalam log agar stabil
+        weights = np.exp(shock_days * -math.log(shock_tilt)
+                         + calm_days * (math.log1p(-params.shock_probability) - math.log1p(-shock_probability)))
+    # modal x (1 - exp(log_growth)), expm1 menjaga presisi saat log_growth mendekati nol
+    return -current_capital * np.expm1(log_growth), weights, None
+
+def simulate_block_paths(current_capital: float, seed: np.random.SeedSequence, n_paths: int,
+                         time_horizon_days: int, parameters: Optional[StressParameters] = None,
+                         day_chunk: int = PATH_DAY_CHUNK):
+    """
+    Model per hari seperti sampler dense, tetapi jalur dialirkan per potongan `day_chunk` hari: setiap potongan
+    dilipat ke level log-modal berjalan, puncak berjalan, drawdown terdalam dan level terendah per jalur, lalu
+    dibuang. Memori per blok n_paths x day_chunk, matriks jalur x hari tidak pernah dibentuk.
+    Return harian <= -100% adalah ruin (_log_growth): level jatuh ke ~-708 dan jalur tercatat breach & drawdown ~100%,
+    bukan NaN yang lolos setiap perbandingan.
+    Mengembalikan (kerugian, None, [max drawdown (fraksi puncak), modal terendah (fraksi modal awal)]).
+    """
+    params = parameters or default_parameters()
+    rng = np.random.default_rng(seed)
+    # Semua dalam log(modal / modal awal): level awal 0, puncak awal 0 (modal awal)
+    level = np.zeros(n_paths)
+    peak = np.zeros(n_paths)
+    deepest = np.zeros(n_paths)
+    lowest = np.zeros(n_paths)
+    for start in range(0, time_horizon_days, day_chunk):
+        days = min(day_chunk, time_horizon_days - start)
+        growth = rng.normal(0, params.daily_volatility, (n_paths, days))
+        shocks = rng.random((n_paths, days)) < params.shock_probability
+        growth[shocks] += rng.normal(params.shock_impact_mean, params.shock_impact_std, int(np.count_nonzero(shocks)))
+        levels = np.cumsum(_log_growth(growth, out=growth), axis=1, out=growth)
+        levels += level[:, None]
+        running_peak = np.maximum.accumulate(levels, axis=1)
+        np.maximum(running_peak, peak[:, None], out=running_peak)
+        running_peak -= levels
+        np.maximum(deepest, running_peak.max(axis=1), out=deepest)
+        np.minimum(lowest, levels.min(axis=1), out=lowest)
+        peak = running_peak[:, -1] + levels[:, -1]
+        level = levels[:, -1].copy()
+    path_stats = np.stack([-np.expm1(-deepest), np.exp(lowest)])
+    return -current_capital * np.expm1(level), None, path_stats
+
+def simulate_block_grid(current_capital: float, seed: np.random.SeedSequence, n_paths: int,
+                        time_horizon_days: int, grid: Sequence[StressParameters]) -> np.ndarray:
+    """
+    Kerugian (titik grid x jalur) dengan COMMON RANDOM NUMBERS: semua titik grid memakai bilangan acak yang sama,
+    hanya transformasinya yang berbeda, sehingga selisih antar titik nyaris bebas noise sampling:
+      - jumlah hari shock: inverse-CDF Binomial dari uniform bersama (monoton terhadap shock_probability);
+      - difusi hari tenang: satu normal baku bersama per jalur;
+      - magnitudo: deret normal baku per jalur sepanjang jumlah shock terbanyak di grid, kejadian ke-j
+        memakai normal ke-j di semua titik grid.
+    Bilangan acak ditarik sekali per blok; biaya tambahan per titik grid hanya transformasi & penjumlahan.
+    """
+    rng = np.random.default_rng(seed)
+    u_shocks = rng.random(n_paths)
+    z_calm = rng.standard_normal(n_paths)
+    # Titik grid dikelompokkan per shock_probability: jumlah shock & mask kejadian dihitung sekali per kelompok
+    groups: Dict[float, list] = {}
+    for row, p in enumerate(grid):
+        groups.setdefault(p.shock_probability, []).append(row)
+    counts = {probability: np.minimum(np.searchsorted(_binomial_cdf(time_horizon_days, probability), u_shocks,
+                                                      side="right"), time_horizon_days)
+              for probability in groups}
+    most = np.max(list(counts.values()), axis=0)
+    z_events = rng.standard_normal(int(most.sum()))
+    owner = np.repeat(np.arange(n_paths), most)
+    position = np.arange(len(owner)) - np.repeat(np.cumsum(most) - most, most)
+
+    volatility = np.array([p.daily_volatility for p in grid])[:, None]
+    calm_days = time_horizon_days - np.stack([counts[p.shock_probability] for p in grid])
+    log_growth = -0.5 * volatility ** 2 * calm_days + volatility * np.sqrt(calm_days) * z_calm
+    for probability, rows in groups.items():
+        shock_days = counts[probability]
+        z_active = z_events[position < shock_days[owner]]
+        if len(z_active) == 0:
+            continue
+        # Kejadian aktif tetap berurutan per jalur: jumlah per jalur dengan reduceat untuk semua baris kelompok
+        hit = shock_days > 0
+        starts = (np.cumsum(shock_days) - shock_days)[hit]
+        means = np.array([grid[row].shock_impact_mean for row in rows])[:, None]
+        scales = np.array([math.hypot(grid[row].daily_volatility, grid[row].shock_impact_std) for row in rows])[:, None]
+        shock_log = scales * z_active
+        shock_log += means
+        _log_growth(shock_log, out=shock_log)
+        log_growth[np.ix_(rows, hit)] += np.add.reduceat(shock_log, starts, axis=1)
+    return -current_capital * np.expm1(log_growth)
+
+SAMPLERS = {"sparse": simulate_block_losses, "dense": simulate_block_losses_dense, "path": simulate_block_paths}
+
+@dataclass
+class SensitivityGrid:
+    """
+    Hasil sweep parameter: setiap array berbentuk (len(sumbu_1), len(sumbu_2), ...) mengikuti urutan `axes`,
+    langsung dapat dipakai sebagai heatmap (baris = sumbu pertama, kolom = sumbu kedua).
+    non_finite: sel yang statistik kerugiannya tidak berhingga; CBSS sel itu NaN, bukan angka yang tampak aman.
+    """
+    axes: Dict[str, np.ndarray]
+    base: StressParameters
+    iterations: int
+    time_horizon_days: int
+    cbss: np.ndarray
+    p95_loss: np.ndarray
+    mean_loss: np.ndarray
+    std_loss: np.ndarray
+    non_finite: np.ndarray
+
+    def parameters_at(self, index) -> StressParameters:
+        """StressParameters untuk satu sel, mis. grid.parameters_at((i, j))."""
+        return replace(self.base, **{name: float(values[i]) for (name, values), i in zip(self.axes.items(), index)})
+
+def iterate_blocks(sampler, iterations: int, chunk_size: int, workers: int, seed):
+    """
+    Hasil sampler(seed_blok, n_jalur) per blok, SELALU dalam urutan blok. Stream blok ke-i adalah anak ke-i dari
+    SeedSequence(seed), sehingga hasil hanya bergantung pada (seed, chunk_size). Worker diberi blok per putaran
+    sehingga konsumen yang berhenti di tengah (mode adaptif) hanya menunggu putaran yang sedang berjalan.
+    `sampler` harus dapat di-pickle (fungsi level modul atau functools.partial-nya) bila workers > 1.
+    """
+    sizes = [min(chunk_size, iterations - offset) for offset in range(0, iterations, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers <= 1:
+        yield from map(sampler, seeds, sizes)
+        return
+    # Beberapa blok per task untuk mengamortisasi overhead IPC, tetap seimbang antar worker
+    batch = max(1, min(8, len(sizes) // (workers * 4)))
+    round_size = workers * 4 * batch
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(sizes), round_size):
+            yield from pool.map(sampler, seeds[start:start + round_size], sizes[start:start + round_size],
+                                chunksize=batch)
+
 class MonteCarloSimulator:
     """
     Engine Probabilistik Layer 2.
-    Mensimulasikan ribuan skenario guncangan untuk menghitung Survival Probability 
+    Mensimulasikan ribuan skenario guncangan untuk menghitung Survival Probability
     dan Capital Buffer Stress Score (CBSS).
     """
-    def __init__(self, current_capital: float):
+    def __init__(self, current_capital: float, cache=None):
         self.current_capital = current_capital
-        
-    def run_capital_stress_test(self, iterations=10000, time_horizon_days=365):
+        # Opsional: LossDistributionCache (risk_engine.loss_cache). Distribusi kerugian ter-normalisasi
+        # tidak bergantung modal, sehingga perubahan modal cukup lookup + skala, tanpa simulasi ulang.
+        self.cache = cache
+
+    def run_capital_stress_test(self, iterations=10000, time_horizon_days=365, chunk_size=DEFAULT_CHUNK_SIZE,
+                                workers=1, seed=DEFAULT_SEED, **options):
         """
         Menjalankan simulasi Monte Carlo untuk menghitung potensi kerugian terburuk (Tail Risk).
+        Mengembalikan Capital Buffer Stress Score (CBSS) = modal / kerugian p95.
+        `options` diteruskan ke run_chunked_stress_test (reduksi varians, mode adaptif).
+        """
+        return self.run_chunked_stress_test(iterations, time_horizon_days, chunk_size,
+                                            workers=workers, seed=seed, **options).cbss
+
+    def run_adaptive_stress_test(self, time_horizon_days=365, target_ci_width=DEFAULT_TARGET_CI_WIDTH,
+                                 max_iterations=DEFAULT_MAX_ITERATIONS, workers=1, seed=DEFAULT_SEED,
+                                 parameters: Optional[StressParameters] = None) -> StressTestResult:
+        """
+        Konfigurasi standar untuk terminal & dashboard: variat antitetik + Sobol ter-acak + importance sampling
+        ekor shock, berhenti saat CI 95% p95 selebar target_ci_width (relatif). Jumlah jalur ditentukan presisi,
+        bukan angka tetap, sehingga terminal dan dashboard melaporkan CBSS yang konsisten.
+        Importance sampling dilewati (shock_tilt 1) bila probabilitas shock x DEFAULT_SHOCK_TILT keluar dari (0, 1),
+        mis. shock_probability 0 atau >= 2/3.
+        """
+        parameters = parameters or default_parameters()
+        shock_tilt = DEFAULT_SHOCK_TILT if 0 < parameters.shock_probability * DEFAULT_SHOCK_TILT < 1 else 1.0
+        return self.run_chunked_stress_test(max_iterations, time_horizon_days, workers=workers, seed=seed,
+                                            antithetic=True, quasi_random=True, shock_tilt=shock_tilt,
+                                            target_ci_width=target_ci_width, parameters=parameters)
+
+    def run_chunked_stress_test(self, iterations=10000, time_horizon_days=365, chunk_size=DEFAULT_CHUNK_SIZE,
+                                quantile_method="exact", relative_accuracy=0.005, seed=DEFAULT_SEED,
+                                workers=1, sampling="sparse", antithetic=False, quasi_random=False,
+                                shock_tilt=1.0, target_ci_width=None, min_blocks=MIN_BLOCKS,
+                                parameters: Optional[StressParameters] = None,
+                                floor=DEFAULT_CAPITAL_FLOOR) -> StressTestResult:
+        """
+        Simulasi Monte Carlo per blok `chunk_size` jalur: setiap blok dilipat ke statistik berjalan lalu dibuang,
+        sehingga puncak memori ditentukan chunk_size, bukan iterations (1 juta jalur tetap muat di node 8 GB).
+        Blok dibagi ke `workers` proses; hasil dilipat dalam urutan blok sehingga identik untuk workers berapa pun.
+        quantile_method:
+          - "exact" : tangga VaR identik dengan np.percentile atas seluruh kerugian; hanya ~10% kerugian teratas
+                      disimpan (dengan shock_tilt: kuantil berbobot WeightedTailQuantile).
+          - "sketch": VaR & CVaR dari QuantileSketch, galat relatif <= relative_accuracy, memori konstan.
+        VaR & CVaR untuk semua VAR_LEVELS dihitung sekali di akhir (lihat TailQuantile.ladder); p95 = VaR 95%.
+        sampling: "sparse" (ruang log-return, hanya kejadian shock yang ditarik), "dense" (model referensi per hari)
+        atau "path" (model per hari dialirkan per potongan hari: drawdown & first-passage di bawah `floor`).
+        floor: lantai modal sebagai fraksi modal awal untuk probabilitas breach terminal & first-passage.
+        Reduksi varians (hanya sampler sparse): antithetic, quasi_random (Sobol ter-acak per blok), shock_tilt
+        (importance sampling ekor shock). CI 95% p95 dihitung dengan batch means antar blok.
+        target_ci_width: bila diisi, `iterations` menjadi batas atas dan simulasi berhenti begitu lebar CI relatif
+        <= target (setelah minimal min_blocks blok); StressTestResult.iterations = jumlah jalur yang benar-benar dipakai.
+        parameters: StressParameters model (default: konstanta modul).
+        Dengan `cache`, hasil diambil dari distribusi ter-normalisasi (disimulasikan sekali per parameter lalu diskala;
+        jumlah proses saat cache miss mengikuti cache.workers).
         """
-        # Asumsi Volatilitas Pasar Harian (Normal variance)
-        daily_volatility = 0.002 # 0.2% volatilitas harian
-        
-        # Asumsi Probabilitas Macro Shock (Regime Shift, Liquidity Freeze)
-        shock_probability = 0.01 # 1% kemungkinan terjadi shock per hari
-        shock_impact_mean = -0.05 # Jika terjadi shock, rata-rata kerugian 5% dari modal
-        shock_impact_std = 0.02   # Deviasi shock
-        
-        # Matriks Simulasi (Baris: Skenario, Kolom: Hari)
-        np.random.seed(42) # Seed deterministik untuk replikasi hasil
-        
-        # 1. Simulasi Volatilitas Harian
-        daily_returns = np.random.normal(0, daily_volatility, (iterations, time_horizon_days))
-        
-        # 2. Injeksi Skala Ekstrem
-        shocks = np.random.binomial(1, shock_probability, (iterations, time_horizon_days))
-        shock_magnitudes = np.random.normal(shock_impact_mean, shock_impact_std, (iterations, time_horizon_days))
-        
-        total_daily_returns = daily_returns + (shocks * shock_magnitudes)
-        
-        # 3. Hitung Kumulatif Pergerakan Modal
-        cumulative_returns = np.prod(1 + total_daily_returns, axis=1)
-        simulated_ending_capital = self.current_capital * cumulative_returns
-        
-        # 4. Kalkulasi Kerugian
-        simulated_losses = self.current_capital - simulated_ending_capital
-        
-        # 5. Ekstraksi Tail Risk (95th Percentile Worst-Case Scenario)
-        p95_loss = np.percentile(simulated_losses, 95)
-        
-        # 6. Hitung Capital Buffer Stress Score (CBSS)
-        cbss = self.current_capital / p95_loss if p95_loss > 0 else float('inf')
-        
-        return cbss
+        if self.cache is not None:
+            return self.cache.lookup(
+                self.current_capital, iterations, time_horizon_days, chunk_size=chunk_size,
+                quantile_method=quantile_method, relative_accuracy=relative_accuracy, seed=seed, sampling=sampling,
+                antithetic=antithetic, quasi_random=quasi_random, shock_tilt=shock_tilt,
+                target_ci_width=target_ci_width, min_blocks=min_blocks, parameters=parameters, floor=floor)
+        if sampling not in SAMPLERS:
+            raise ValueError(f"sampling tidak dikenal: '{sampling}'. Pilihan: {', '.join(SAMPLERS)}")
+        if quantile_method not in ("exact", "sketch"):
+            raise ValueError(f"quantile_method tidak dikenal: '{quantile_method}'. Pilihan: exact, sketch")
+        if not 0 < floor < 1:
+            raise ValueError("floor harus di antara 0 dan 1 (fraksi modal awal).")
+        parameters = parameters or default_parameters()
+        if shock_tilt != 1.0 and not 0 < parameters.shock_probability * shock_tilt < 1:
+            raise ValueError("shock_tilt harus membuat probabilitas shock tetap di antara 0 dan 1.")
+        weighted = shock_tilt != 1.0
+        if weighted and quantile_method == "sketch":
+            raise ValueError("quantile_method 'sketch' tidak mendukung importance sampling (shock_tilt).")
+        if sampling != "sparse":
+            if antithetic or quasi_random or weighted:
+                raise ValueError("Reduksi varians hanya tersedia untuk sampling 'sparse'.")
+            sampler = partial(SAMPLERS[sampling], self.current_capital, time_horizon_days=time_horizon_days,
+                              parameters=parameters)
+        else:
+            sampler = partial(simulate_block_losses, self.current_capital, time_horizon_days=time_horizon_days,
+                              antithetic=antithetic, quasi_random=quasi_random, shock_tilt=shock_tilt,
+                              parameters=parameters)
+
+        stats = RunningLossStats()
+        if quantile_method == "sketch":
+            tail = QuantileSketch(relative_accuracy)
+        elif weighted:
+            tail = WeightedTailQuantile(min(VAR_LEVELS), iterations)
+        else:
+            tail = TailQuantile(min(VAR_LEVELS), iterations)
+        # Modal akhir < floor <=> kerugian > (1 - floor) x modal; dengan importance sampling dijumlah bobotnya
+        breach_loss = (1 - floor) * self.current_capital
+        breaches = 0.0
+        paths = sampling == "path"
+        if paths:
+            drawdown_stats = RunningLossStats()
+            drawdown_tail = TailQuantile(TAIL_QUANTILE, iterations)
+            passages = 0
+
+        block_estimates = []
+        converged = None if target_ci_width is None else False
+        blocks = iterate_blocks(sampler, iterations, chunk_size, workers, seed)
+        for losses, weights, path_stats in blocks:
+            stats.update(losses, weights)
+            breached = losses > breach_loss
+            breaches += float(weights[breached].sum()) if weighted else int(np.count_nonzero(breached))
+            if paths:
+                drawdowns, lowest = path_stats
+                drawdown_stats.update(drawdowns)
+                drawdown_tail.update(drawdowns)
+                passages += int(np.count_nonzero(lowest < floor))
+            if weighted:
+                tail.update(losses, weights)
+                block_tail = WeightedTailQuantile(TAIL_QUANTILE, len(losses))
+                block_tail.update(losses, weights)
+                block_estimates.append(block_tail.value())
+            else:
+                tail.update(losses)
+                block_estimates.append(float(np.percentile(losses, TAIL_QUANTILE * 100)))
+            if target_ci_width is not None and len(block_estimates) >= min_blocks:
+                center = float(np.mean(block_estimates))
+                low, high = batch_confidence_interval(center, block_estimates)
+                if relative_ci_width(low, high, center) <= target_ci_width:
+                    converged = True
+                    break
+        blocks.close()
+
+        if quantile_method == "sketch":
+            var_ladder = {q: tail.quantile(q) for q in VAR_LEVELS}
+            cvar_ladder = {q: tail.tail_mean(q) for q in VAR_LEVELS}
+        else:
+            var_ladder, cvar_ladder = tail.ladder(VAR_LEVELS)
+        p95_loss = var_ladder[TAIL_QUANTILE]
+        ci_low, ci_high = batch_confidence_interval(p95_loss, block_estimates)
+        return StressTestResult(
+            iterations=stats.count,
+            time_horizon_days=time_horizon_days,
+            chunk_size=chunk_size,
+            workers=max(1, workers),
+            quantile_method=quantile_method,
+            sampling=sampling,
+            antithetic=antithetic,
+            quasi_random=quasi_random,
+            shock_tilt=shock_tilt,
+            blocks=len(block_estimates),
+            p95_loss=p95_loss,
+            p95_ci_low=ci_low,
+            p95_ci_high=ci_high,
+            converged=converged,
+            mean_loss=stats.mean,
+            std_loss=stats.std,
+            max_loss=stats.maximum,
+            cbss=self.current_capital / p95_loss if p95_loss > 0 else float('inf'),
+            var_ladder=var_ladder,
+            cvar_ladder=cvar_ladder,
+            floor=floor,
+            terminal_breach_probability=breaches / stats.count,
+            first_passage_probability=passages / stats.count if paths else None,
+            max_drawdown_mean=drawdown_stats.mean if paths else None,
+            max_drawdown_p95=drawdown_tail.value() if paths else None,
+            max_drawdown_worst=drawdown_stats.maximum if paths else None,
+        )
+
+    def run_sensitivity_sweep(self, axes: Dict[str, Sequence[float]], base: Optional[StressParameters] = None,
+                              iterations=100_000, time_horizon_days=365, chunk_size=DEFAULT_CHUNK_SIZE,
+                              workers=1, seed=DEFAULT_SEED) -> SensitivityGrid:
+        """
+        CBSS & statistik kerugian untuk seluruh kombinasi nilai `axes` (produk kartesius, field StressParameters
+        lain dari `base`) dalam satu pass batch dengan common random numbers (simulate_block_grid).
+        Contoh: run_sensitivity_sweep({"shock_probability": [0.01, 0.02], "shock_impact_mean": [-0.05, -0.08]}).
+        """
+        base = base or default_parameters()
+        names = [f.name for f in fields(StressParameters)]
+        unknown = [name for name in axes if name not in names]
+        if unknown:
+            raise ValueError(f"Sumbu sweep tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(names)}")
+        axis_values = {name: np.asarray(values, dtype=np.float64) for name, values in axes.items()}
+        grid = tuple(replace(base, **dict(zip(axis_values, map(float, combo))))
+                     for combo in itertools.product(*axis_values.values()))
+
+        stats = [RunningLossStats() for _ in grid]
+        tails = [TailQuantile(TAIL_QUANTILE, iterations) for _ in grid]
+        sampler = partial(simulate_block_grid, self.current_capital, time_horizon_days=time_horizon_days, grid=grid)
+        for losses in iterate_blocks(sampler, iterations, chunk_size, workers, seed):
+            for row_stats, tail, row in zip(stats, tails, losses):
+                row_stats.update(row)
+                tail.update(row)
+
+        shape = tuple(len(values) for values in axis_values.values())
+        p95_loss = np.array([tail.value() for tail in tails])
+        mean_loss = np.array([row.mean for row in stats])
+        std_loss = np.array([row.std for row in stats])
+        non_finite = ~(np.isfinite(p95_loss) & np.isfinite(mean_loss) & np.isfinite(std_loss))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cbss = np.where(p95_loss > 0, self.current_capital / p95_loss, np.inf)
+        cbss[non_finite] = np.nan
+        return SensitivityGrid(
+            axes=axis_values,
+            base=base,
+            iterations=iterations,
+            time_horizon_days=time_horizon_days,
+            cbss=cbss.reshape(shape),
+            p95_loss=p95_loss.reshape(shape),
+            mean_loss=mean_loss.reshape(shape),
+            std_loss=std_loss.reshape(shape),
+            non_finite=non_finite.reshape(shape),
+        )
 
 if __name__ == "__main__":
     # Ini hanya dijalankan jika file ini dieksekusi langsung
     simulator = MonteCarloSimulator(current_capital=10000000000)
     cbss = simulator.run_capital_stress_test(iterations=10000, time_horizon_days=365)
-    print(f"Test CBSS: {cbss}")
\ No newline at end of file
+    print(f"Test CBSS: {cbss}")
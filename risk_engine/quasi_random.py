@@ -0,0 +1,54 @@
+# risk_engine/quasi_random.py
+
+import numpy as np
+
+# Barisan Sobol (quasi-random) dengan randomisasi digital shift, tanpa dependensi SciPy.
+# Setiap blok simulasi memakai titik Sobol yang sama dengan shift acak sendiri, sehingga blok-blok
+# adalah replikasi RQMC independen dan interval kepercayaan batch means tetap berlaku.
+
+BITS = 32
+
+# Direction numbers Joe-Kuo (new-joe-kuo-6.21201) untuk dimensi 2..6: (derajat s, koefisien a, m_1..m_s)
+_DIRECTIONS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+)
+MAX_DIMENSIONS = len(_DIRECTIONS) + 1
+
+
+def _direction_vectors(dimensions: int) -> np.ndarray:
+    """Matriks (dimensi x BITS) direction vector v_k sebagai integer BITS-bit (Bratley-Fox)."""
+    vectors = np.zeros((dimensions, BITS), dtype=np.uint64)
+    vectors[0] = [1 << (BITS - 1 - k) for k in range(BITS)]
+    for dim, (degree, coefficients, initial) in enumerate(_DIRECTIONS[:dimensions - 1], start=1):
+        v = [m << (BITS - 1 - k) for k, m in enumerate(initial)]
+        for k in range(degree, BITS):
+            value = v[k - degree] ^ (v[k - degree] >> degree)
+            for j in range(1, degree):
+                if (coefficients >> (degree - 1 - j)) & 1:
+                    value ^= v[k - j]
+            v.append(value)
+        vectors[dim] = v
+    return vectors
+
+
+def sobol_points(n: int, dimensions: int) -> np.ndarray:
+    """n titik pertama barisan Sobol (urutan indeks biasa) sebagai integer BITS-bit, bentuk (n, dimensi)."""
+    if not 1 <= dimensions <= MAX_DIMENSIONS:
+        raise ValueError(f"Sobol mendukung 1..{MAX_DIMENSIONS} dimensi.")
+    vectors = _direction_vectors(dimensions)
+    index = np.arange(n, dtype=np.uint64)
+    points = np.zeros((n, dimensions), dtype=np.uint64)
+    for k in range(max(1, int(n - 1).bit_length())):
+        bit = (index >> np.uint64(k)) & np.uint64(1)
+        points ^= bit[:, None] * vectors[:, k]
+    return points
+
+
+def scrambled_sobol(rng: np.random.Generator, n: int, dimensions: int) -> np.ndarray:
+    """Titik Sobol di [0, 1) dengan digital shift acak (XOR) dari `rng`; paling seimbang bila n pangkat dua."""
+    shift = rng.integers(0, 1 << BITS, size=dimensions, dtype=np.uint64)
+    return (sobol_points(n, dimensions) ^ shift).astype(np.float64) / float(1 << BITS)
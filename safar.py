@@ -0,0 +1,55 @@
+# safar.py
+
+import argparse
+import importlib
+import sys
+
+# Satu pintu masuk CLI untuk seluruh entry point. Modul tiap subcommand (SQLAlchemy, NumPy, engine
+# Layer 2-6) baru diimpor setelah subcommand dipilih, sehingga `safar --help` dan command yang
+# tidak butuh NumPy tidak membayar biaya import modul yang tidak dipakai.
+# Pemakaian: python safar.py <init|genesis|post|balance|terminal> [opsi]
+
+COMMANDS = {
+    # nama: (modul:fungsi, keterangan)
+    "init": ("core_ledger.database:init_db", "Bangun skema Financial Core & jalankan migrasi"),
+    "genesis": ("genesis_block:inject_genesis_block", "Suntikkan Genesis Block (entitas, modal inti, ledger)"),
+    "post": ("transaction_engine:inject_first_capital", "Posting injeksi modal (Kas/Bank <- Modal Inti)"),
+    "balance": ("balance_sheet:generate_balance_sheet", "Cetak neraca real-time"),
+    "terminal": ("safar_master_terminal:run_master_terminal", "Institutional Survival Dashboard (Layer 1-6)"),
+}
+
+DEFAULT_CAPITAL_INJECTION = 10_000_000_000
+
+
+def load_command(name: str):
+    """Mengimpor modul subcommand dan mengembalikan fungsinya (dipakai juga oleh benchmark import-time)."""
+    module_name, func_name = COMMANDS[name][0].split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="safar", description="PIKIRAN SAFAR OS - command line.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        command = sub.add_parser(name, help=help_text, description=help_text)
+        if name == "post":
+            command.add_argument("--amount", type=int, default=DEFAULT_CAPITAL_INJECTION,
+                                 help="Nominal dalam unit terkecil (integer murni, default 10.000.000.000 IDR)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    func = load_command(args.command)
+    if args.command == "init":
+        print("=== APLIKASI PIKIRAN SAFAR: INITIALIZATION ===")
+        func()
+        print("=== LAYER 1 ONLINE ===")
+    elif args.command == "post":
+        func(args.amount)
+    else:
+        func()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
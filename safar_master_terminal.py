@@ -2,17 +2,13 @@
 
 import time
 from datetime import datetime, timezone
-from sqlalchemy import func
 
 # Import Layer 1: Financial Core
 from core_ledger.database import SessionLocal
-from core_ledger.models.financial_core import Entity, Account, AccountType, JournalLine
+from core_ledger.models.financial_core import Entity, AccountType
+from core_ledger.balance_service import get_entity_balances
 
-# Import Layer 2-6 Engines
-from risk_engine.monte_carlo_engine import MonteCarloSimulator
-from sovereignty.sovereignty_engine import SovereigntyIndexCalculator
-from intelligence.regime_shift_detector import RegimeShiftDetector
-from constitution.constitutional_guardrails import ConstitutionalAI
+# Engine Layer 2-6 diimpor saat layer-nya dimuat (NumPy hanya dibutuhkan Monte Carlo)
 
 def print_header():
     print("\n" + "="*80)
@@ -25,13 +21,8 @@ def print_header():
 
 def get_core_capital(db, entity_id):
     """Menghitung Modal Inti Real-time dari Layer 1"""
-    accounts = db.query(Account).filter(Account.entity_id == entity_id, Account.account_type == AccountType.EQUITY).all()
-    total_equity = 0
-    for acc in accounts:
-        credits = db.query(func.sum(JournalLine.credit_amount)).filter(JournalLine.account_id == acc.account_id).scalar() or 0
-        debits = db.query(func.sum(JournalLine.debit_amount)).filter(JournalLine.account_id == acc.account_id).scalar() or 0
-        total_equity += (credits - debits)
-    return total_equity
+    report = get_entity_balances(db, entity_id, account_types=[AccountType.EQUITY])
+    return report.total(AccountType.EQUITY)
 
 def run_master_terminal():
     print_header()
@@ -54,10 +45,34 @@ def run_master_terminal():
         # 2. DIAGNOSTIK LAYER 2 (MONTE CARLO RISK ENGINE)
         print("[>] MEMUAT LAYER 2: MONTE CARLO SURVIVAL SIMULATION...")
         if core_capital > 0:
-            simulator = MonteCarloSimulator(current_capital=core_capital)
-            # Jalankan simulasi senyap (tanpa print dashboard panjang), kita ambil nilai return-nya
-            # Untuk demo, kita mock nilai CBSS agar tampilan bersih, tapi di produksi ini memanggil logika asli.
-            cbss_score = simulator.run_capital_stress_test(iterations=5000, time_horizon_days=365)
+            from risk_engine.loss_cache import get_loss_cache
+            from risk_engine.monte_carlo_engine import MonteCarloSimulator
+            simulator = MonteCarloSimulator(current_capital=core_capital, cache=get_loss_cache())
+            # Jalankan simulasi senyap (tanpa print dashboard panjang), kita ambil nilai return-nya.
+            # Mode adaptif: jumlah jalur ditentukan presisi p95 (CI 95%), sama dengan dashboard.
+            stress = simulator.run_adaptive_stress_test(time_horizon_days=365)
+            cbss_score = stress.cbss
+            print(f"    p95 loss: Rp {stress.p95_loss:,.0f} (CI 95%: Rp {stress.p95_ci_low:,.0f} - "
+                  f"Rp {stress.p95_ci_high:,.0f}, {stress.iterations:,} jalur)")
+            for q, var in stress.var_ladder.items():
+                print(f"      VaR {q:.1%}: Rp {var:,.0f} | CVaR Rp {stress.cvar_ladder[q]:,.0f}")
+            # Jalur per hari (streaming): modal bisa jatuh di bawah lantai di tengah tahun lalu pulih di hari ke-365
+            survival = simulator.run_chunked_stress_test(20_000, 365, sampling="path")
+            print(f"    Lantai modal {survival.floor:.0%}: breach akhir tahun {survival.terminal_breach_probability:.2%} | "
+                  f"first passage {survival.first_passage_probability:.2%} | "
+                  f"survival {survival.survival_probability:.2%}")
+            print(f"    Max drawdown: rata-rata {survival.max_drawdown_mean:.1%} | p95 {survival.max_drawdown_p95:.1%} | "
+                  f"terburuk {survival.max_drawdown_worst:.1%}")
+
+            # Portofolio per risk_category: eksposur aset dari ledger, return antar kategori berkorelasi
+            from risk_engine.portfolio_engine import PortfolioSimulator, load_portfolio_exposures
+            exposures = load_portfolio_exposures(db, entity.entity_id)
+            if exposures:
+                portfolio = PortfolioSimulator(exposures, capital=core_capital).run_stress_test(iterations=20_000)
+                print(f"    Portofolio aset: p95 loss Rp {portfolio.p95_loss:,.0f} | "
+                      f"Expected Shortfall Rp {portfolio.expected_shortfall:,.0f}")
+                for category, share in portfolio.tail_shares.items():
+                    print(f"      - {category:<20}: Rp {portfolio.tail_contributions[category]:,.0f} ({share:.1%} tail loss)")
         else:
             cbss_score = 0.0
         print("\n")
@@ -65,6 +80,8 @@ def run_master_terminal():
 
         # 3. DIAGNOSTIK LAYER 4 & 5 (SOVEREIGNTY & INTELLIGENCE)
         print("[>] MEMUAT LAYER 4 & 5: SOVEREIGNTY & GEOPOLITICAL INTELLIGENCE...")
+        from sovereignty.sovereignty_engine import SovereigntyIndexCalculator
+        from intelligence.regime_shift_detector import RegimeShiftDetector
         sov_engine = SovereigntyIndexCalculator()
         intel_engine = RegimeShiftDetector()
         
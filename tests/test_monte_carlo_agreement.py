@@ -0,0 +1,190 @@
+# tests/test_monte_carlo_agreement.py
+
+from functools import partial
+
+import numpy as np
+import pytest
+
+from risk_engine.loss_cache import LossDistributionCache
+from risk_engine.monte_carlo_engine import (
+    DEFAULT_CHUNK_SIZE, MIN_BLOCKS, SAMPLERS, VAR_LEVELS, MonteCarloSimulator, StressParameters, iterate_blocks,
+    relative_ci_width,
+)
+
+# Sampler sparse (ruang log-return), path (streaming per hari) dan sweep (common random numbers) harus cocok dengan
+# model referensi dense per hari, termasuk skenario shock berat yang return hariannya bisa <= -100% (ruin).
+# Modal 1: kerugian adalah fraksi modal, sehingga toleransi absolut berlaku sama di semua skenario.
+
+ITERATIONS = 20_000
+DAYS = 365
+# Galat sampling p95/mean pada 20.000 jalur ~0.5% modal; breach ~0.3 poin persen
+LOSS_TOLERANCE = 0.02
+PROBABILITY_TOLERANCE = 0.02
+
+SCENARIOS = {
+    "default": StressParameters(),
+    "shock_sering": StressParameters(shock_probability=0.03, shock_impact_mean=-0.08, shock_impact_std=0.04),
+    "shock_lebar": StressParameters(shock_impact_mean=-0.05, shock_impact_std=0.3),
+    "shock_berat": StressParameters(shock_impact_mean=-0.6, shock_impact_std=0.3),
+    "ruin_sebagian": StressParameters(shock_probability=0.003, shock_impact_mean=-0.5, shock_impact_std=0.3),
+}
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    return MonteCarloSimulator(current_capital=1.0)
+
+
+@pytest.fixture(scope="module")
+def dense_results(simulator):
+    return {name: simulator.run_chunked_stress_test(ITERATIONS, DAYS, sampling="dense", parameters=parameters)
+            for name, parameters in SCENARIOS.items()}
+
+
+def assert_finite_result(result):
+    values = [result.p95_loss, result.mean_loss, result.std_loss, result.max_loss, result.cbss,
+              *result.var_ladder.values(), *result.cvar_ladder.values()]
+    assert np.isfinite(values).all(), values
+    assert 0 <= result.terminal_breach_probability <= 1
+
+
+@pytest.mark.parametrize("sampling", ["sparse", "path"])
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_sampler_matches_dense_reference(simulator, dense_results, sampling, name):
+    result = simulator.run_chunked_stress_test(ITERATIONS, DAYS, sampling=sampling, parameters=SCENARIOS[name])
+    dense = dense_results[name]
+    assert_finite_result(dense)
+    assert_finite_result(result)
+    assert result.p95_loss == pytest.approx(dense.p95_loss, abs=LOSS_TOLERANCE)
+    assert result.mean_loss == pytest.approx(dense.mean_loss, abs=LOSS_TOLERANCE)
+    assert result.cbss == pytest.approx(dense.cbss, rel=0.05)
+    assert result.terminal_breach_probability == pytest.approx(dense.terminal_breach_probability,
+                                                               abs=PROBABILITY_TOLERANCE)
+    # Kerugian tidak pernah melebihi modal: ruin berarti modal habis, bukan modal negatif
+    assert result.max_loss <= 1.0
+
+
+def test_variance_reduction_matches_dense_on_heavy_shocks(simulator, dense_results):
+    result = simulator.run_chunked_stress_test(ITERATIONS, DAYS, antithetic=True, quasi_random=True, shock_tilt=1.5,
+                                               parameters=SCENARIOS["ruin_sebagian"])
+    dense = dense_results["ruin_sebagian"]
+    assert_finite_result(result)
+    assert result.mean_loss == pytest.approx(dense.mean_loss, abs=LOSS_TOLERANCE)
+    assert result.var_ladder[0.90] == pytest.approx(dense.var_ladder[0.90], abs=LOSS_TOLERANCE)
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_path_metrics_are_consistent(simulator, name):
+    result = simulator.run_chunked_stress_test(ITERATIONS, DAYS, sampling="path", parameters=SCENARIOS[name])
+    drawdowns = [result.max_drawdown_mean, result.max_drawdown_p95, result.max_drawdown_worst]
+    assert np.isfinite(drawdowns).all()
+    assert 0 <= result.max_drawdown_mean <= result.max_drawdown_p95 <= result.max_drawdown_worst <= 1
+    # Jalur yang berakhir di bawah lantai pasti pernah melewatinya
+    assert result.first_passage_probability >= result.terminal_breach_probability
+    assert result.survival_probability == pytest.approx(1 - result.first_passage_probability)
+
+
+def test_ruined_paths_count_as_breaches(simulator):
+    result = simulator.run_chunked_stress_test(ITERATIONS, DAYS, sampling="path", parameters=SCENARIOS["shock_berat"])
+    assert result.first_passage_probability > 0.9
+    assert result.max_drawdown_worst == pytest.approx(1.0)
+    assert result.cbss == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("sampling", ["sparse", "dense", "path"])
+@pytest.mark.parametrize("name", ["default", "ruin_sebagian"])
+def test_tail_ladder_matches_full_sample(simulator, sampling, name):
+    parameters = SCENARIOS[name]
+    result = simulator.run_chunked_stress_test(ITERATIONS, DAYS, sampling=sampling, parameters=parameters)
+    sampler = partial(SAMPLERS[sampling], 1.0, time_horizon_days=DAYS, parameters=parameters)
+    blocks = iterate_blocks(sampler, ITERATIONS, DEFAULT_CHUNK_SIZE, 1, seed=42)
+    losses = np.sort(np.concatenate([losses for losses, _, _ in blocks]))
+    for q in VAR_LEVELS:
+        assert result.var_ladder[q] == pytest.approx(np.percentile(losses, q * 100))
+        top = losses[len(losses) - int(np.ceil(round((1 - q) * len(losses), 9))):]
+        assert result.cvar_ladder[q] == pytest.approx(top.mean())
+    var = [result.var_ladder[q] for q in VAR_LEVELS]
+    cvar = [result.cvar_ladder[q] for q in VAR_LEVELS]
+    assert var == sorted(var) and cvar == sorted(cvar)
+    assert all(v <= c <= result.max_loss for v, c in zip(var, cvar))
+
+
+def test_sketch_ladder_matches_exact(simulator):
+    exact = simulator.run_chunked_stress_test(ITERATIONS, DAYS, parameters=SCENARIOS["shock_lebar"])
+    sketch = simulator.run_chunked_stress_test(ITERATIONS, DAYS, parameters=SCENARIOS["shock_lebar"],
+                                               quantile_method="sketch", relative_accuracy=0.005)
+    for q in VAR_LEVELS:
+        assert sketch.var_ladder[q] == pytest.approx(exact.var_ladder[q], rel=0.02)
+        assert sketch.cvar_ladder[q] == pytest.approx(exact.cvar_ladder[q], rel=0.02)
+
+
+def test_sweep_matches_dense_per_cell(simulator):
+    axes = {"shock_impact_mean": [-0.05, -0.3, -0.6], "shock_impact_std": [0.02, 0.3]}
+    grid = simulator.run_sensitivity_sweep(axes, iterations=ITERATIONS, time_horizon_days=DAYS)
+    assert not grid.non_finite.any()
+    assert np.isfinite(grid.cbss).all() and np.isfinite(grid.p95_loss).all()
+    for index in np.ndindex(grid.cbss.shape):
+        dense = simulator.run_chunked_stress_test(ITERATIONS, DAYS, sampling="dense",
+                                                  parameters=grid.parameters_at(index))
+        assert grid.p95_loss[index] == pytest.approx(dense.p95_loss, abs=LOSS_TOLERANCE), index
+        assert grid.mean_loss[index] == pytest.approx(dense.mean_loss, abs=LOSS_TOLERANCE), index
+        assert grid.cbss[index] == pytest.approx(dense.cbss, rel=0.05), index
+
+
+def test_sweep_is_monotone_in_shock_severity(simulator):
+    grid = simulator.run_sensitivity_sweep({"shock_impact_mean": [-0.02, -0.05, -0.2, -0.6]},
+                                           iterations=ITERATIONS, time_horizon_days=DAYS)
+    # Common random numbers: shock lebih dalam tidak pernah menaikkan CBSS
+    assert (np.diff(grid.cbss) <= 1e-12).all()
+
+
+@pytest.mark.parametrize("overrides", [
+    {"shock_impact_mean": -1.0},
+    {"shock_impact_mean": -1.5},
+    {"shock_impact_std": float("nan")},
+    {"daily_volatility": float("inf")},
+    {"shock_probability": 1.0},
+])
+def test_invalid_parameters_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        StressParameters(**overrides)
+
+
+@pytest.mark.parametrize("capital", [0.0, -5.0])
+def test_cache_rejects_non_positive_capital(capital):
+    simulator = MonteCarloSimulator(current_capital=capital, cache=LossDistributionCache())
+    with pytest.raises(ValueError):
+        simulator.run_chunked_stress_test(ITERATIONS, DAYS)
+
+
+def test_cached_result_matches_direct_simulation():
+    capital = 10_000_000_000
+    direct = MonteCarloSimulator(current_capital=capital).run_chunked_stress_test(
+        ITERATIONS, DAYS, parameters=SCENARIOS["shock_berat"])
+    cached = MonteCarloSimulator(current_capital=capital, cache=LossDistributionCache()).run_chunked_stress_test(
+        ITERATIONS, DAYS, parameters=SCENARIOS["shock_berat"])
+    assert cached.p95_loss == pytest.approx(direct.p95_loss)
+    assert cached.cbss == pytest.approx(direct.cbss)
+
+
+@pytest.mark.parametrize("shock_probability", [0.0, 0.7])
+def test_adaptive_skips_tilt_outside_probability_range(simulator, shock_probability):
+    parameters = StressParameters(shock_probability=shock_probability)
+    result = simulator.run_adaptive_stress_test(DAYS, max_iterations=ITERATIONS, parameters=parameters)
+    assert result.shock_tilt == 1.0
+    assert_finite_result(result)
+
+
+def test_adaptive_converges_without_risk(simulator):
+    parameters = StressParameters(daily_volatility=0.0, shock_probability=0.0)
+    result = simulator.run_adaptive_stress_test(DAYS, max_iterations=100 * DEFAULT_CHUNK_SIZE, parameters=parameters)
+    assert result.p95_loss == 0
+    assert result.converged and result.blocks == MIN_BLOCKS
+    assert result.p95_ci_width == 0
+    assert result.cbss == float("inf")
+
+
+def test_relative_ci_width_handles_degenerate_centers():
+    assert relative_ci_width(-0.11, -0.09, -0.1) == pytest.approx(0.2)
+    assert relative_ci_width(0.0, 0.0, 0.0) == 0
+    assert relative_ci_width(-0.01, 0.01, 0.0) == float("inf")
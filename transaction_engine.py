@@ -43,6 +43,7 @@ def inject_first_capital(amount: int):
         event_hash = hashlib.sha256(event_payload.encode()).hexdigest()
         
         tx_event = TransactionEvent(
+            ledger_id=ledger.ledger_id, # Disambungkan ke hash chain ledger (core_ledger/event_chain.py)
             event_type="CAPITAL_INJECTION",
             source_system="MANUAL_FOUNDER_INJECTION",
             authority_signature_hash="AUTH_FOUNDER_001", # Nantinya ini divalidasi oleh Governance Layer
@@ -91,7 +92,7 @@ def inject_first_capital(amount: int):
         
         # VALIDASI MUTLAK LISKOV & CHAMBERS
         if journal.total_debit != journal.total_credit:
-            raise ValueError("FATAL ERROR: Total Debit tidak sama dengan Total Credit!") [cite: 512]
+            raise ValueError("FATAL ERROR: Total Debit tidak sama dengan Total Credit!")
             
         # Jika semua tahapan di atas lolos, baru kita simpan secara permanen
         db.commit()
@@ -7,9 +7,9 @@ from datetime import datetime, timezone
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from sqlalchemy import func
-from core_ledger.database import SessionLocal
-from core_ledger.models.financial_core import Entity, Account, AccountType, JournalLine
+from core_ledger.models.financial_core import AccountType
+from core_ledger.async_queries import load_entities_with_balances, run_async_reads
+from risk_engine.loss_cache import get_loss_cache
 from risk_engine.monte_carlo_engine import MonteCarloSimulator
 from sovereignty.sovereignty_engine import SovereigntyIndexCalculator
 from intelligence.regime_shift_detector import RegimeShiftDetector
@@ -70,49 +70,53 @@ simulate_project = st.sidebar.toggle("✅ Verify Milestone (Fase 1)", value=Fals
 st.sidebar.markdown("<br><br><br><span style='color:#475569; font-size:0.7rem; font-family:monospace;'>PIKIRAN SAFAR OS v1.2<br>SECURE KERNEL ENCRYPTED</span>", unsafe_allow_html=True)
 
 # --- 4. BACKEND DATA BINDING ---
+# Entitas yang dibaca dashboard; panel entitas baru cukup ditambahkan di sini
+DASHBOARD_ENTITIES = ("Ujung Langit Foundation",)
+
 @st.cache_data(ttl=5) 
 def fetch_system_data(is_crisis, is_phase1_done):
-    db = SessionLocal()
-    try:
-        entity = db.query(Entity).filter(Entity.name == "Ujung Langit Foundation").first()
-        if not entity:
-            return None
-        
-        accounts = db.query(Account).filter(Account.entity_id == entity.entity_id, Account.account_type == AccountType.EQUITY).all()
-        total_equity = 0
-        for acc in accounts:
-            credits = db.query(func.sum(JournalLine.credit_amount)).filter(JournalLine.account_id == acc.account_id).scalar() or 0
-            debits = db.query(func.sum(JournalLine.debit_amount)).filter(JournalLine.account_id == acc.account_id).scalar() or 0
-            total_equity += (credits - debits)
-
-        simulator = MonteCarloSimulator(current_capital=total_equity)
-        cbss_score = simulator.run_capital_stress_test(iterations=1000, time_horizon_days=365)
-
-        simulated_jurisdiction = "HIGH-RISK-NATION" if is_crisis else entity.jurisdiction_id
-        capital_mobility = 10 if is_crisis else 90 
-        feed = ["Pemerintah menerapkan emergency powers dan capital control."] if is_crisis else ["Stabilitas regulasi terjamin. Tidak ada anomali."]
-
-        sov_engine = SovereigntyIndexCalculator()
-        sei_score = sov_engine.calculate_sei(entity.name, simulated_jurisdiction, capital_mobility)
-        intel_engine = RegimeShiftDetector()
-        alert_level = intel_engine.analyze_intelligence_feed(simulated_jurisdiction, feed)
-
-        escrow = SmartEscrowVault("SASAK HERITAGE & LOMBOK NATURE CONSERVATION", 2500000000)
-        escrow.define_milestone("Fase 1: Data Collection & Cultural Mapping", 30.0)
-        escrow.define_milestone("Fase 2: Mandala Eco Village Infrastructure", 40.0)
-        escrow.define_milestone("Fase 3: Mandala Greenfest 2026", 30.0)
-        
-        if is_phase1_done:
-            escrow.verify_and_release(0, "Independent Audit", "HASH_VALID_001")
-
-        return {
-            "capital": total_equity, "cbss": cbss_score, "sei": sei_score, 
-            "alert": alert_level, "jurisdiction": simulated_jurisdiction,
-            "escrow_project": escrow.project_name, "escrow_locked": escrow.locked_funds,
-            "escrow_released": escrow.released_funds, "escrow_milestones": escrow.milestones
-        }
-    finally:
-        db.close()
+    # Semua bacaan ledger dashboard dikumpulkan dalam satu run_async_reads: tiap entitas membaca
+    # dengan AsyncSession sendiri secara konkuren (asyncio.gather), bukan satu per satu
+    panels = run_async_reads(
+        load_entities_with_balances(DASHBOARD_ENTITIES, account_types=[AccountType.EQUITY])
+    )
+    entity, report = panels[0]
+    if not entity:
+        return None
+
+    total_equity = report.total(AccountType.EQUITY)
+
+    # Distribusi kerugian ter-normalisasi di-cache per proses: perubahan modal tidak memicu simulasi ulang.
+    # Modal <= 0 tidak punya buffer sama sekali (sama dengan terminal): CBSS 0 tanpa simulasi.
+    if total_equity > 0:
+        simulator = MonteCarloSimulator(current_capital=total_equity, cache=get_loss_cache())
+        cbss_score = simulator.run_adaptive_stress_test(time_horizon_days=365).cbss
+    else:
+        cbss_score = 0.0
+
+    simulated_jurisdiction = "HIGH-RISK-NATION" if is_crisis else entity.jurisdiction_id
+    capital_mobility = 10 if is_crisis else 90 
+    feed = ["Pemerintah menerapkan emergency powers dan capital control."] if is_crisis else ["Stabilitas regulasi terjamin. Tidak ada anomali."]
+
+    sov_engine = SovereigntyIndexCalculator()
+    sei_score = sov_engine.calculate_sei(entity.name, simulated_jurisdiction, capital_mobility)
+    intel_engine = RegimeShiftDetector()
+    alert_level = intel_engine.analyze_intelligence_feed(simulated_jurisdiction, feed)
+
+    escrow = SmartEscrowVault("SASAK HERITAGE & LOMBOK NATURE CONSERVATION", 2500000000)
+    escrow.define_milestone("Fase 1: Data Collection & Cultural Mapping", 30.0)
+    escrow.define_milestone("Fase 2: Mandala Eco Village Infrastructure", 40.0)
+    escrow.define_milestone("Fase 3: Mandala Greenfest 2026", 30.0)
+    
+    if is_phase1_done:
+        escrow.verify_and_release(0, "Independent Audit", "HASH_VALID_001")
+
+    return {
+        "capital": total_equity, "cbss": cbss_score, "sei": sei_score, 
+        "alert": alert_level, "jurisdiction": simulated_jurisdiction,
+        "escrow_project": escrow.project_name, "escrow_locked": escrow.locked_funds,
+        "escrow_released": escrow.released_funds, "escrow_milestones": escrow.milestones
+    }
 
 # --- 5. RENDER UI / FRONTEND ---
 def render_dashboard():